@@ -10,6 +10,13 @@ PROJECT_ROOT = Path(__file__).parent.parent
 PUBLIC_DATA_DIR = PROJECT_ROOT / "public" / "data"
 RAW_JSON_DIR = PUBLIC_DATA_DIR / "json"
 RAW_RTTM_DIR = PUBLIC_DATA_DIR / "rttm"
+# Non-public state, kept outside the web root (public/ is served statically)
+STATE_DIR = PROJECT_ROOT / ".state"
+EMBEDDINGS_DIR = STATE_DIR / "embeddings"
+SPEAKER_IDENTITY_DIR = STATE_DIR / "speaker_identity"
+SEARCH_INDEX_DIR = STATE_DIR / "search_index"
+SKETCH_DIR = STATE_DIR / "sketches"
+CUBE_DIR = STATE_DIR / "cube"
 OUTPUT_DIR = PUBLIC_DATA_DIR / "aggregated"
 
 # Ensure output directory exists
@@ -23,6 +30,27 @@ MIN_ENTITY_MENTIONS = 2
 MIN_SPEAKER_DURATION_SECONDS = 5.0
 TOP_N_RESULTS = 50
 
+# Heavy-hitter sketches: monitored items per sketch (error <= total / capacity)
+SKETCH_CAPACITY = 2000
+MIN_SENTENCE_WORDS = 3
+
+# Q&A pairing: min. words of a '?' sentence to count as a question
+MIN_QUESTION_WORDS = 5
+
+# Viral moments: window length and moments kept per BPK
+VIRAL_WINDOW_SECONDS = 60.0
+VIRAL_MOMENTS_PER_BPK = 5
+
+# Speaker activity heatmaps: seconds per bin (one column per minute)
+ACTIVITY_BIN_SECONDS = 60.0
+
+# Interruptions: min. overlap of a speaker starting during another's turn; matrix size
+MIN_INTERRUPTION_OVERLAP_SECONDS = 0.5
+INTERRUPTION_MATRIX_SIZE = 25
+
+# Speaker identity: min. cosine similarity for two speaker centroids to be the same person
+SPEAKER_MATCH_THRESHOLD = 0.65
+
 # Output file names
 OUTPUT_FILES = {
     "corpus_stats": "corpus_stats.json",
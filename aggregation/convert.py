@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Storage Converter for raw ingest outputs.
+Single Responsibility: Migrate transcripts (and optionally RTTMs) between storage formats in parallel.
+
+    python -m aggregation.convert --format gzip
+    python -m aggregation.convert --format zstd --rttm --workers 8
+    python -m aggregation.convert --format pretty          # back to the legacy layout
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+from typing import Tuple
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from aggregation.config import RAW_JSON_DIR, RAW_RTTM_DIR
+from aggregation.loaders.formats import (
+    RTTM_SUFFIXES, STORAGE_FORMATS, TRANSCRIPT_SUFFIXES,
+    encode_rttm, encode_transcript, expand_transcript, iter_files, read_bytes, read_text,
+    remove_variants, storage_format_of, video_id_of, write_atomic,
+)
+
+logger = logging.getLogger("BPK_Convert")
+
+
+def convert_transcript(path: Path, storage: str, rttm_suffix: str) -> Tuple[str, int, int]:
+    """Rewrite one transcript; returns (status, bytes before, bytes after)."""
+    before = path.stat().st_size
+    raw = json.loads(read_bytes(path))
+    data = expand_transcript(raw)
+    meta = data.get("metadata", {})
+    rttm_path = meta.get("diarization_rttm_path")
+    if rttm_suffix and rttm_path:
+        rttm_path = f"rttm/{video_id_of(path)}{rttm_suffix}"
+    if storage_format_of(path, raw) == storage and rttm_path == meta.get("diarization_rttm_path"):
+        return "unchanged", before, before
+    if rttm_path:
+        meta["diarization_rttm_path"] = rttm_path
+
+    blob, suffix = encode_transcript(data, storage)
+    target = path.parent / f"{video_id_of(path)}{suffix}"
+    write_atomic(target, blob)
+    remove_variants(path.parent, video_id_of(path), TRANSCRIPT_SUFFIXES, keep=target)
+    return "converted", before, len(blob)
+
+
+def convert_rttm(path: Path, storage: str) -> Tuple[str, int, int]:
+    before = path.stat().st_size
+    blob, suffix = encode_rttm(read_text(path), storage)
+    target = path.parent / f"{video_id_of(path)}{suffix}"
+    if target == path:
+        return "unchanged", before, before
+    write_atomic(target, blob)
+    remove_variants(path.parent, video_id_of(path), RTTM_SUFFIXES, keep=target)
+    return "converted", before, len(blob)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Convert raw BPK transcripts (and RTTMs) to another storage format"
+    )
+    parser.add_argument("--format", choices=STORAGE_FORMATS, default="gzip",
+                        help="Target format: pretty (legacy), compact, gzip or zstd (default: gzip)")
+    parser.add_argument("--json-dir", type=Path, default=RAW_JSON_DIR,
+                        help=f"Directory containing JSON transcripts (default: {RAW_JSON_DIR})")
+    parser.add_argument("--rttm-dir", type=Path, default=RAW_RTTM_DIR,
+                        help=f"Directory containing RTTM files (default: {RAW_RTTM_DIR})")
+    parser.add_argument("--rttm", action="store_true",
+                        help="Also compress RTTMs (gzip/zstd) or decompress them (pretty/compact)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="Parallel worker processes (default: CPU count)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose logging")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        datefmt="%H:%M:%S",
+    )
+
+    rttm_suffix = encode_rttm("", args.format)[1] if args.rttm else ""
+    jobs = [(convert_transcript, p, args.format, rttm_suffix) for p in iter_files(args.json_dir, TRANSCRIPT_SUFFIXES)]
+    if args.rttm and args.rttm_dir.exists():
+        jobs += [(convert_rttm, p, args.format) for p in iter_files(args.rttm_dir, RTTM_SUFFIXES)]
+    logger.info(f"Converting {len(jobs)} files to '{args.format}' with {args.workers} workers...")
+
+    counts = {"converted": 0, "unchanged": 0, "failed": 0}
+    size_before = size_after = 0
+    with ProcessPoolExecutor(max_workers=max(1, args.workers)) as pool:
+        futures = {pool.submit(fn, *params): params[0] for fn, *params in jobs}
+        for future in as_completed(futures):
+            try:
+                status, before, after = future.result()
+            except Exception as e:
+                logger.error(f"Error converting {futures[future]}: {e}")
+                counts["failed"] += 1
+                continue
+            counts[status] += 1
+            size_before += before
+            size_after += after
+
+    print("\n=== Conversion Complete ===")
+    print(f"Converted: {counts['converted']}, unchanged: {counts['unchanged']}, failed: {counts['failed']}")
+    if size_before:
+        print(f"Size: {size_before / 1e6:.1f} MB -> {size_after / 1e6:.1f} MB "
+              f"({100 * size_after / size_before:.0f}%)")
+    if counts["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
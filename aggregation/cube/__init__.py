@@ -0,0 +1,7 @@
+"""
+Pre-aggregated date cube for date-range queries in the BPK Aggregation Pipeline.
+"""
+
+from .date_cube import DateCube
+
+__all__ = ["DateCube"]
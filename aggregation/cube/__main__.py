@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+CLI for date-range queries against the pre-aggregated date cube.
+
+    python -m aggregation.cube                              # whole corpus
+    python -m aggregation.cube --start 2024-01-01 --end 2024-12-31
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from aggregation.config import CUBE_DIR
+from aggregation.cube import DateCube
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query BPK KPIs for a date range")
+    parser.add_argument("--start", default=None, help="First day (YYYY-MM-DD, inclusive)")
+    parser.add_argument("--end", default=None, help="Last day (YYYY-MM-DD, inclusive)")
+    parser.add_argument("--cube-dir", type=Path, default=CUBE_DIR,
+                        help=f"Date cube directory (default: {CUBE_DIR})")
+    args = parser.parse_args()
+
+    if not (args.cube_dir / "meta.json").exists():
+        print(f"No date cube found: run the aggregation pipeline first ({args.cube_dir})")
+        sys.exit(1)
+
+    cube = DateCube.load(args.cube_dir)
+    t0 = time.perf_counter()
+    result = cube.query(args.start, args.end)
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+
+    print(json.dumps(result, ensure_ascii=False, indent=2))
+    print(f"\nAnswered in {elapsed_ms:.1f} ms ({len(cube.days)} days in cube)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,195 @@
+"""
+Pre-aggregated date cube.
+Single Responsibility: Store per-day partial aggregates and answer arbitrary date ranges.
+
+Cube directory layout:
+    meta.json           measure names, sketch kinds, HyperLogLog precision, current version
+    <version>/
+        days.npy        sorted days with at least one BPK (proleptic ordinals, int32)
+        values.npy      (days x measures) additive per-day values (float64)
+        prefix.npy      (days + 1 x measures) prefix sums of values.npy
+        hll_<kind>.npy  (days x 2**p) per-day HyperLogLog registers (uint8)
+
+Every save writes a new version directory and then swaps meta.json in with one rename,
+so a concurrent load always sees the arrays of a single build.
+
+A range query is two binary searches plus one prefix-sum difference for the additive
+measures, and a register-wise max over the range's days for distinct counts.
+"""
+
+import json
+import shutil
+import time
+from datetime import date as Date
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from ..sketches import HyperLogLog
+
+
+def _ordinal(day: str) -> int:
+    return Date.fromisoformat(day).toordinal()
+
+
+class DateCube:
+    """Per-day measures with prefix sums and mergeable distinct-count sketches."""
+
+    def __init__(
+        self,
+        days: np.ndarray,
+        measures: List[str],
+        values: np.ndarray,
+        sketches: Dict[str, np.ndarray],
+        p: int = 12,
+        prefix: Optional[np.ndarray] = None,
+    ):
+        self.days = days
+        self.measures = measures
+        self.values = values
+        self.sketches = sketches
+        self.p = p
+        if prefix is None:
+            prefix = np.zeros((len(days) + 1, len(measures)), dtype=np.float64)
+            np.cumsum(values, axis=0, out=prefix[1:])
+        self.prefix = prefix
+
+    @classmethod
+    def build(
+        cls,
+        rows: Iterable[Tuple[str, Dict[str, float], Dict[str, HyperLogLog]]],
+        p: int = 12,
+    ) -> "DateCube":
+        """Aggregate per-BPK rows (day, additive measures, sketches) into per-day cells."""
+        by_day: Dict[int, Dict[str, float]] = {}
+        day_sketches: Dict[int, Dict[str, HyperLogLog]] = {}
+        measures: Dict[str, None] = {}
+        kinds: Dict[str, None] = {}
+        for day, values, sketches in rows:
+            key = _ordinal(day)
+            cell = by_day.setdefault(key, {})
+            for name, value in values.items():
+                measures.setdefault(name)
+                cell[name] = cell.get(name, 0.0) + value
+            cell_sketches = day_sketches.setdefault(key, {})
+            for kind, sketch in sketches.items():
+                kinds.setdefault(kind)
+                if kind in cell_sketches:
+                    cell_sketches[kind].merge(sketch)
+                else:
+                    cell_sketches[kind] = sketch.copy()
+
+        days = np.array(sorted(by_day), dtype=np.int32)
+        names = list(measures)
+        values = np.array(
+            [[by_day[d].get(name, 0.0) for name in names] for d in days], dtype=np.float64
+        ).reshape(len(days), len(names))
+        sketches = {}
+        for kind in kinds:
+            registers = np.zeros((len(days), 1 << p), dtype=np.uint8)
+            for row, d in enumerate(days):
+                sketch = day_sketches[d].get(kind)
+                if sketch is not None:
+                    registers[row] = sketch.registers
+            sketches[kind] = registers
+        return cls(days, names, values, sketches, p)
+
+    def save(self, cube_dir: Path) -> None:
+        cube_dir.mkdir(parents=True, exist_ok=True)
+        previous = None
+        if (cube_dir / "meta.json").exists():
+            with open(cube_dir / "meta.json", "r", encoding="utf-8") as f:
+                previous = json.load(f).get("version")
+
+        version = f"v{time.time_ns()}"
+        arrays = {"days": self.days, "values": self.values, "prefix": self.prefix}
+        arrays.update({f"hll_{kind}": registers for kind, registers in self.sketches.items()})
+        (cube_dir / version).mkdir()
+        for name, array in arrays.items():
+            np.save(cube_dir / version / f"{name}.npy", array)
+
+        meta = {"measures": self.measures, "sketches": list(self.sketches), "p": self.p, "version": version}
+        tmp = cube_dir / "meta.json.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False, indent=2)
+        tmp.replace(cube_dir / "meta.json")
+
+        # Keep the previous version for readers that loaded meta.json just before the swap
+        for stale in cube_dir.glob("v*"):
+            if stale.is_dir() and stale.name not in (version, previous):
+                shutil.rmtree(stale, ignore_errors=True)
+
+    @classmethod
+    def load(cls, cube_dir: Path) -> "DateCube":
+        """Open a saved cube (arrays are memory-mapped)."""
+        with open(cube_dir / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        version_dir = cube_dir / meta["version"]
+
+        def array(name: str) -> np.ndarray:
+            return np.load(version_dir / f"{name}.npy", mmap_mode="r")
+
+        return cls(
+            days=array("days"),
+            measures=meta["measures"],
+            values=array("values"),
+            sketches={kind: array(f"hll_{kind}") for kind in meta["sketches"]},
+            p=meta["p"],
+            prefix=array("prefix"),
+        )
+
+    def _range(self, start: Optional[str], end: Optional[str]) -> Tuple[int, int]:
+        """Row slice [lo, hi) of the days within [start, end] (inclusive; None = open)."""
+        lo = 0 if start is None else int(np.searchsorted(self.days, _ordinal(start), side="left"))
+        hi = len(self.days) if end is None else int(np.searchsorted(self.days, _ordinal(end), side="right"))
+        return lo, max(lo, hi)
+
+    def totals(self, start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, float]:
+        """Sum of every additive measure over the date range (prefix-sum difference)."""
+        lo, hi = self._range(start, end)
+        sums = self.prefix[hi] - self.prefix[lo]
+        return {name: float(sums[i]) for i, name in enumerate(self.measures)}
+
+    def distinct(
+        self,
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+        kinds: Optional[Iterable[str]] = None,
+    ) -> Dict[str, int]:
+        """Estimated distinct counts over the date range (merged per-day sketches)."""
+        lo, hi = self._range(start, end)
+        result = {}
+        for kind in (kinds or self.sketches):
+            registers = self.sketches[kind][lo:hi]
+            merged = registers.max(axis=0) if hi > lo else np.zeros(1 << self.p, dtype=np.uint8)
+            result[kind] = HyperLogLog(self.p, merged).count()
+        return result
+
+    def query(self, start: Optional[str] = None, end: Optional[str] = None) -> Dict[str, Any]:
+        """All KPIs for a date range: additive totals, derived averages and distinct counts."""
+        lo, hi = self._range(start, end)
+        totals = self.totals(start, end)
+        bpks = totals.get("bpk_count", 0.0)
+        return {
+            "date_range": {
+                "start": Date.fromordinal(int(self.days[lo])).isoformat() if hi > lo else None,
+                "end": Date.fromordinal(int(self.days[hi - 1])).isoformat() if hi > lo else None,
+            },
+            "days_with_bpks": hi - lo,
+            "totals": totals,
+            "averages": {
+                name: round(value / bpks, 2) for name, value in totals.items()
+                if name != "bpk_count" and bpks
+            },
+            "distinct": self.distinct(start, end),
+            "distinct_count_error": round(1.04 / np.sqrt(1 << self.p), 4),
+        }
+
+    def daily(self) -> Dict[str, Any]:
+        """Per-day columns and their prefix sums (cumulative[i] = sum of the first i days)."""
+        return {
+            "days": [Date.fromordinal(int(d)).isoformat() for d in self.days],
+            "values": {name: self.values[:, i].tolist() for i, name in enumerate(self.measures)},
+            "cumulative": {name: self.prefix[:, i].tolist() for i, name in enumerate(self.measures)},
+        }
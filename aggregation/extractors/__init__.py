@@ -7,10 +7,20 @@ from .base import BaseExtractor
 from .basic_stats import BasicStatsExtractor
 from .speaker_stats import SpeakerStatsExtractor
 from .content_stats import ContentStatsExtractor
+from .frequency_stats import FrequencyStatsExtractor
+from .timeline import TimelineExtractor
+from .date_cube import DateCubeExtractor
+from .qa_stats import QAStatsExtractor
+from .viral_moments import ViralMomentsExtractor
 
 __all__ = [
     "BaseExtractor",
     "BasicStatsExtractor",
     "SpeakerStatsExtractor",
     "ContentStatsExtractor",
+    "FrequencyStatsExtractor",
+    "TimelineExtractor",
+    "DateCubeExtractor",
+    "QAStatsExtractor",
+    "ViralMomentsExtractor",
 ]
@@ -20,7 +20,9 @@ from datetime import datetime
 from typing import Any, Dict, List, Optional, Tuple
 
 from .base import BaseExtractor
+from ..config import SKETCH_CAPACITY
 from ..models.raw_data import BPKTranscript, RTTMEntry
+from ..sketches import HyperLogLog, SpaceSaving, VideoSketchStore
 
 logger = logging.getLogger(__name__)
 
@@ -90,9 +92,26 @@ class ContentStatsExtractor(BaseExtractor):
         'Innenpolitik': ['innenpolitik', 'koalition', 'opposition', 'bundestag', 'wahl'],
     }
     
-    def __init__(self):
+    # Distinct-count sketches kept per video (see aggregation.sketches)
+    SKETCH_KINDS = ("persons", "locations", "organizations", "vocabulary", "speakers")
+    
+    def __init__(
+        self,
+        sketch_store: Optional[VideoSketchStore] = None,
+        identity_map: Optional[Dict[str, Dict[str, str]]] = None,
+    ):
         self._nlp = None
         self._nlp_loaded = False
+        self._sketch_store = sketch_store
+        # video_id -> {local RTTM label -> corpus-wide speaker ID}
+        self._identity_map = identity_map or {}
+        # video_id -> NER result, so other extractors (timeline) don't re-run SpaCy;
+        # held until release_entities() after the last consumer
+        self._entity_memo: Dict[str, Dict[str, Counter]] = {}
+    
+    def set_identity_map(self, identity_map: Dict[str, Dict[str, str]]) -> None:
+        """Set the cross-BPK speaker identity mapping (enables the distinct speaker count)."""
+        self._identity_map = identity_map
     
     @property
     def name(self) -> str:
@@ -166,12 +185,38 @@ class ContentStatsExtractor(BaseExtractor):
         
         return entities
     
-    def _extract_topics(self, text: str) -> Counter:
+    def video_entities(self, transcript: BPKTranscript) -> Dict[str, Counter]:
+        """Entities of one transcript (memoized per video ID)."""
+        entities = self._entity_memo.get(transcript.video_id)
+        if entities is None:
+            entities = self._extract_entities_spacy(transcript.transcript_text)
+            self._entity_memo[transcript.video_id] = entities
+        return entities
+    
+    def release_entities(self) -> None:
+        """Drop the memoized NER results (call once all extractors sharing them have run)."""
+        self._entity_memo.clear()
+    
+    def video_date(self, transcript: BPKTranscript) -> Optional[str]:
+        """Publish date (YYYY-MM-DD), falling back to the date in the title."""
+        if transcript.metadata.publish_date:
+            return transcript.metadata.publish_date.strftime("%Y-%m-%d")
+        return self._extract_date_from_title(transcript.metadata.original_title)
+    
+    @classmethod
+    def topic_matcher(cls) -> Tuple[re.Pattern, Dict[str, str]]:
+        """One regex over all topic keywords (group 1 = keyword) and keyword -> topic."""
+        topic_of = {keyword: topic for topic, words in cls.TOPIC_KEYWORDS.items() for keyword in words}
+        alternation = "|".join(sorted(map(re.escape, topic_of), key=len, reverse=True))
+        return re.compile(r"\b(" + alternation + r")\w*\b"), topic_of
+    
+    @classmethod
+    def extract_topics(cls, text: str) -> Counter:
         """Extract topic mentions using keyword matching."""
         text_lower = text.lower()
         topics = Counter()
         
-        for topic, keywords in self.TOPIC_KEYWORDS.items():
+        for topic, keywords in cls.TOPIC_KEYWORDS.items():
             count = 0
             for keyword in keywords:
                 count += len(re.findall(r'\b' + re.escape(keyword) + r'\w*\b', text_lower))
@@ -180,7 +225,32 @@ class ContentStatsExtractor(BaseExtractor):
         
         return topics
     
-    def _count_questions(self, text: str) -> int:
+    def video_sketches(
+        self,
+        transcript: BPKTranscript,
+        entities: Dict[str, Counter],
+        entries: List[RTTMEntry],
+    ) -> Dict[str, HyperLogLog]:
+        """Distinct-count sketches of one video; speakers only once identities are resolved."""
+        sketches = {
+            "persons": HyperLogLog(),
+            "locations": HyperLogLog(),
+            "organizations": HyperLogLog(),
+            "vocabulary": HyperLogLog(),
+        }
+        sketches["persons"].update(entities["PER"])
+        sketches["locations"].update(entities["LOC"])
+        sketches["organizations"].update(entities["ORG"])
+        sketches["vocabulary"].update(set(re.findall(r"[^\W\d_]+", transcript.transcript_text.lower())))
+        
+        identities = self._identity_map.get(transcript.video_id)
+        if identities:
+            sketches["speakers"] = HyperLogLog()
+            sketches["speakers"].update({identities[e.speaker_id] for e in entries if e.speaker_id in identities})
+        return sketches
+    
+    @staticmethod
+    def count_questions(text: str) -> int:
         """Count questions in text."""
         return text.count('?')
     
@@ -212,10 +282,11 @@ class ContentStatsExtractor(BaseExtractor):
         
         logger.info(f"Processing {len(transcripts)} transcripts with SpaCy NER...")
         
-        # Aggregate counters
-        all_persons: Counter = Counter()
-        all_locations: Counter = Counter()
-        all_organizations: Counter = Counter()
+        # Aggregates: fixed-size top-k summaries and distinct-count sketches (merged per video)
+        all_persons = SpaceSaving(SKETCH_CAPACITY)
+        all_locations = SpaceSaving(SKETCH_CAPACITY)
+        all_organizations = SpaceSaving(SKETCH_CAPACITY)
+        distinct = {kind: HyperLogLog() for kind in self.SKETCH_KINDS}
         all_topics: Counter = Counter()
         total_questions = 0
         total_words = 0
@@ -231,31 +302,32 @@ class ContentStatsExtractor(BaseExtractor):
             text = transcript.transcript_text
             
             # SpaCy NER extraction
-            entities = self._extract_entities_spacy(text)
-            all_persons.update(entities["PER"])
-            all_locations.update(entities["LOC"])
-            all_organizations.update(entities["ORG"])
+            entities = self.video_entities(transcript)
+            all_persons.merge(SpaceSaving.from_counts(entities["PER"], SKETCH_CAPACITY))
+            all_locations.merge(SpaceSaving.from_counts(entities["LOC"], SKETCH_CAPACITY))
+            all_organizations.merge(SpaceSaving.from_counts(entities["ORG"], SKETCH_CAPACITY))
             
             # Topic extraction
-            topics = self._extract_topics(text)
+            topics = self.extract_topics(text)
             all_topics.update(topics)
             
             # Question count
-            questions = self._count_questions(text)
+            questions = self.count_questions(text)
             total_questions += questions
             total_words += transcript.total_words
             total_duration += transcript.total_duration
             
             # Date extraction
-            date = None
-            if transcript.metadata.publish_date:
-                date = transcript.metadata.publish_date.strftime("%Y-%m-%d")
-            else:
-                date = self._extract_date_from_title(transcript.metadata.original_title)
-            
+            date = self.video_date(transcript)
             if date:
                 dates.append(date)
             
+            sketches = self.video_sketches(transcript, entities, diarization.get(transcript.video_id, []))
+            for kind, sketch in sketches.items():
+                distinct[kind].merge(sketch)
+            if self._sketch_store is not None:
+                self._sketch_store.save(transcript.video_id, sketches, date=date)
+            
             # Per-BPK summary
             top_person = entities["PER"].most_common(1)[0][0] if entities["PER"] else None
             top_location = entities["LOC"].most_common(1)[0][0] if entities["LOC"] else None
@@ -285,17 +357,23 @@ class ContentStatsExtractor(BaseExtractor):
             "end": max(valid_dates) if valid_dates else None,
         }
         
+        if self._sketch_store is not None:
+            self._sketch_store.prune(t.video_id for t in transcripts)
+        
         # Format top lists
-        top_persons = [{"label": p, "value": c} for p, c in all_persons.most_common(20)]
-        top_locations = [{"label": l, "value": c} for l, c in all_locations.most_common(20)]
-        top_organizations = [{"label": o, "value": c} for o, c in all_organizations.most_common(15)]
+        top_persons = [{"label": p, "value": c} for p, c, _, _ in all_persons.top(20)]
+        top_locations = [{"label": l, "value": c} for l, c, _, _ in all_locations.top(20)]
+        top_organizations = [{"label": o, "value": c} for o, c, _, _ in all_organizations.top(15)]
         top_topics = [{"label": t, "value": c} for t, c in all_topics.most_common(12)]
         
-        # Header KPIs - meaningful numbers for the audience
+        # Header KPIs - meaningful numbers for the audience (distinct counts are HyperLogLog estimates)
         header_kpis = {
             "bpks_analyzed": len(transcripts),
-            "unique_persons": len(all_persons),
-            "unique_locations": len(all_locations),
+            "unique_persons": distinct["persons"].count(),
+            "unique_locations": distinct["locations"].count(),
+            "unique_organizations": distinct["organizations"].count(),
+            "vocabulary_size": distinct["vocabulary"].count(),
+            "unique_speakers": distinct["speakers"].count() if self._identity_map else None,
             "total_questions": total_questions,
         }
         
@@ -321,6 +399,8 @@ class ContentStatsExtractor(BaseExtractor):
                 "extractor": self.name,
                 "corpus_size": len(transcripts),
                 "spacy_available": SPACY_AVAILABLE and self._nlp is not None,
+                # Relative standard error of the unique_* / vocabulary_size KPIs
+                "distinct_count_error": round(distinct["persons"].relative_error, 4),
             },
             "header_kpis": header_kpis,
             "statistical_basics": statistical_basics,
@@ -0,0 +1,118 @@
+"""
+Date Cube Extractor.
+Single Responsibility: Build the per-day cube of additive KPIs and distinct-count sketches.
+
+The cube itself (aggregation.cube.DateCube) is saved as numpy arrays for ad-hoc range
+queries; date_cube.json carries the per-day columns and their prefix sums, so the
+dashboard gets the totals of any date range as cumulative[end] - cumulative[start].
+Distinct-count cells merge the per-video sketches content_stats saved to the sketch store.
+"""
+
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from .base import BaseExtractor
+from .content_stats import ContentStatsExtractor
+from ..config import CUBE_DIR
+from ..cube import DateCube
+from ..models.raw_data import BPKTranscript, RTTMEntry
+from ..sketches import HyperLogLog, VideoSketchStore
+
+logger = logging.getLogger(__name__)
+
+
+class DateCubeExtractor(BaseExtractor):
+    """Extracts per-day partial aggregates (date_cube.json) and saves the queryable cube."""
+
+    def __init__(
+        self,
+        content_extractor: Optional[ContentStatsExtractor] = None,
+        cube_dir: Optional[Path] = CUBE_DIR,
+        sketch_store: Optional[VideoSketchStore] = None,
+    ):
+        # Shares topics and dates with content_stats and reads the sketches it stored
+        self._content = content_extractor or ContentStatsExtractor()
+        self.cube_dir = cube_dir
+        self._sketch_store = sketch_store
+
+    @property
+    def name(self) -> str:
+        return "date_cube"
+
+    @property
+    def output_filename(self) -> str:
+        return "date_cube.json"
+
+    def _video_measures(self, transcript: BPKTranscript, entries: List[RTTMEntry]) -> Dict[str, float]:
+        text = transcript.transcript_text
+        measures = {
+            "bpk_count": 1,
+            "duration_seconds": transcript.total_duration,
+            "words": transcript.total_words,
+            "questions": ContentStatsExtractor.count_questions(text),
+            "speakers": len({e.speaker_id for e in entries}),
+            "turns": len(entries),
+        }
+        topics = ContentStatsExtractor.extract_topics(text)
+        for topic in ContentStatsExtractor.TOPIC_KEYWORDS:
+            measures[f"topic:{topic}"] = topics.get(topic, 0)
+        return measures
+
+    def _video_sketches(self, transcript: BPKTranscript, entries: List[RTTMEntry]) -> Dict[str, HyperLogLog]:
+        """Stored sketches of the video; built from the transcript only if none are stored."""
+        sketches = self._sketch_store.load(transcript.video_id) if self._sketch_store is not None else None
+        if sketches is None:
+            entities = self._content.video_entities(transcript)
+            sketches = self._content.video_sketches(transcript, entities, entries)
+        return sketches
+
+    def extract(
+        self,
+        transcripts: List[BPKTranscript],
+        diarization: Dict[str, List[RTTMEntry]],
+    ) -> Dict[str, Any]:
+        """Build the date cube and export its daily columns."""
+
+        if not transcripts:
+            return {"error": "No transcripts provided"}
+
+        rows = []
+        undated = []
+        for transcript in transcripts:
+            date_str = self._content.video_date(transcript)
+            try:
+                day = datetime.strptime(date_str, "%Y-%m-%d").date() if date_str else None
+            except ValueError:
+                day = None
+            if day is None:
+                undated.append(transcript.video_id)
+                continue
+            entries = diarization.get(transcript.video_id, [])
+            rows.append((
+                day.isoformat(),
+                self._video_measures(transcript, entries),
+                self._video_sketches(transcript, entries),
+            ))
+
+        if undated:
+            logger.warning(f"Date cube: {len(undated)} BPKs without a date skipped")
+
+        cube = DateCube.build(rows)
+        if self.cube_dir is not None:
+            cube.save(self.cube_dir)
+
+        return {
+            "metadata": {
+                "extraction_date": datetime.utcnow().isoformat(),
+                "extractor": self.name,
+                "corpus_size": len(transcripts),
+                "dated_bpks": len(rows),
+                "undated_video_ids": undated,
+                "measures": cube.measures,
+                "sketches": list(cube.sketches),
+            },
+            "daily": cube.daily(),
+            "all_time": cube.query(),
+        }
@@ -0,0 +1,168 @@
+"""
+Frequency Distribution Extractor.
+Single Responsibility: Approximate top words, bigrams and repeated sentences in bounded memory.
+
+Every video is counted exactly (bounded by the video's length), reduced to a Space-Saving
+summary and merged into the corpus summary, so memory stays fixed as the corpus grows.
+Each item is reported with its error bound: the true count lies in [value - error, value].
+"""
+
+import logging
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from .base import BaseExtractor
+from ..config import MIN_SENTENCE_WORDS, SKETCH_CAPACITY, TOP_N_RESULTS
+from ..models.raw_data import BPKTranscript, RTTMEntry
+from ..sketches import SpaceSaving
+
+logger = logging.getLogger(__name__)
+
+# German words including hyphenated compounds ("Bund-Länder-Gipfel"); digits are no words
+WORD_RE = re.compile(r"[^\W\d_]+(?:-[^\W\d_]+)*", re.UNICODE)
+_SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+class FrequencyStatsExtractor(BaseExtractor):
+    """Extracts top words, bigrams and sentences (FrequencyDistribution) via heavy-hitter sketches."""
+
+    # German function words and spoken fillers; content words only in top_words/top_bigrams
+    STOPWORDS = {
+        'aber', 'alle', 'allem', 'allen', 'aller', 'alles', 'als', 'also', 'am', 'an', 'ander',
+        'andere', 'anderen', 'anderer', 'anderes', 'auch', 'auf', 'aus', 'bei', 'beim', 'bin',
+        'bis', 'bist', 'bitte', 'da', 'dabei', 'dadurch', 'dafür', 'dagegen', 'daher', 'dahin',
+        'damit', 'danach', 'dann', 'daran', 'darauf', 'daraus', 'darf', 'darin', 'darüber',
+        'darum', 'das', 'dass', 'davon', 'dazu', 'dem', 'den', 'denen', 'denn', 'der', 'deren',
+        'des', 'deshalb', 'dessen', 'die', 'dies', 'diese', 'diesem', 'diesen', 'dieser',
+        'dieses', 'doch', 'dort', 'du', 'durch', 'eben', 'ein', 'eine', 'einem', 'einen',
+        'einer', 'eines', 'einfach', 'einmal', 'er', 'es', 'etwa', 'etwas', 'euch', 'euer',
+        'für', 'ganz', 'gar', 'geben', 'gibt', 'ging', 'gerade', 'gesagt', 'gewesen', 'gut',
+        'habe', 'haben', 'hat', 'hatte', 'hätte', 'hatten', 'hätten', 'heißt', 'hier', 'hin',
+        'hinter', 'ich', 'ihm', 'ihn', 'ihnen', 'ihr', 'ihre', 'ihrem', 'ihren', 'ihrer',
+        'ihres', 'im', 'immer', 'in', 'ins', 'ist', 'ja', 'jede', 'jedem', 'jeden', 'jeder',
+        'jedes', 'jetzt', 'kann', 'kein', 'keine', 'keinem', 'keinen', 'keiner', 'können',
+        'könnte', 'konnte', 'machen', 'macht', 'mal', 'man', 'manche', 'mehr', 'mein', 'meine',
+        'meinem', 'meinen', 'meiner', 'mich', 'mir', 'mit', 'muss', 'müssen', 'nach', 'natürlich',
+        'nein', 'nicht', 'nichts', 'noch', 'nun', 'nur', 'ob', 'oder', 'ohne', 'schon', 'sehr',
+        'sein', 'seine', 'seinem', 'seinen', 'seiner', 'seit', 'sich', 'sie', 'sind', 'so',
+        'soll', 'sollen', 'sollte', 'sondern', 'sozusagen', 'über', 'um', 'und', 'uns', 'unser',
+        'unsere', 'unserem', 'unseren', 'unserer', 'unter', 'viel', 'vielleicht', 'vom', 'von',
+        'vor', 'war', 'wäre', 'waren', 'warum', 'was', 'weil', 'welche', 'welchem', 'welchen',
+        'welcher', 'wenn', 'wer', 'werde', 'werden', 'wie', 'wieder', 'will', 'wir', 'wird',
+        'wirklich', 'wo', 'wollen', 'worden', 'wurde', 'würde', 'wurden', 'würden', 'zu', 'zum',
+        'zur', 'zwar', 'zwischen',
+        # Spoken fillers
+        'äh', 'ähm', 'eh', 'ehm', 'genau', 'halt', 'hm', 'na', 'ok', 'okay', 'quasi',
+        # Press-conference phrasing (address, moderation, hedging)
+        'danke', 'dank', 'deswegen', 'eigentlich', 'frage', 'fragen', 'frau', 'geäußert', 'geht',
+        'gerne', 'glaube', 'herr', 'herrn', 'insofern', 'klar', 'kommen', 'möchte', 'nachfrage',
+        'nochmal', 'sage', 'sagen', 'sagt', 'sehe', 'sehen', 'stehen', 'stelle', 'steht', 'thema',
+        'themen', 'vielen', 'weiter', 'weitere', 'wissen',
+    }
+
+    def __init__(self, capacity: int = SKETCH_CAPACITY, top_n: int = TOP_N_RESULTS):
+        self.capacity = capacity
+        self.top_n = top_n
+
+    @property
+    def name(self) -> str:
+        return "frequency_stats"
+
+    @property
+    def output_filename(self) -> str:
+        return "frequency_distribution.json"
+
+    def _count_video(self, transcript: BPKTranscript) -> Tuple[int, Counter, Counter, Counter, Dict[str, str]]:
+        """Token count and exact content-word, bigram and normalized-sentence counts of one video."""
+        token_count = 0
+        words: Counter = Counter()
+        bigrams: Counter = Counter()
+        for segment in transcript.segments:
+            tokens = [w.lower() for w in WORD_RE.findall(segment.text)]
+            token_count += len(tokens)
+            content = [w if len(w) > 2 and w not in self.STOPWORDS else None for w in tokens]
+            words.update(w for w in content if w)
+            bigrams.update(f"{a} {b}" for a, b in zip(content, content[1:]) if a and b)
+
+        sentences: Counter = Counter()
+        originals: Dict[str, str] = {}
+        text = " ".join(s.text for s in transcript.segments)
+        for sentence in _SENTENCE_SPLIT_RE.split(text):
+            tokens = WORD_RE.findall(sentence.lower())
+            if len(tokens) < MIN_SENTENCE_WORDS:
+                continue
+            key = " ".join(tokens)
+            sentences[key] += 1
+            originals.setdefault(key, sentence.strip())
+
+        return token_count, words, bigrams, sentences, originals
+
+    def _format_top(self, sketch: SpaceSaving, labels: Optional[Dict[str, str]] = None) -> List[Dict[str, Any]]:
+        labels = labels or {}
+        return [
+            {
+                "label": labels.get(item, item),
+                "value": count,
+                "error": error,
+                "guaranteed": guaranteed,
+            }
+            for item, count, error, guaranteed in sketch.top(self.top_n)
+        ]
+
+    def extract(
+        self,
+        transcripts: List[BPKTranscript],
+        diarization: Dict[str, List[RTTMEntry]],
+    ) -> Dict[str, Any]:
+        """Extract approximate top-k words, bigrams and repeated sentences."""
+
+        if not transcripts:
+            return {"error": "No transcripts provided"}
+
+        corpus_words = SpaceSaving(self.capacity)
+        corpus_bigrams = SpaceSaving(self.capacity)
+        corpus_sentences = SpaceSaving(self.capacity)
+        # Display form (first occurrence) of every monitored sentence; pruned with the sketch
+        sentence_labels: Dict[str, str] = {}
+
+        total_words = 0
+        for transcript in transcripts:
+            token_count, words, bigrams, sentences, originals = self._count_video(transcript)
+            total_words += token_count
+            corpus_words.merge(SpaceSaving.from_counts(words, self.capacity))
+            corpus_bigrams.merge(SpaceSaving.from_counts(bigrams, self.capacity))
+            corpus_sentences.merge(SpaceSaving.from_counts(sentences, self.capacity))
+            for key in corpus_sentences.counts:
+                if key not in sentence_labels and key in originals:
+                    sentence_labels[key] = originals[key]
+            sentence_labels = {k: v for k, v in sentence_labels.items() if k in corpus_sentences}
+
+        # Only sentences that actually repeat are interesting
+        top_sentences = [
+            s for s in self._format_top(corpus_sentences, sentence_labels) if s["value"] - s["error"] >= 2
+        ]
+
+        return {
+            "metadata": {
+                "extraction_date": datetime.utcnow().isoformat(),
+                "extractor": self.name,
+                "corpus_size": len(transcripts),
+                "sketch_capacity": self.capacity,
+                # All word tokens; content_words excludes stopwords and words of <= 2 letters
+                "total_words": total_words,
+                "content_words": corpus_words.total,
+                "total_bigrams": corpus_bigrams.total,
+                "total_sentences": corpus_sentences.total,
+                # Largest over-count of any monitored item (never above total / capacity)
+                "max_error": {
+                    "words": max(corpus_words.errors.values(), default=0),
+                    "bigrams": max(corpus_bigrams.errors.values(), default=0),
+                    "sentences": max(corpus_sentences.errors.values(), default=0),
+                },
+            },
+            "top_words": self._format_top(corpus_words),
+            "top_bigrams": self._format_top(corpus_bigrams),
+            "top_sentences": top_sentences,
+        }
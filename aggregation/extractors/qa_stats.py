@@ -0,0 +1,394 @@
+"""
+Q&A Extractor.
+Single Responsibility: Pair journalist questions with the answers that follow them.
+
+Segments are attributed to speakers (largest RTTM overlap) and merged into turns. One
+linear sweep over the turns of a video opens a pair at every question turn and attaches
+the following turns of other speakers as its answer until the next question, so the
+whole archive is processed in time linear to its number of segments.
+
+Evasiveness proxies per answer: stock non-answer phrases, deferrals ("reiche ich nach"),
+and how few of the question's content words the answer picks up.
+"""
+
+import logging
+import re
+from bisect import bisect_right
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .base import BaseExtractor
+from .content_stats import ContentStatsExtractor
+from .frequency_stats import WORD_RE, FrequencyStatsExtractor
+from .timeline import bucket_keys
+from ..config import MIN_QUESTION_WORDS, TOP_N_RESULTS
+from ..models.raw_data import BPKTranscript, RTTMEntry
+from ..search import assign_speakers
+
+logger = logging.getLogger(__name__)
+
+_QUESTION_SENTENCE_RE = re.compile(r"[^.!?]*\?")
+# Moderator prompts ("Gibt es weitere Fragen?") are no questions to the government; matched
+# against the whole stripped sentence so questions merely containing these words survive
+_MODERATION_RE = re.compile(
+    r"^(gibt es )?(noch )?(weitere )?fragen( dazu| zu diesem thema| zu dem komplex| zu diesem komplex)?\?$"
+    r"|^wer (hat|möchte) (noch )?(eine )?(weitere )?(frage|nachfrage)"
+)
+_FOLLOW_UP_RE = re.compile(r"\b(nachfrage|zusatzfrage|rückfrage)")
+_NON_ANSWER_RE = re.compile(
+    r"kann ich (ihnen )?(dazu |hier |jetzt )?(keine|nichts|nicht sagen)"
+    r"|(keine|nichts) (weiteren )?(angaben|sagen|mitteilen)"
+    r"|(kommentieren|bewerten) (wir|ich) (nicht|keine)"
+    r"|äußern (wir|ich) (uns|mich) (dazu )?nicht"
+    r"|nicht spekulieren|hypothetisch|laufenden? verfahren|kein kommentar"
+    r"|verweise (ich )?auf|dazu liegen (mir|uns) keine|keinen neuen stand"
+)
+_DEFERRAL_RE = re.compile(
+    r"nachreichen|nachgereicht|reiche[n]? (ich |wir )?(das |es |gerne |ihnen )*nach"
+    r"|liefern (wir|ich) (das )?nach|(komme|kommen) (ich |wir )?darauf zurück"
+    r"|muss ich (erst |noch )?(nachfragen|prüfen|klären)|frage ich (gerne )?nach"
+)
+
+
+class QAStatsExtractor(BaseExtractor):
+    """Extracts question/answer pairs (qa_transparency.json) from speaker-attributed transcripts."""
+
+    # Upper edges of the answer-length histogram (words); the last bin is open
+    ANSWER_LENGTH_BINS = (30, 60, 90, 120, 150, 200)
+    SHORT_ANSWER_WORDS = 30
+    # Weights of the evasiveness score (0 = direct answer, 1 = no answer)
+    EVASIVENESS_WEIGHTS = {"non_answer": 0.5, "low_overlap": 0.3, "short": 0.2}
+
+    def __init__(
+        self,
+        content_extractor: Optional[ContentStatsExtractor] = None,
+        identity_map: Optional[Dict[str, Dict[str, str]]] = None,
+        top_n: int = TOP_N_RESULTS,
+    ):
+        # Shares topic keywords and date logic with content_stats
+        self._content = content_extractor or ContentStatsExtractor()
+        self._identity_map = identity_map or {}
+        self.top_n = top_n
+        self._topic_re, self._topic_of = ContentStatsExtractor.topic_matcher()
+
+    def set_identity_map(self, identity_map: Dict[str, Dict[str, str]]) -> None:
+        """Set the cross-BPK speaker identity mapping (see aggregation.identity)."""
+        self._identity_map = identity_map
+
+    def _global_speaker_id(self, video_id: str, local_id: str) -> str:
+        """Corpus-wide identity of a diarization label (video-scoped while unresolved)."""
+        if not local_id:
+            return ""
+        mapped = self._identity_map.get(video_id, {}).get(local_id)
+        if mapped:
+            return mapped
+        return f"{video_id}:{local_id}" if self._identity_map else local_id
+
+    @property
+    def name(self) -> str:
+        return "qa_stats"
+
+    @property
+    def output_filename(self) -> str:
+        return "qa_transparency.json"
+
+    def _turns(self, transcript: BPKTranscript, entries: List[RTTMEntry]) -> List[Dict[str, Any]]:
+        """Consecutive segments of the same speaker merged into turns."""
+        video_id = transcript.video_id
+        turns: List[Dict[str, Any]] = []
+        for segment, speaker in zip(transcript.segments, assign_speakers(transcript.segments, entries)):
+            speaker = self._global_speaker_id(video_id, speaker)
+            if turns and turns[-1]["speaker"] == speaker:
+                turns[-1]["end"] = segment.end
+                turns[-1]["texts"].append(segment.text)
+            else:
+                turns.append({"speaker": speaker, "start": segment.start, "end": segment.end, "texts": [segment.text]})
+        for turn in turns:
+            turn["text"] = " ".join(t.strip() for t in turn.pop("texts"))
+        return turns
+
+    @staticmethod
+    def question_count(text: str) -> int:
+        """Number of '?' sentences that are substantial and not moderation."""
+        return sum(
+            1 for sentence in _QUESTION_SENTENCE_RE.findall(text.lower())
+            if len(sentence.split()) >= MIN_QUESTION_WORDS
+            and not _MODERATION_RE.search(sentence.strip(" ,;:-–\"„“"))
+        )
+
+    def _is_question(self, text: str) -> bool:
+        return self.question_count(text) > 0
+
+    def _topic(self, text: str) -> Optional[str]:
+        topics = Counter(self._topic_of[m] for m in self._topic_re.findall(text.lower()))
+        return topics.most_common(1)[0][0] if topics else None
+
+    @staticmethod
+    def _content_stems(text: str) -> set:
+        """Crude stems (6-letter prefixes) of the content words of a text."""
+        return {
+            w[:6] for w in (w.lower() for w in WORD_RE.findall(text))
+            if len(w) > 3 and w not in FrequencyStatsExtractor.STOPWORDS
+        }
+
+    def _pair(self, question: Dict[str, Any], answers: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Measures of one question and its answer turns."""
+        answer_text = " ".join(t["text"] for t in answers)
+        answer_words = len(answer_text.split())
+        question_stems = self._content_stems(question["text"])
+        overlap = (
+            len(question_stems & self._content_stems(answer_text)) / len(question_stems)
+            if question_stems else 1.0
+        )
+        lowered = answer_text.lower()
+        non_answer = bool(_NON_ANSWER_RE.search(lowered))
+        deferral = bool(_DEFERRAL_RE.search(lowered))
+        if answers:
+            weights = self.EVASIVENESS_WEIGHTS
+            evasiveness = (
+                weights["non_answer"] * non_answer
+                + weights["low_overlap"] * (1 - overlap)
+                + weights["short"] * (answer_words < self.SHORT_ANSWER_WORDS)
+            )
+            by_words = Counter()
+            for turn in answers:
+                by_words[turn["speaker"]] += len(turn["text"].split())
+            answerer = by_words.most_common(1)[0][0]
+        else:
+            evasiveness, answerer = 1.0, None
+        return {
+            "asker": question["speaker"],
+            "answerer": answerer,
+            "start": question["start"],
+            "question": question["text"],
+            "answer": answer_text,
+            "answered": bool(answers),
+            "latency": max(0.0, answers[0]["start"] - question["end"]) if answers else None,
+            "answer_words": answer_words,
+            "answer_seconds": sum(t["end"] - t["start"] for t in answers),
+            "overlap": overlap,
+            "non_answer": non_answer,
+            "deferral": deferral,
+            "evasiveness": round(evasiveness, 3),
+        }
+
+    def _video_pairs(self, transcript: BPKTranscript, entries: List[RTTMEntry]) -> List[Dict[str, Any]]:
+        """Single sweep over the turns of one video."""
+        pairs: List[Dict[str, Any]] = []
+        question: Optional[Dict[str, Any]] = None
+        answers: List[Dict[str, Any]] = []
+        depth = 0
+        thread_start = 0.0
+        previous_topic = None
+
+        def close() -> None:
+            nonlocal previous_topic
+            pair = self._pair(question, answers)
+            pair["topic"] = question["topic"] or (previous_topic if question["follow_up"] else None)
+            pair["follow_up"] = question["follow_up"]
+            pair["depth"] = question["depth"]
+            pair["thread_start"] = question["thread_start"]
+            previous_topic = pair["topic"]
+            pairs.append(pair)
+
+        for turn in self._turns(transcript, entries):
+            if self._is_question(turn["text"]):
+                if question is not None:
+                    close()
+                topic = self._topic(turn["text"])
+                # Same asker on the same topic, or an announced "Nachfrage"; a topic switch
+                # ends the thread (diarization may merge moderator and journalists)
+                follow_up = False
+                if question is not None:
+                    same_thread = (
+                        turn["speaker"] and turn["speaker"] == question["speaker"]
+                        and not (topic and previous_topic and topic != previous_topic)
+                    )
+                    follow_up = bool(same_thread or _FOLLOW_UP_RE.search(turn["text"].lower()))
+                depth = depth + 1 if follow_up else 1
+                if not follow_up:
+                    thread_start = turn["start"]
+                question = dict(
+                    turn, topic=topic, follow_up=follow_up,
+                    depth=depth, thread_start=thread_start,
+                )
+                answers = []
+            elif question is not None and turn["speaker"] != question["speaker"]:
+                answers.append(turn)
+        if question is not None:
+            close()
+        return pairs
+
+    @staticmethod
+    def _percentile(values: List[float], q: float) -> float:
+        if not values:
+            return 0.0
+        ordered = sorted(values)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    @staticmethod
+    def timestamp(seconds: float) -> str:
+        minutes, secs = divmod(int(seconds), 60)
+        hours, minutes = divmod(minutes, 60)
+        return f"{hours:02d}:{minutes:02d}:{secs:02d}"
+
+    @staticmethod
+    def _context(text: str, pattern: Optional[re.Pattern] = None, width: int = 150) -> str:
+        """Snippet around the first match of pattern (or the start of the text)."""
+        match = pattern.search(text.lower()) if pattern else None
+        if match is None:
+            return text[:2 * width]
+        lo, hi = max(0, match.start() - width), match.end() + width
+        return ("..." if lo else "") + text[lo:hi] + ("..." if hi < len(text) else "")
+
+    def _summarize(self, pairs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Averages and rates over a group of pairs (empty group -> zeros)."""
+        answered = [p for p in pairs if p["answered"]]
+        latencies = [p["latency"] for p in answered]
+        n = len(pairs)
+        return {
+            "questions": n,
+            "follow_ups": sum(p["follow_up"] for p in pairs),
+            "answered": len(answered),
+            "avg_answer_latency_sec": round(sum(latencies) / len(latencies), 1) if latencies else 0,
+            "avg_answer_words": round(sum(p["answer_words"] for p in answered) / len(answered), 1) if answered else 0,
+            "avg_answer_seconds": round(sum(p["answer_seconds"] for p in answered) / len(answered), 1) if answered else 0,
+            "non_answer_rate": round(100 * sum(p["non_answer"] for p in pairs) / n, 1) if n else 0,
+            "deferral_rate": round(100 * sum(p["deferral"] for p in pairs) / n, 1) if n else 0,
+            "avg_evasiveness": round(sum(p["evasiveness"] for p in pairs) / n, 3) if n else 0,
+        }
+
+    def extract(
+        self,
+        transcripts: List[BPKTranscript],
+        diarization: Dict[str, List[RTTMEntry]],
+    ) -> Dict[str, Any]:
+        """Extract question/answer pairs and their per-speaker, per-topic and per-quarter aggregates."""
+
+        if not transcripts:
+            return {"error": "No transcripts provided"}
+
+        pairs: List[Dict[str, Any]] = []
+        for transcript in transcripts:
+            entries = diarization.get(transcript.video_id, [])
+            if not entries:
+                continue
+            date = self._content.video_date(transcript)
+            for pair in self._video_pairs(transcript, entries):
+                pair["video_id"] = transcript.video_id
+                pair["date"] = date
+                pairs.append(pair)
+
+        logger.info(f"Q&A: {len(pairs)} questions paired with answers")
+        summary = self._summarize(pairs)
+        latencies = [p["latency"] for p in pairs if p["answered"]]
+        summary["p90_answer_latency_sec"] = round(self._percentile(latencies, 0.9), 1)
+        summary["max_follow_up_chain"] = max((p["depth"] for p in pairs), default=0)
+
+        # Fixed-bin answer length histogram
+        bins = self.ANSWER_LENGTH_BINS
+        counts = [0] * (len(bins) + 1)
+        for pair in pairs:
+            if pair["answered"]:
+                counts[bisect_right(bins, pair["answer_words"] - 1)] += 1
+        edges = [0] + [b + 1 for b in bins]
+        length_distribution = [
+            {
+                "range": f"{edges[i]}-{bins[i]}" if i < len(bins) else f"{edges[i]}+",
+                "count": count,
+                "is_short": i < len(bins) and bins[i] <= self.SHORT_ANSWER_WORDS,
+            }
+            for i, count in enumerate(counts)
+        ]
+
+        # Group pairs per asker, answerer, topic and quarter
+        asked = defaultdict(list)
+        answered_by = defaultdict(list)
+        by_topic = defaultdict(list)
+        by_quarter = defaultdict(list)
+        for pair in pairs:
+            if pair["asker"]:
+                asked[pair["asker"]].append(pair)
+            if pair["answerer"]:
+                answered_by[pair["answerer"]].append(pair)
+            by_topic[pair["topic"] or "Sonstiges"].append(pair)
+            try:
+                day = datetime.strptime(pair["date"], "%Y-%m-%d").date() if pair["date"] else None
+            except ValueError:
+                day = None
+            if day is not None:
+                by_quarter[bucket_keys(day)["quarter"]].append(pair)
+
+        per_speaker = []
+        for speaker in set(asked) | set(answered_by):
+            questions = asked.get(speaker, [])
+            answers = self._summarize(answered_by.get(speaker, []))
+            per_speaker.append({
+                "speaker_id": speaker,
+                "questions_asked": len(questions),
+                "follow_ups_asked": sum(p["follow_up"] for p in questions),
+                "answers_given": answers["questions"],
+                "avg_answer_latency_sec": answers["avg_answer_latency_sec"],
+                "avg_answer_words": answers["avg_answer_words"],
+                "non_answer_rate": answers["non_answer_rate"],
+                "deferral_rate": answers["deferral_rate"],
+                "avg_evasiveness": answers["avg_evasiveness"],
+            })
+        per_speaker.sort(key=lambda s: (s["questions_asked"] + s["answers_given"], s["speaker_id"]), reverse=True)
+
+        per_topic = [dict(topic=topic, **self._summarize(group)) for topic, group in by_topic.items()]
+        per_topic.sort(key=lambda t: t["questions"], reverse=True)
+
+        per_quarter = [
+            dict(quartal=f"Q{key[-1]} {key[:4]}", **self._summarize(by_quarter[key]))
+            for key in sorted(by_quarter)
+        ]
+
+        def moment(pair: Dict[str, Any], text: str, start: Optional[float] = None) -> Dict[str, Any]:
+            start = pair["start"] if start is None else start
+            return {
+                "video_id": pair["video_id"],
+                "date": pair["date"],
+                "timestamp": self.timestamp(start),
+                "url": f"https://www.youtube.com/watch?v={pair['video_id']}&t={int(start)}s",
+                "topic": pair["topic"],
+                "text": text,
+            }
+
+        # Deepest follow-up thread per thread start
+        threads: Dict[tuple, Dict[str, Any]] = {}
+        for pair in pairs:
+            key = (pair["video_id"], pair["thread_start"])
+            if key not in threads or pair["depth"] > threads[key]["depth"]:
+                threads[key] = pair
+        top_threads = sorted(threads.values(), key=lambda p: p["depth"], reverse=True)[:10]
+
+        deferrals = [p for p in pairs if p["deferral"]]
+        deferrals.sort(key=lambda p: (p["date"] or "", p["start"]), reverse=True)
+        evasive = sorted((p for p in pairs if p["answered"]), key=lambda p: p["evasiveness"], reverse=True)
+
+        return {
+            "metadata": {
+                "extraction_date": datetime.utcnow().isoformat(),
+                "extractor": self.name,
+                "corpus_size": len(transcripts),
+                "videos_with_diarization": len({p["video_id"] for p in pairs}),
+                "min_question_words": MIN_QUESTION_WORDS,
+                "evasiveness_weights": self.EVASIVENESS_WEIGHTS,
+            },
+            "summary": summary,
+            "answer_length_distribution": length_distribution,
+            "per_speaker": per_speaker[:self.top_n],
+            "per_topic": per_topic,
+            "per_quarter": per_quarter,
+            "top_follow_up_threads": [
+                dict(moment(p, self._context(p["question"]), p["thread_start"]), depth=p["depth"], asker=p["asker"])
+                for p in top_threads
+            ],
+            "deferrals": [moment(p, self._context(p["answer"], _DEFERRAL_RE)) for p in deferrals[:self.top_n]],
+            "top_non_answers": [
+                dict(moment(p, self._context(p["answer"], _NON_ANSWER_RE)), score=p["evasiveness"], answerer=p["answerer"])
+                for p in evasive[:10]
+            ],
+        }
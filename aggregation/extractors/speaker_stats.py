@@ -3,17 +3,45 @@ Speaker Statistics Extractor.
 Single Responsibility: Extract detailed speaker analysis from diarization data.
 """
 
-from collections import defaultdict
+import base64
+from collections import Counter, defaultdict
 from datetime import datetime
-from typing import Any, Dict, List, Tuple
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
 
 from .base import BaseExtractor
+from ..config import ACTIVITY_BIN_SECONDS, INTERRUPTION_MATRIX_SIZE, MIN_INTERRUPTION_OVERLAP_SECONDS
 from ..models.raw_data import BPKTranscript, RTTMEntry
 
 
 class SpeakerStatsExtractor(BaseExtractor):
     """Extracts detailed speaker statistics from RTTM diarization data."""
     
+    # Inner bin edges (seconds) of the fixed histograms; counts[k] covers [edges[k-1], edges[k]),
+    # the first and last bins are open, so per-BPK histograms sum to the corpus histogram.
+    # Negative response gaps are overlapping speaker changes.
+    GAP_HISTOGRAM_EDGES = (-2.0, -1.0, -0.5, 0.0, 0.25, 0.5, 1.0, 2.0, 5.0)
+    RUN_SECONDS_EDGES = (5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0)
+    
+    def __init__(self, identity_map: Optional[Dict[str, Dict[str, str]]] = None):
+        # video_id -> {local RTTM label -> corpus-wide speaker ID}
+        self._identity_map = identity_map or {}
+    
+    def set_identity_map(self, identity_map: Dict[str, Dict[str, str]]) -> None:
+        """Set the cross-BPK speaker identity mapping (see aggregation.identity)."""
+        self._identity_map = identity_map
+    
+    def _global_speaker_id(self, video_id: str, local_id: str) -> str:
+        """
+        Map a per-video diarization label to its corpus-wide identity.
+        Unresolved speakers stay video-scoped so SPEAKER_00 of two BPKs is never merged.
+        """
+        mapped = self._identity_map.get(video_id, {}).get(local_id)
+        if mapped:
+            return mapped
+        return f"{video_id}:{local_id}" if self._identity_map else local_id
+    
     @property
     def name(self) -> str:
         return "speaker_stats"
@@ -68,6 +96,106 @@ class SpeakerStatsExtractor(BaseExtractor):
         
         return merged
     
+    def _sweep_overlaps(self, entries: List[RTTMEntry]) -> Dict[str, Any]:
+        """
+        Sweep line over the RTTM intervals (O(n log n)): cross-talk time and, per ordered
+        speaker pair, interruptions (a speaker starts while another is talking, overlapping
+        at least MIN_INTERRUPTION_OVERLAP_SECONDS) and their overlap seconds. An interruption
+        is successful if the interrupted speaker stops before the interrupter.
+        """
+        # Ends sort before starts at the same instant: back-to-back turns don't overlap
+        events = sorted(
+            [(e.start, 1, i) for i, e in enumerate(entries)] + [(e.end, 0, i) for i, e in enumerate(entries)]
+        )
+        active: Dict[int, RTTMEntry] = {}
+        speaking: Counter = Counter()
+        overlap_seconds = 0.0
+        last_time = 0.0
+        interruptions: Counter = Counter()
+        successful: Counter = Counter()
+        pair_overlap: Dict[Tuple[str, str], float] = defaultdict(float)
+        
+        for time, is_start, i in events:
+            if len(speaking) > 1:
+                overlap_seconds += time - last_time
+            last_time = time
+            entry = entries[i]
+            if not is_start:
+                if i in active:
+                    del active[i]
+                    speaking[entry.speaker_id] -= 1
+                    if not speaking[entry.speaker_id]:
+                        del speaking[entry.speaker_id]
+                continue
+            if entry.end <= entry.start:
+                continue
+            for other in active.values():
+                if other.speaker_id == entry.speaker_id:
+                    continue
+                shared = min(other.end, entry.end) - entry.start
+                pair = (entry.speaker_id, other.speaker_id)
+                pair_overlap[pair] += shared
+                if shared >= MIN_INTERRUPTION_OVERLAP_SECONDS:
+                    interruptions[pair] += 1
+                    if other.end < entry.end:
+                        successful[pair] += 1
+            active[i] = entry
+            speaking[entry.speaker_id] += 1
+        
+        return {
+            "overlap_seconds": overlap_seconds,
+            "interruptions": interruptions,
+            "successful": successful,
+            "pair_overlap": pair_overlap,
+        }
+    
+    @staticmethod
+    def _histogram(values: np.ndarray, edges: Tuple[float, ...]) -> np.ndarray:
+        """Counts per fixed bin (len(edges) + 1 bins, open at both ends)."""
+        return np.bincount(np.searchsorted(edges, values, side="right"), minlength=len(edges) + 1)
+    
+    def _turn_taking(self, merged_turns: List[Dict[str, Any]], speaker_ids: List[str]) -> Dict[str, Any]:
+        """
+        Transition matrix (who follows whom), response gaps at speaker changes and runs of
+        consecutive turns by the same speaker, vectorized over columnar turn arrays.
+        """
+        row_of = {speaker_id: i for i, speaker_id in enumerate(speaker_ids)}
+        n_speakers = len(speaker_ids)
+        codes = np.array([row_of[t["speaker_id"]] for t in merged_turns], dtype=np.int64)
+        starts = np.array([t["start"] for t in merged_turns], dtype=np.float64)
+        ends = np.array([t["end"] for t in merged_turns], dtype=np.float64)
+        
+        # transitions[i][j]: turns of speakers[j] directly following a turn of speakers[i]
+        transitions = np.bincount(
+            codes[:-1] * n_speakers + codes[1:], minlength=n_speakers * n_speakers
+        ).reshape(n_speakers, n_speakers)
+        
+        changes = codes[1:] != codes[:-1]
+        gaps = (starts[1:] - ends[:-1])[changes]
+        
+        # Runs begin at the first turn and after every speaker change, end before every
+        # change and at the last turn
+        has_turns = len(codes) > 0
+        run_starts = np.flatnonzero(np.r_[has_turns, changes])
+        run_ends = np.flatnonzero(np.r_[changes, has_turns])
+        run_turns = run_ends - run_starts + 1
+        run_seconds = ends[run_ends] - starts[run_starts]
+        
+        return {
+            "transitions": transitions.tolist(),
+            "speaker_changes": int(changes.sum()),
+            "median_response_gap_seconds": round(float(np.median(gaps)), 2) if len(gaps) else 0,
+            "gap_histogram": self._histogram(gaps, self.GAP_HISTOGRAM_EDGES).tolist(),
+            "runs": {
+                "count": len(run_starts),
+                "avg_turns": round(float(run_turns.mean()), 2) if len(run_turns) else 0,
+                "max_turns": int(run_turns.max(initial=0)),
+                "avg_seconds": round(float(run_seconds.mean()), 2) if len(run_seconds) else 0,
+                "max_seconds": round(float(run_seconds.max(initial=0)), 2),
+                "seconds_histogram": self._histogram(run_seconds, self.RUN_SECONDS_EDGES).tolist(),
+            },
+        }
+    
     def _get_text_for_turn(
         self, 
         transcript: BPKTranscript, 
@@ -87,6 +215,99 @@ class SpeakerStatsExtractor(BaseExtractor):
         
         return text, word_count
     
+    @staticmethod
+    def _bin_intervals(
+        starts: np.ndarray,
+        ends: np.ndarray,
+        rows: np.ndarray,
+        weights: np.ndarray,
+        n_rows: int,
+        n_bins: int,
+        bin_seconds: float,
+    ) -> np.ndarray:
+        """
+        (n_rows x n_bins) sum of weight * covered seconds per bin. Intervals spanning bin
+        edges add their partial first/last bins directly and their full inner bins via a
+        difference array, so the cost is linear in intervals + bins.
+        """
+        matrix = np.zeros((n_rows, n_bins), dtype=np.float64)
+        keep = ends > starts
+        starts, ends, rows, weights = starts[keep], ends[keep], rows[keep], weights[keep]
+        if not len(starts):
+            return matrix
+        first = np.minimum((starts // bin_seconds).astype(np.int64), n_bins - 1)
+        last = np.minimum((ends // bin_seconds).astype(np.int64), n_bins - 1)
+        single = first == last
+        # Interval inside one bin
+        np.add.at(matrix, (rows[single], first[single]), (ends - starts)[single] * weights[single])
+        # Partial first and last bin of spanning intervals
+        span = ~single
+        head = (first[span] + 1) * bin_seconds - starts[span]
+        tail = np.minimum(ends[span], (last[span] + 1) * bin_seconds) - last[span] * bin_seconds
+        np.add.at(matrix, (rows[span], first[span]), head * weights[span])
+        np.add.at(matrix, (rows[span], last[span]), tail * weights[span])
+        # Full bins strictly between first and last
+        diff = np.zeros((n_rows, n_bins + 1), dtype=np.float64)
+        np.add.at(diff, (rows[span], first[span] + 1), weights[span])
+        np.add.at(diff, (rows[span], last[span]), -weights[span])
+        matrix += np.cumsum(diff, axis=1)[:, :n_bins] * bin_seconds
+        return matrix
+    
+    @staticmethod
+    def _encode(array: np.ndarray) -> str:
+        """Base64 of the array's little-endian bytes (row-major)."""
+        return base64.b64encode(array.astype(array.dtype.newbyteorder("<")).tobytes()).decode("ascii")
+    
+    def _activity_matrix(
+        self,
+        transcript: BPKTranscript,
+        entries: List[RTTMEntry],
+        speaker_ids: List[str],
+    ) -> Dict[str, Any]:
+        """
+        Seconds spoken per speaker per minute (uint8, one row per entry of speaker_ids, i.e.
+        of the BPK's `speakers` list) and words per minute (uint16), base64-encoded.
+        """
+        bin_seconds = ACTIVITY_BIN_SECONDS
+        row_of = {speaker_id: i for i, speaker_id in enumerate(speaker_ids)}
+        entries = [e for e in entries if e.speaker_id in row_of]
+        seg_starts = np.array([s.start for s in transcript.segments], dtype=np.float64)
+        seg_ends = np.array([s.end for s in transcript.segments], dtype=np.float64)
+        rttm_starts = np.array([e.start for e in entries], dtype=np.float64)
+        rttm_ends = np.array([e.end for e in entries], dtype=np.float64)
+        end = max(transcript.total_duration, seg_ends.max(initial=0), rttm_ends.max(initial=0))
+        n_bins = max(1, int(np.ceil(end / bin_seconds)))
+        
+        seconds = self._bin_intervals(
+            rttm_starts, rttm_ends,
+            np.array([row_of[e.speaker_id] for e in entries], dtype=np.int64),
+            np.ones(len(entries)), len(speaker_ids), n_bins, bin_seconds,
+        )
+        # Words spread evenly over their segment's span
+        seg_words = np.array([len(s.text.split()) for s in transcript.segments], dtype=np.float64)
+        durations = seg_ends - seg_starts
+        density = np.divide(seg_words, durations, out=np.zeros_like(seg_words), where=durations > 0)
+        words = self._bin_intervals(
+            seg_starts, seg_ends, np.zeros(len(seg_starts), dtype=np.int64),
+            density, 1, n_bins, bin_seconds,
+        )[0]
+        
+        return {
+            "bin_seconds": bin_seconds,
+            "minutes": n_bins,
+            "encoding": "base64",
+            "seconds_per_speaker": {
+                "dtype": "uint8",
+                "shape": [len(speaker_ids), n_bins],
+                "data": self._encode(np.clip(np.rint(seconds), 0, 255).astype(np.uint8)),
+            },
+            "words": {
+                "dtype": "uint16",
+                "shape": [n_bins],
+                "data": self._encode(np.clip(np.rint(words), 0, 65535).astype(np.uint16)),
+            },
+        }
+    
     def _calculate_speaker_metrics(
         self,
         turns: List[Dict[str, Any]],
@@ -131,7 +352,16 @@ class SpeakerStatsExtractor(BaseExtractor):
             "total_words": 0,
             "bpk_appearances": 0,
             "turns": [],
+            "interruptions_made": 0,
+            "times_interrupted": 0,
         })
+        # (interrupter, interrupted) global IDs -> corpus totals
+        corpus_interruptions: Counter = Counter()
+        corpus_successful: Counter = Counter()
+        corpus_pair_overlap: Dict[Tuple[str, str], float] = defaultdict(float)
+        corpus_overlap_seconds = 0.0
+        corpus_gap_histogram = np.zeros(len(self.GAP_HISTOGRAM_EDGES) + 1, dtype=np.int64)
+        corpus_run_histogram = np.zeros(len(self.RUN_SECONDS_EDGES) + 1, dtype=np.int64)
         
         for video_id, entries in diarization.items():
             transcript = transcript_lookup.get(video_id)
@@ -154,21 +384,57 @@ class SpeakerStatsExtractor(BaseExtractor):
                 turn["word_count"] = word_count
                 speaker_turns[turn["speaker_id"]].append(turn)
             
+            # Cross-talk and interruptions between different speakers
+            overlaps = self._sweep_overlaps(entries)
+            made = Counter()
+            received = Counter()
+            for (interrupter, interrupted), count in overlaps["interruptions"].items():
+                made[interrupter] += count
+                received[interrupted] += count
+            
             # Calculate per-speaker metrics for this BPK
             bpk_speakers = []
             for speaker_id, turns in speaker_turns.items():
                 metrics = self._calculate_speaker_metrics(turns, total_duration)
-                metrics["speaker_id"] = speaker_id
+                global_id = self._global_speaker_id(video_id, speaker_id)
+                metrics["speaker_id"] = global_id
+                metrics["local_speaker_id"] = speaker_id
+                metrics["interruptions_made"] = made[speaker_id]
+                metrics["times_interrupted"] = received[speaker_id]
                 bpk_speakers.append(metrics)
                 
                 # Update global stats
-                global_speaker_stats[speaker_id]["total_speaking_time"] += metrics["total_speaking_time_seconds"]
-                global_speaker_stats[speaker_id]["total_turns"] += metrics["turn_count"]
-                global_speaker_stats[speaker_id]["total_words"] += metrics["total_words"]
-                global_speaker_stats[speaker_id]["bpk_appearances"] += 1
+                global_speaker_stats[global_id]["total_speaking_time"] += metrics["total_speaking_time_seconds"]
+                global_speaker_stats[global_id]["total_turns"] += metrics["turn_count"]
+                global_speaker_stats[global_id]["total_words"] += metrics["total_words"]
+                global_speaker_stats[global_id]["bpk_appearances"] += 1
+                global_speaker_stats[global_id]["interruptions_made"] += made[speaker_id]
+                global_speaker_stats[global_id]["times_interrupted"] += received[speaker_id]
+            
+            bpk_pairs = []
+            for pair, overlap in overlaps["pair_overlap"].items():
+                global_pair = (self._global_speaker_id(video_id, pair[0]), self._global_speaker_id(video_id, pair[1]))
+                corpus_pair_overlap[global_pair] += overlap
+                corpus_interruptions[global_pair] += overlaps["interruptions"][pair]
+                corpus_successful[global_pair] += overlaps["successful"][pair]
+                if overlaps["interruptions"][pair]:
+                    bpk_pairs.append({
+                        "interrupter": global_pair[0],
+                        "interrupted": global_pair[1],
+                        "count": overlaps["interruptions"][pair],
+                        "successful": overlaps["successful"][pair],
+                        "overlap_seconds": round(overlap, 2),
+                    })
+            bpk_pairs.sort(key=lambda x: (x["count"], x["overlap_seconds"]), reverse=True)
+            corpus_overlap_seconds += overlaps["overlap_seconds"]
             
-            # Sort by speaking time
+            # Sort by speaking time; transition and activity rows follow this order
             bpk_speakers.sort(key=lambda x: x["total_speaking_time_seconds"], reverse=True)
+            speaker_order = [m["local_speaker_id"] for m in bpk_speakers]
+            
+            turn_taking = self._turn_taking(merged_turns, speaker_order)
+            corpus_gap_histogram += turn_taking["gap_histogram"]
+            corpus_run_histogram += turn_taking["runs"]["seconds_histogram"]
             
             # Calculate turn dynamics
             turn_changes = len(merged_turns) - 1
@@ -187,7 +453,14 @@ class SpeakerStatsExtractor(BaseExtractor):
                 "total_turns": len(merged_turns),
                 "turn_changes": turn_changes,
                 "avg_turn_gap_seconds": round(avg_turn_gap, 2),
+                "overlap_seconds": round(overlaps["overlap_seconds"], 2),
+                "overlap_percent": round(overlaps["overlap_seconds"] / total_duration * 100, 2) if total_duration > 0 else 0,
+                "interruption_count": sum(overlaps["interruptions"].values()),
+                "interruption_pairs": bpk_pairs,
+                # Rows/columns in the order of `speakers`
+                "turn_taking": turn_taking,
                 "speakers": bpk_speakers,
+                "activity": self._activity_matrix(transcript, entries, speaker_order),
             })
         
         # Sort by date
@@ -205,18 +478,45 @@ class SpeakerStatsExtractor(BaseExtractor):
                 "bpk_appearances": stats["bpk_appearances"],
                 "avg_speaking_time_per_bpk": round(stats["total_speaking_time"] / stats["bpk_appearances"], 2) if stats["bpk_appearances"] > 0 else 0,
                 "avg_turns_per_bpk": round(stats["total_turns"] / stats["bpk_appearances"], 1) if stats["bpk_appearances"] > 0 else 0,
+                "interruptions_made": stats["interruptions_made"],
+                "times_interrupted": stats["times_interrupted"],
             })
         
         # Sort by total speaking time
         speaker_rankings.sort(key=lambda x: x["total_speaking_time_seconds"], reverse=True)
         
+        # Interruption matrix over the speakers most involved in interruptions
+        involvement = Counter()
+        for (interrupter, interrupted), count in corpus_interruptions.items():
+            involvement[interrupter] += count
+            involvement[interrupted] += count
+        matrix_speakers = [s for s, count in involvement.most_common(INTERRUPTION_MATRIX_SIZE) if count]
+        interruption_matrix = {
+            # counts[i][j]: how often speakers[i] interrupted speakers[j]
+            "speakers": matrix_speakers,
+            "counts": [[corpus_interruptions[(a, b)] for b in matrix_speakers] for a in matrix_speakers],
+            "successful": [[corpus_successful[(a, b)] for b in matrix_speakers] for a in matrix_speakers],
+            "overlap_seconds": [[round(corpus_pair_overlap[(a, b)], 1) for b in matrix_speakers] for a in matrix_speakers],
+            "total_interruptions": sum(corpus_interruptions.values()),
+            "total_overlap_seconds": round(corpus_overlap_seconds, 2),
+        }
+        
         return {
             "metadata": {
                 "extraction_date": datetime.utcnow().isoformat(),
                 "extractor": self.name,
                 "total_bpks_analyzed": len(per_bpk_analysis),
                 "total_unique_speakers": len(speaker_rankings),
+                "speaker_identity_resolved": bool(self._identity_map),
+                "min_interruption_overlap_seconds": MIN_INTERRUPTION_OVERLAP_SECONDS,
             },
             "global_speaker_rankings": speaker_rankings,
+            "interruption_matrix": interruption_matrix,
+            "turn_taking": {
+                "gap_histogram_edges": list(self.GAP_HISTOGRAM_EDGES),
+                "gap_histogram": corpus_gap_histogram.tolist(),
+                "run_seconds_edges": list(self.RUN_SECONDS_EDGES),
+                "run_seconds_histogram": corpus_run_histogram.tolist(),
+            },
             "per_bpk_analysis": per_bpk_analysis,
         }
@@ -0,0 +1,171 @@
+"""
+Timeline Extractor.
+Single Responsibility: Aggregate per-BPK statistics into day/week/month/quarter buckets.
+
+Buckets form a pyramid: a BPK is added to its day bucket and, in the same pass, to the
+week, month and quarter buckets above it, so adding a BPK only touches its own four
+buckets. Top lists are mergeable Space-Saving summaries, sums are plain counters.
+Each level is written column-wise (one array per metric, aligned with `bucket`).
+"""
+
+import logging
+from collections import Counter
+from datetime import date as Date, datetime
+from typing import Any, Dict, List, Optional
+
+from .base import BaseExtractor
+from .content_stats import ContentStatsExtractor
+from .frequency_stats import WORD_RE, FrequencyStatsExtractor
+from ..models.raw_data import BPKTranscript, RTTMEntry
+from ..sketches import SpaceSaving
+
+logger = logging.getLogger(__name__)
+
+LEVELS = ("day", "week", "month", "quarter")
+
+
+def bucket_keys(day: Date) -> Dict[str, str]:
+    """Bucket label of a date on every level (ISO weeks, calendar quarters)."""
+    iso_year, iso_week, _ = day.isocalendar()
+    return {
+        "day": day.isoformat(),
+        "week": f"{iso_year}-W{iso_week:02d}",
+        "month": f"{day.year}-{day.month:02d}",
+        "quarter": f"{day.year}-Q{(day.month - 1) // 3 + 1}",
+    }
+
+
+class _Bucket:
+    """Additive statistics of one time bucket."""
+
+    def __init__(self, capacity: int):
+        self.bpk_count = 0
+        self.duration_seconds = 0.0
+        self.words = 0
+        self.questions = 0
+        self.topics: Counter = Counter()
+        self.persons = SpaceSaving(capacity)
+        self.locations = SpaceSaving(capacity)
+        self.terms = SpaceSaving(capacity)
+
+    def add(self, stats: Dict[str, Any]) -> None:
+        self.bpk_count += 1
+        self.duration_seconds += stats["duration_seconds"]
+        self.words += stats["words"]
+        self.questions += stats["questions"]
+        self.topics.update(stats["topics"])
+        self.persons.merge(stats["persons"])
+        self.locations.merge(stats["locations"])
+        self.terms.merge(stats["terms"])
+
+
+class TimelinePyramid:
+    """Day -> week/month -> quarter buckets, updated per BPK."""
+
+    def __init__(self, capacity: int = 200):
+        self.capacity = capacity
+        self.levels: Dict[str, Dict[str, _Bucket]] = {level: {} for level in LEVELS}
+
+    def add(self, day: Date, stats: Dict[str, Any]) -> None:
+        for level, key in bucket_keys(day).items():
+            bucket = self.levels[level].get(key)
+            if bucket is None:
+                bucket = self.levels[level][key] = _Bucket(self.capacity)
+            bucket.add(stats)
+
+    def columns(self, level: str, topics: List[str], top_n: int) -> Dict[str, Any]:
+        """One level as aligned arrays, buckets in chronological order."""
+        keys = sorted(self.levels[level])
+        buckets = [self.levels[level][key] for key in keys]
+        return {
+            "bucket": keys,
+            "bpk_count": [b.bpk_count for b in buckets],
+            "duration_minutes": [round(b.duration_seconds / 60, 1) for b in buckets],
+            "words": [b.words for b in buckets],
+            "questions": [b.questions for b in buckets],
+            "topics": {topic: [b.topics.get(topic, 0) for b in buckets] for topic in topics},
+            "top_persons": [[item for item, *_ in b.persons.top(top_n)] for b in buckets],
+            "top_locations": [[item for item, *_ in b.locations.top(top_n)] for b in buckets],
+            "top_terms": [[item for item, *_ in b.terms.top(top_n)] for b in buckets],
+        }
+
+
+class TimelineExtractor(BaseExtractor):
+    """Extracts the corpus timeline (timeline.json) on day, week, month and quarter level."""
+
+    def __init__(self, content_extractor: Optional[ContentStatsExtractor] = None, top_n: int = 10):
+        # Shares NER results (memoized per video) and topic/date logic with content_stats
+        self._content = content_extractor or ContentStatsExtractor()
+        self.top_n = top_n
+
+    @property
+    def name(self) -> str:
+        return "timeline"
+
+    @property
+    def output_filename(self) -> str:
+        return "timeline.json"
+
+    def _video_stats(self, transcript: BPKTranscript, capacity: int) -> Dict[str, Any]:
+        text = transcript.transcript_text
+        entities = self._content.video_entities(transcript)
+        terms = Counter(
+            w for w in (w.lower() for w in WORD_RE.findall(text))
+            if len(w) > 2 and w not in FrequencyStatsExtractor.STOPWORDS
+        )
+        return {
+            "duration_seconds": transcript.total_duration,
+            "words": transcript.total_words,
+            "questions": ContentStatsExtractor.count_questions(text),
+            "topics": ContentStatsExtractor.extract_topics(text),
+            "persons": SpaceSaving.from_counts(entities["PER"], capacity),
+            "locations": SpaceSaving.from_counts(entities["LOC"], capacity),
+            "terms": SpaceSaving.from_counts(terms, capacity),
+        }
+
+    def extract(
+        self,
+        transcripts: List[BPKTranscript],
+        diarization: Dict[str, List[RTTMEntry]],
+    ) -> Dict[str, Any]:
+        """Extract time-bucketed statistics."""
+
+        if not transcripts:
+            return {"error": "No transcripts provided"}
+
+        pyramid = TimelinePyramid()
+        undated = []
+        for transcript in transcripts:
+            date_str = self._content.video_date(transcript)
+            try:
+                day = datetime.strptime(date_str, "%Y-%m-%d").date() if date_str else None
+            except ValueError:
+                day = None
+            if day is None:
+                undated.append(transcript.video_id)
+                continue
+            pyramid.add(day, self._video_stats(transcript, pyramid.capacity))
+
+        if undated:
+            logger.warning(f"Timeline: {len(undated)} BPKs without a date skipped")
+
+        topics = list(ContentStatsExtractor.TOPIC_KEYWORDS)
+        levels = {level: pyramid.columns(level, topics, self.top_n) for level in LEVELS}
+        quarters = levels["quarter"]
+
+        return {
+            "metadata": {
+                "extraction_date": datetime.utcnow().isoformat(),
+                "extractor": self.name,
+                "corpus_size": len(transcripts),
+                "dated_bpks": len(transcripts) - len(undated),
+                "undated_video_ids": undated,
+                "levels": list(LEVELS),
+            },
+            "levels": levels,
+            # Per-quarter top terms in the dashboard's NarrativeIndexItem shape
+            "narrative_index": [
+                {"quartal": f"Q{key[-1]} {key[:4]}", "top_worter": terms}
+                for key, terms in zip(quarters["bucket"], quarters["top_terms"])
+            ],
+        }
@@ -0,0 +1,205 @@
+"""
+Viral Moments Extractor.
+Single Responsibility: Find the densest fixed-length time windows of every BPK.
+
+Every segment gets a feature row (entity mentions, topic hits, questions, speaker
+changes, words). Windows start at every segment and span VIRAL_WINDOW_SECONDS; their
+feature sums are differences of prefix sums, so scoring a video is linear in its segment
+count (plus one vectorized binary search for the window ends). Scores are weighted
+z-scores against all windows of the corpus; the top windows per BPK are taken from a
+heap with overlap suppression, the corpus top from the per-BPK winners.
+"""
+
+import heapq
+import logging
+import re
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .base import BaseExtractor
+from .content_stats import ContentStatsExtractor
+from .qa_stats import QAStatsExtractor
+from ..config import TOP_N_RESULTS, VIRAL_MOMENTS_PER_BPK, VIRAL_WINDOW_SECONDS
+from ..models.raw_data import BPKTranscript, RTTMEntry
+from ..search import assign_speakers
+
+logger = logging.getLogger(__name__)
+
+
+class ViralMomentsExtractor(BaseExtractor):
+    """Extracts the highest-signal windows (viral_moments.json) per BPK and corpus-wide."""
+
+    FEATURES = ("entities", "topics", "questions", "speaker_changes", "words_per_minute")
+    # Weight of each feature's z-score in the window score
+    WEIGHTS = np.array([1.0, 1.0, 1.5, 1.5, 0.5])
+
+    def __init__(
+        self,
+        content_extractor: Optional[ContentStatsExtractor] = None,
+        window_seconds: float = VIRAL_WINDOW_SECONDS,
+        per_bpk: int = VIRAL_MOMENTS_PER_BPK,
+        top_n: int = TOP_N_RESULTS,
+    ):
+        # Shares NER results (memoized per video), topics and dates with content_stats
+        self._content = content_extractor or ContentStatsExtractor()
+        self.window_seconds = window_seconds
+        self.per_bpk = per_bpk
+        self.top_n = top_n
+        self._topic_re, self._topic_of = ContentStatsExtractor.topic_matcher()
+
+    @property
+    def name(self) -> str:
+        return "viral_moments"
+
+    @property
+    def output_filename(self) -> str:
+        return "viral_moments.json"
+
+    def _entity_pattern(self, transcript: BPKTranscript) -> Optional[re.Pattern]:
+        """One regex over all entity names SpaCy found in the video (None without NER)."""
+        entities = self._content.video_entities(transcript)
+        names = {name for label in ("PER", "LOC", "ORG") for name in entities[label] if len(name) > 2}
+        if not names:
+            return None
+        return re.compile(r"\b(?:" + "|".join(sorted(map(re.escape, names), key=len, reverse=True)) + r")\b")
+
+    def _segment_features(
+        self, transcript: BPKTranscript, entries: List[RTTMEntry]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Segment starts, ends and the (segments x 5) raw feature counts (last column: words)."""
+        segments = transcript.segments
+        entity_re = self._entity_pattern(transcript)
+        speakers = assign_speakers(segments, entries)
+        features = np.zeros((len(segments), len(self.FEATURES)), dtype=np.float64)
+        for i, segment in enumerate(segments):
+            text = segment.text
+            features[i, 0] = len(entity_re.findall(text)) if entity_re else 0
+            features[i, 1] = len(self._topic_re.findall(text.lower()))
+            features[i, 2] = QAStatsExtractor.question_count(text)
+            features[i, 3] = i > 0 and speakers[i] != speakers[i - 1] and bool(speakers[i])
+            features[i, 4] = len(text.split())
+        starts = np.fromiter((s.start for s in segments), dtype=np.float64, count=len(segments))
+        ends = np.fromiter((s.end for s in segments), dtype=np.float64, count=len(segments))
+        return starts, ends, features
+
+    def _windows(
+        self, starts: np.ndarray, ends: np.ndarray, features: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Window end indices and (windows x 5) window features; window i = segments [i, stop[i])."""
+        prefix = np.zeros((len(starts) + 1, features.shape[1]), dtype=np.float64)
+        np.cumsum(features, axis=0, out=prefix[1:])
+        stop = np.searchsorted(starts, starts + self.window_seconds, side="left")
+        sums = prefix[stop] - prefix[:len(starts)]
+        # Speech rate over the spoken span, at least half a window to damp tiny tail windows
+        span = np.maximum(ends[stop - 1] - starts, self.window_seconds / 2)
+        sums[:, 4] = sums[:, 4] / span * 60
+        return stop, sums
+
+    def _select(self, starts: np.ndarray, scores: np.ndarray, k: int) -> List[int]:
+        """Top-k windows by score from a heap, skipping windows overlapping a chosen one."""
+        heap = [(-score, i) for i, score in enumerate(scores.tolist())]
+        heapq.heapify(heap)
+        chosen: List[int] = []
+        while heap and len(chosen) < k:
+            _, i = heapq.heappop(heap)
+            if all(abs(starts[i] - starts[c]) >= self.window_seconds for c in chosen):
+                chosen.append(i)
+        return chosen
+
+    def _moment(
+        self,
+        transcript: BPKTranscript,
+        lo: int,
+        hi: int,
+        score: float,
+        percentile: float,
+        window: np.ndarray,
+        z: np.ndarray,
+    ) -> Dict[str, Any]:
+        segments = transcript.segments[lo:hi]
+        text = " ".join(s.text.strip() for s in segments)
+        start = segments[0].start
+        topics = Counter(self._topic_of[m] for m in self._topic_re.findall(text.lower()))
+        return {
+            "video_id": transcript.video_id,
+            "title": transcript.metadata.original_title,
+            "date": self._content.video_date(transcript),
+            "timestamp": QAStatsExtractor.timestamp(start),
+            "start": round(start, 2),
+            "end": round(segments[-1].end, 2),
+            "url": f"https://www.youtube.com/watch?v={transcript.video_id}&t={int(start)}s",
+            "score": round(score, 2),
+            "percentile": round(percentile, 1),
+            # Feature with the largest weighted contribution
+            "type": self.FEATURES[int(np.argmax(z * self.WEIGHTS))],
+            "features": {name: round(float(value), 1) for name, value in zip(self.FEATURES, window)},
+            "tags": [topic for topic, _ in topics.most_common(3)],
+            "snippet": text[:300] + ("..." if len(text) > 300 else ""),
+        }
+
+    def extract(
+        self,
+        transcripts: List[BPKTranscript],
+        diarization: Dict[str, List[RTTMEntry]],
+    ) -> Dict[str, Any]:
+        """Extract top windows per BPK and corpus-wide."""
+
+        if not transcripts:
+            return {"error": "No transcripts provided"}
+
+        # Pass 1: window features of every video
+        videos = []
+        for transcript in transcripts:
+            if not transcript.segments:
+                continue
+            starts, ends, features = self._segment_features(transcript, diarization.get(transcript.video_id, []))
+            stop, windows = self._windows(starts, ends, features)
+            videos.append((transcript, starts, stop, windows))
+
+        if not videos:
+            return {"error": "No segments in transcripts"}
+
+        # Pass 2: corpus-wide z-scores, so moments of different BPKs are comparable
+        all_windows = np.concatenate([v[3] for v in videos])
+        logger.info(f"Viral moments: {len(all_windows)} windows of {len(videos)} BPKs scored")
+        mean = all_windows.mean(axis=0)
+        std = all_windows.std(axis=0)
+        std[std == 0] = 1.0
+        all_scores = ((all_windows - mean) / std) @ self.WEIGHTS
+        ranked = np.sort(all_scores)
+
+        per_bpk = []
+        offset = 0
+        for transcript, starts, stop, windows in videos:
+            z = (windows - mean) / std
+            scores = all_scores[offset:offset + len(windows)]
+            offset += len(windows)
+            moments = []
+            for i in self._select(starts, scores, self.per_bpk):
+                percentile = 100 * np.searchsorted(ranked, scores[i], side="right") / len(ranked)
+                moments.append(self._moment(
+                    transcript, i, int(stop[i]), float(scores[i]), float(percentile), windows[i], z[i]
+                ))
+            per_bpk.append({"video_id": transcript.video_id, "moments": moments})
+
+        top = heapq.nlargest(
+            self.top_n, (m for video in per_bpk for m in video["moments"]), key=lambda m: m["score"]
+        )
+
+        return {
+            "metadata": {
+                "extraction_date": datetime.utcnow().isoformat(),
+                "extractor": self.name,
+                "corpus_size": len(transcripts),
+                "window_seconds": self.window_seconds,
+                "windows_scored": len(all_windows),
+                "features": list(self.FEATURES),
+                "weights": dict(zip(self.FEATURES, self.WEIGHTS.tolist())),
+                "feature_means": dict(zip(self.FEATURES, np.round(mean, 2).tolist())),
+            },
+            "top_moments": top,
+            "per_bpk": per_bpk,
+        }
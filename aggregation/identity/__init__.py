@@ -0,0 +1,8 @@
+"""
+Cross-BPK speaker identity resolution for the BPK Aggregation Pipeline.
+"""
+
+from .index import CentroidIndex
+from .resolver import SpeakerIdentityResolver
+
+__all__ = ["CentroidIndex", "SpeakerIdentityResolver"]
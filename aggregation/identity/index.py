@@ -0,0 +1,116 @@
+"""
+Nearest-neighbour index over L2-normalized speaker embeddings.
+Single Responsibility: Cosine-similarity search that stays fast as the corpus grows.
+"""
+
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_rows(x: np.ndarray) -> np.ndarray:
+    """L2-normalize rows; all-zero rows (padded centroids) stay zero."""
+    x = np.asarray(x, dtype=np.float32)
+    norms = np.linalg.norm(x, axis=-1, keepdims=True)
+    return np.divide(x, norms, out=np.zeros_like(x), where=norms > 0)
+
+
+class CentroidIndex:
+    """
+    Cosine nearest-neighbour index with in-place updates.
+
+    Small indexes are searched exactly (one matrix product). Once the index holds
+    `ivf_min_size` vectors it switches to an inverted-file layout: vectors are bucketed
+    under ~sqrt(n) k-means centroids and a query only scans its `nprobe` closest buckets.
+    """
+
+    def __init__(self, dim: int, ivf_min_size: int = 20000, nprobe: int = 8, seed: int = 0):
+        self.dim = dim
+        self.ivf_min_size = ivf_min_size
+        self.nprobe = nprobe
+        self._seed = seed
+        self._vectors = np.zeros((64, dim), dtype=np.float32)
+        self._size = 0
+        # IVF state (None until the index is large enough)
+        self._coarse: Optional[np.ndarray] = None
+        self._assign: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def vectors(self) -> np.ndarray:
+        return self._vectors[:self._size]
+
+    def add(self, vector: np.ndarray) -> int:
+        """Append a vector and return its row id."""
+        if self._size == len(self._vectors):
+            grown = np.zeros((len(self._vectors) * 2, self.dim), dtype=np.float32)
+            grown[:self._size] = self._vectors[:self._size]
+            self._vectors = grown
+        row = self._size
+        self._vectors[row] = normalize_rows(vector)
+        self._size += 1
+
+        if self._coarse is not None:
+            self._assign = np.append(self._assign, self._nearest_lists(self._vectors[row:row + 1], 1)[0, 0])
+        elif self._size >= self.ivf_min_size:
+            self._train_ivf()
+        return row
+
+    def update(self, row: int, vector: np.ndarray) -> None:
+        """Replace a stored vector (e.g. a running identity mean). Its IVF bucket is kept."""
+        self._vectors[row] = normalize_rows(vector)
+
+    def search(self, queries: np.ndarray, k: int = 5) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Return (similarities, row ids), both shaped (n_queries, k), best first.
+        Missing neighbours are reported as similarity -inf and row -1.
+        """
+        queries = normalize_rows(np.atleast_2d(queries))
+        n = len(queries)
+        sims = np.full((n, k), -np.inf, dtype=np.float32)
+        rows = np.full((n, k), -1, dtype=np.int64)
+        if self._size == 0 or n == 0:
+            return sims, rows
+
+        if self._coarse is None:
+            candidates = [np.arange(self._size)] * n
+        else:
+            probes = self._nearest_lists(queries, min(self.nprobe, len(self._coarse)))
+            candidates = [np.flatnonzero(np.isin(self._assign, p)) for p in probes]
+
+        for i, cand in enumerate(candidates):
+            if len(cand) == 0:
+                continue
+            scores = self._vectors[cand] @ queries[i]
+            top = min(k, len(cand))
+            best = np.argpartition(-scores, top - 1)[:top]
+            best = best[np.argsort(-scores[best])]
+            sims[i, :top] = scores[best]
+            rows[i, :top] = cand[best]
+        return sims, rows
+
+    def _nearest_lists(self, queries: np.ndarray, nprobe: int) -> np.ndarray:
+        scores = queries @ self._coarse.T
+        return np.argsort(-scores, axis=1)[:, :nprobe]
+
+    def _train_ivf(self, iterations: int = 10) -> None:
+        """Spherical k-means over the current vectors to build the coarse quantizer."""
+        data = self.vectors
+        n_lists = max(1, int(np.sqrt(len(data))))
+        rng = np.random.default_rng(self._seed)
+        coarse = data[rng.choice(len(data), n_lists, replace=False)].copy()
+        for _ in range(iterations):
+            assign = np.argmax(data @ coarse.T, axis=1)
+            sums = np.zeros_like(coarse)
+            np.add.at(sums, assign, data)
+            empty = ~sums.any(axis=1)
+            sums[empty] = coarse[empty]
+            coarse = normalize_rows(sums)
+        self._coarse = coarse
+        self._assign = np.argmax(data @ coarse.T, axis=1)
+        logger.info(f"Centroid index switched to IVF: {len(data)} vectors in {n_lists} lists")
@@ -0,0 +1,241 @@
+"""
+Cross-BPK Speaker Identity Resolution.
+Single Responsibility: Map per-video diarization labels (SPEAKER_03, ...) to corpus-wide
+speaker identities by clustering per-video speaker centroid embeddings.
+"""
+
+import json
+import logging
+import zlib
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .index import CentroidIndex, normalize_rows
+
+logger = logging.getLogger(__name__)
+
+IdentityMap = Dict[str, Dict[str, str]]
+
+
+class SpeakerIdentityResolver:
+    """
+    Incremental online clustering of speaker centroids.
+
+    Every video's speakers are matched against the existing identities via a
+    nearest-neighbour index. Matches above `threshold` (cosine similarity) join that
+    identity and move its running mean; the rest open new identities. Two speakers of
+    the same video never share an identity (cannot-link). Videos that are already in
+    the mapping keep their assignment, so global IDs are stable across runs, unless their
+    centroids changed (e.g. re-clustered diarization): those are assigned again.
+    """
+
+    MAPPING_FILE = "mapping.json"
+    CENTROIDS_FILE = "centroids.npy"
+
+    def __init__(self, threshold: float = 0.65, candidates: int = 5, id_prefix: str = "PERSON_"):
+        self.threshold = threshold
+        self.candidates = candidates
+        self.id_prefix = id_prefix
+        self.mapping: IdentityMap = {}
+        # video_id -> signature of the centroids its mapping was assigned from
+        self._signatures: Dict[str, str] = {}
+        self._ids: List[str] = []
+        self._sums: Optional[np.ndarray] = None
+        self._counts: List[int] = []
+        self._index: Optional[CentroidIndex] = None
+        # Set by load() when the saved sums don't fit the identities: resolve() rebuilds them
+        self._stale_sums = False
+
+    @property
+    def identity_count(self) -> int:
+        return len(self._ids)
+
+    def _ensure_dim(self, dim: int) -> None:
+        if self._index is None:
+            self._index = CentroidIndex(dim)
+            self._sums = np.zeros((0, dim), dtype=np.float32)
+        elif self._index.dim != dim:
+            raise ValueError(f"Embedding dimension changed: {self._index.dim} -> {dim}")
+
+    def _new_identity(self, vector: np.ndarray) -> int:
+        identity = len(self._ids)
+        self._ids.append(f"{self.id_prefix}{identity + 1:04d}")
+        self._sums = np.vstack([self._sums, vector[None, :]])
+        self._counts.append(1)
+        self._index.add(vector)
+        return identity
+
+    def _join_identity(self, identity: int, vector: np.ndarray) -> None:
+        self._sums[identity] += vector
+        self._counts[identity] += 1
+        self._index.update(identity, self._sums[identity])
+
+    def assign_video(self, video_id: str, labels: List[str], centroids: np.ndarray) -> Dict[str, str]:
+        """Assign global identities to one video's speakers (greedy best-match first)."""
+        centroids = normalize_rows(centroids)
+        self._ensure_dim(centroids.shape[1])
+        valid = [i for i in range(len(labels)) if centroids[i].any()]
+
+        # Candidate (similarity, speaker row, identity) triples above threshold
+        candidates: List[Tuple[float, int, int]] = []
+        if valid and len(self._index):
+            sims, rows = self._index.search(centroids[valid], k=self.candidates)
+            for qi, row in enumerate(valid):
+                for sim, identity in zip(sims[qi], rows[qi]):
+                    if identity >= 0 and sim >= self.threshold:
+                        candidates.append((float(sim), row, int(identity)))
+        candidates.sort(reverse=True)
+
+        assigned: Dict[int, int] = {}
+        used_identities = set()
+        for sim, row, identity in candidates:
+            if row in assigned or identity in used_identities:
+                continue
+            assigned[row] = identity
+            used_identities.add(identity)
+
+        for row in valid:
+            if row in assigned:
+                self._join_identity(assigned[row], centroids[row])
+            else:
+                assigned[row] = self._new_identity(centroids[row])
+
+        video_map = {labels[row]: self._ids[identity] for row, identity in assigned.items()}
+        self.mapping[video_id] = video_map
+        return video_map
+
+    @staticmethod
+    def signature(labels: List[str], centroids: np.ndarray) -> str:
+        """Content hash of one video's centroids (labels and vectors)."""
+        crc = zlib.crc32("\t".join(labels).encode("utf-8"))
+        crc = zlib.crc32(np.ascontiguousarray(centroids, dtype=np.float32).tobytes(), crc)
+        return f"{crc:08x}"
+
+    def _rebuild(self, embeddings: Dict[str, Tuple[List[str], np.ndarray]]) -> None:
+        """
+        Recompute identity sums and the index from the current centroids of all mapped
+        videos (mapped videos without centroids no longer contribute).
+        """
+        if self._sums is None:
+            return
+        row_of = {identity_id: i for i, identity_id in enumerate(self._ids)}
+        sums = np.zeros_like(self._sums)
+        counts = [0] * len(self._ids)
+        for video_id, video_map in self.mapping.items():
+            if video_id not in embeddings:
+                continue
+            labels, centroids = embeddings[video_id]
+            for label, vector in zip(labels, normalize_rows(centroids)):
+                identity_id = video_map.get(label)
+                if identity_id is not None and vector.any():
+                    sums[row_of[identity_id]] += vector
+                    counts[row_of[identity_id]] += 1
+        self._sums, self._counts = sums, counts
+        self._index = CentroidIndex(sums.shape[1])
+        for row in sums:
+            self._index.add(row)
+
+    def resolve(self, embeddings: Dict[str, Tuple[List[str], np.ndarray]]) -> IdentityMap:
+        """Assign every video that is new or whose centroids changed; returns the full mapping."""
+        signatures = {vid: self.signature(*embeddings[vid]) for vid in embeddings}
+        if self._stale_sums and embeddings:
+            logger.warning("Speaker identities: stored centroid sums don't match the mapping, rebuilding them")
+            dim = next(iter(embeddings.values()))[1].shape[1]
+            self._index, self._sums = None, None
+            self._ensure_dim(dim)
+            self._sums = np.zeros((len(self._ids), dim), dtype=np.float32)
+            self._rebuild(embeddings)
+            self._stale_sums = False
+        # Mappings saved before signatures were tracked are taken as current
+        for video_id in self.mapping:
+            if video_id in signatures:
+                self._signatures.setdefault(video_id, signatures[video_id])
+
+        changed = [
+            vid for vid in sorted(embeddings)
+            if vid in self.mapping and self._signatures.get(vid) != signatures[vid]
+        ]
+        if changed:
+            for video_id in changed:
+                del self.mapping[video_id]
+            self._rebuild(embeddings)
+
+        new_videos = [vid for vid in sorted(embeddings) if vid not in self.mapping]
+        for video_id in new_videos:
+            labels, centroids = embeddings[video_id]
+            if len(labels):
+                self.assign_video(video_id, labels, centroids)
+                self._signatures[video_id] = signatures[video_id]
+
+        logger.info(
+            f"Speaker identities: {len(new_videos)} videos resolved ({len(changed)} with changed centroids), "
+            f"{self.identity_count} identities across {len(self.mapping)} videos"
+        )
+        return self.mapping
+
+    def save(self, identity_dir: Path) -> None:
+        """
+        Persist the identity centroid sums (npy), then the mapping (JSON), each via tmp +
+        replace: the mapping never names identities the sums file lacks.
+        """
+        identity_dir.mkdir(parents=True, exist_ok=True)
+        if self._sums is not None:
+            tmp = identity_dir / (self.CENTROIDS_FILE + ".tmp")
+            with open(tmp, "wb") as f:
+                np.save(f, self._sums)
+            tmp.replace(identity_dir / self.CENTROIDS_FILE)
+
+        payload = {
+            "threshold": self.threshold,
+            "id_prefix": self.id_prefix,
+            "identities": [
+                {"id": identity_id, "count": count}
+                for identity_id, count in zip(self._ids, self._counts)
+            ],
+            "videos": self.mapping,
+            "signatures": {vid: sig for vid, sig in self._signatures.items() if vid in self.mapping},
+        }
+
+        tmp = identity_dir / (self.MAPPING_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        tmp.replace(identity_dir / self.MAPPING_FILE)
+
+    @classmethod
+    def load(cls, identity_dir: Path, threshold: Optional[float] = None) -> "SpeakerIdentityResolver":
+        """Load a persisted resolver, or return an empty one if nothing was saved yet."""
+        mapping_path = identity_dir / cls.MAPPING_FILE
+        if not mapping_path.exists():
+            return cls() if threshold is None else cls(threshold=threshold)
+
+        with open(mapping_path, "r", encoding="utf-8") as f:
+            payload = json.load(f)
+
+        resolver = cls(
+            threshold=payload.get("threshold", 0.65) if threshold is None else threshold,
+            id_prefix=payload.get("id_prefix", "PERSON_"),
+        )
+        resolver.mapping = payload.get("videos", {})
+        resolver._signatures = payload.get("signatures", {})
+        resolver._ids = [i["id"] for i in payload.get("identities", [])]
+        resolver._counts = [int(i["count"]) for i in payload.get("identities", [])]
+
+        centroids_path = identity_dir / cls.CENTROIDS_FILE
+        sums = None
+        if resolver._ids and centroids_path.exists():
+            try:
+                sums = np.load(centroids_path).astype(np.float32)
+            except (OSError, ValueError) as e:
+                logger.warning(f"Speaker identities: unreadable {centroids_path.name}: {e}")
+        if resolver._ids and (sums is None or sums.ndim != 2 or len(sums) != len(resolver._ids)):
+            # Interrupted save or lost file: row i must be identity i, so rebuild from the embeddings
+            resolver._stale_sums = True
+        elif sums is not None:
+            resolver._ensure_dim(sums.shape[1])
+            resolver._sums = sums
+            for row in sums:
+                resolver._index.add(row)
+
+        return resolver
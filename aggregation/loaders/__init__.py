@@ -4,5 +4,6 @@ Data loaders for the BPK Aggregation Pipeline.
 
 from .json_loader import JSONLoader
 from .rttm_loader import RTTMLoader
+from .embedding_loader import EmbeddingLoader
 
-__all__ = ["JSONLoader", "RTTMLoader"]
+__all__ = ["JSONLoader", "RTTMLoader", "EmbeddingLoader"]
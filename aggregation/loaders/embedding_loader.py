@@ -0,0 +1,52 @@
+"""
+Embedding Loader for per-video speaker centroids.
+Single Responsibility: Load speaker centroid arrays written by the ingest pipeline.
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingLoader:
+    """Loads `<video_id>.npz` files with `labels` (RTTM speaker ids) and `centroids` (n x dim)."""
+    
+    def __init__(self, embeddings_dir: Path):
+        self.embeddings_dir = embeddings_dir
+    
+    def _load_single(self, path: Path) -> Optional[Tuple[List[str], np.ndarray]]:
+        """Load a single centroid file."""
+        try:
+            with np.load(path) as data:
+                labels = [str(label) for label in data["labels"]]
+                centroids = data["centroids"].astype(np.float32)
+            
+            if len(labels) != len(centroids):
+                logger.warning(f"Label/centroid count mismatch in {path.name}")
+                return None
+            
+            return labels, centroids
+            
+        except Exception as e:
+            logger.error(f"Error loading embeddings {path}: {e}")
+            return None
+    
+    def load_all(self) -> Dict[str, Tuple[List[str], np.ndarray]]:
+        """Load all centroid files, keyed by video ID."""
+        all_embeddings = {}
+        
+        if not self.embeddings_dir.exists():
+            logger.info(f"No embeddings directory: {self.embeddings_dir}")
+            return all_embeddings
+        
+        for path in sorted(self.embeddings_dir.glob("*.npz")):
+            loaded = self._load_single(path)
+            if loaded:
+                all_embeddings[path.stem] = loaded
+        
+        logger.info(f"Loaded speaker centroids for {len(all_embeddings)} videos")
+        return all_embeddings
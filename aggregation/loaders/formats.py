@@ -0,0 +1,166 @@
+"""
+On-disk formats of the raw ingest outputs.
+Single Responsibility: Read (and write) transcripts and RTTMs in every supported storage format.
+
+Transcripts:
+    <video_id>.json       legacy (indented, text stored in `transcript_text` and `segments`)
+                          or compact (see below)
+    <video_id>.json.gz    compact, gzip-compressed
+    <video_id>.json.zst   compact, zstd-compressed (needs the optional `zstandard` package)
+
+Compact transcripts store the text once, with segments in columns:
+    {"format": "bpk-transcript/2", "metadata": {...},
+     "segments": {"start": [...], "end": [...], "text": [...]}}
+`transcript_text` is the newline-joined segment text and is rebuilt on read.
+
+RTTMs are plain text, optionally as .rttm.gz / .rttm.zst.
+"""
+
+import gzip
+import json
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+COMPACT_FORMAT = "bpk-transcript/2"
+TRANSCRIPT_SUFFIXES = (".json", ".json.gz", ".json.zst")
+RTTM_SUFFIXES = (".rttm", ".rttm.gz", ".rttm.zst")
+STORAGE_FORMATS = ("pretty", "compact", "gzip", "zstd")
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError("zstd storage needs the 'zstandard' package (pip install zstandard)") from e
+    return zstandard
+
+
+def video_id_of(path: Path) -> str:
+    """`abc.json.gz` -> `abc` (YouTube IDs contain no dots)."""
+    return path.name.split(".")[0]
+
+
+def storage_format_of(path: Path, data: Optional[Dict[str, Any]] = None) -> str:
+    """Storage format of an existing transcript file."""
+    if path.name.endswith(".gz"):
+        return "gzip"
+    if path.name.endswith(".zst"):
+        return "zstd"
+    return "compact" if data is not None and data.get("format") == COMPACT_FORMAT else "pretty"
+
+
+def read_bytes(path: Path) -> bytes:
+    """File content, decompressed according to its suffix."""
+    raw = path.read_bytes()
+    if path.name.endswith(".gz"):
+        return gzip.decompress(raw)
+    if path.name.endswith(".zst"):
+        return _zstd().ZstdDecompressor().decompress(raw)
+    return raw
+
+
+def read_text(path: Path) -> str:
+    return read_bytes(path).decode("utf-8")
+
+
+def compact_transcript(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Legacy transcript dict -> compact dict (idempotent)."""
+    if data.get("format") == COMPACT_FORMAT:
+        return data
+    segments = data.get("segments") or []
+    keys = ["start", "end", "text"]
+    for seg in segments:
+        keys.extend(k for k in seg if k not in keys)
+    out = {k: v for k, v in data.items() if k not in ("segments", "transcript_text")}
+    out["format"] = COMPACT_FORMAT
+    out["segments"] = {k: [seg.get(k) for seg in segments] for k in keys}
+    return out
+
+
+def expand_transcript(data: Dict[str, Any]) -> Dict[str, Any]:
+    """Compact transcript dict -> legacy shape (`segments` as rows + `transcript_text`)."""
+    if data.get("format") != COMPACT_FORMAT:
+        return data
+    columns = data.get("segments") or {}
+    keys = list(columns)
+    n = len(columns.get("start", []))
+    segments = [
+        {k: columns[k][i] for k in keys if columns[k][i] is not None}
+        for i in range(n)
+    ]
+    out = {k: v for k, v in data.items() if k not in ("format", "segments")}
+    out["transcript_text"] = "\n".join(s["text"] for s in segments if s.get("text")).strip()
+    out["segments"] = segments
+    return out
+
+
+def load_transcript(path: Path) -> Dict[str, Any]:
+    """Read a transcript in any supported format, returned in the legacy shape."""
+    raw = read_bytes(path)
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    return expand_transcript(data)
+
+
+def encode_transcript(data: Dict[str, Any], storage: str) -> Tuple[bytes, str]:
+    """Serialize a (legacy or compact) transcript; returns (bytes, file suffix)."""
+    if storage not in STORAGE_FORMATS:
+        raise ValueError(f"Unknown storage format {storage!r} (choose from {', '.join(STORAGE_FORMATS)})")
+    if storage == "pretty":
+        return json.dumps(expand_transcript(data), ensure_ascii=False, indent=2).encode("utf-8"), ".json"
+    blob = json.dumps(compact_transcript(data), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+    if storage == "gzip":
+        return gzip.compress(blob, compresslevel=6), ".json.gz"
+    if storage == "zstd":
+        return _zstd().ZstdCompressor(level=10).compress(blob), ".json.zst"
+    return blob, ".json"
+
+
+def encode_rttm(text: str, storage: str) -> Tuple[bytes, str]:
+    """RTTM text in a storage format ('pretty'/'compact' keep plain text)."""
+    blob = text.encode("utf-8")
+    if storage == "gzip":
+        return gzip.compress(blob, compresslevel=6), ".rttm.gz"
+    if storage == "zstd":
+        return _zstd().ZstdCompressor(level=10).compress(blob), ".rttm.zst"
+    return blob, ".rttm"
+
+
+def write_atomic(path: Path, blob: bytes) -> None:
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(blob)
+    tmp.replace(path)
+
+
+def remove_variants(directory: Path, video_id: str, suffixes: Iterable[str], keep: Optional[Path] = None) -> None:
+    """Delete the other storage variants of one video's file."""
+    for suffix in suffixes:
+        path = directory / f"{video_id}{suffix}"
+        if path != keep and path.exists():
+            path.unlink()
+
+
+def find_file(directory: Path, video_id: str, suffixes: Iterable[str]) -> Optional[Path]:
+    """The video's file in whichever variant exists (newest wins if several do)."""
+    found = [directory / f"{video_id}{s}" for s in suffixes if (directory / f"{video_id}{s}").exists()]
+    return max(found, key=lambda p: p.stat().st_mtime) if found else None
+
+
+def iter_files(directory: Path, suffixes: Iterable[str]) -> Iterator[Path]:
+    """One file per video ID across all storage variants, sorted by video ID."""
+    by_id: Dict[str, Path] = {}
+    for suffix in suffixes:
+        for path in directory.glob(f"*{suffix}"):
+            video_id = video_id_of(path)
+            current = by_id.get(video_id)
+            if current is None or path.stat().st_mtime > current.stat().st_mtime:
+                by_id[video_id] = path
+    for video_id in sorted(by_id):
+        yield by_id[video_id]
@@ -1,14 +1,14 @@
 """
 JSON Loader for BPK transcript files.
-Single Responsibility: Load and parse JSON transcript files.
+Single Responsibility: Load and parse JSON transcript files (legacy, compact, gzip or zstd; see formats.py).
 """
 
-import json
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional, Iterator
+from typing import Dict, List, Optional, Iterator
 
+from .formats import TRANSCRIPT_SUFFIXES, find_file, iter_files, load_transcript, video_id_of
 from ..models.raw_data import BPKTranscript, BPKMetadata, Segment
 
 logger = logging.getLogger(__name__)
@@ -19,6 +19,8 @@ class JSONLoader:
     
     def __init__(self, json_dir: Path):
         self.json_dir = json_dir
+        # Re-uploads skipped while loading: alias video ID -> canonical video ID
+        self.aliases: Dict[str, str] = {}
         
     def _parse_date(self, date_str: Optional[str]) -> Optional[datetime]:
         """Parse various date formats."""
@@ -44,8 +46,7 @@ class JSONLoader:
     def _load_single(self, path: Path) -> Optional[BPKTranscript]:
         """Load a single JSON file into a BPKTranscript."""
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = load_transcript(path)
             
             meta = data.get("metadata", {})
             
@@ -54,8 +55,14 @@ class JSONLoader:
                 logger.warning(f"Skipping failed transcript: {path.name}")
                 return None
             
+            # Skip re-uploads: a shifted copy of the canonical video's transcript
+            if meta.get("alias_of"):
+                self.aliases[meta.get("video_id", video_id_of(path))] = meta["alias_of"]
+                logger.info(f"Skipping re-upload {path.name} (alias of {meta['alias_of']})")
+                return None
+            
             metadata = BPKMetadata(
-                video_id=meta.get("video_id", path.stem),
+                video_id=meta.get("video_id", video_id_of(path)),
                 source_url=meta.get("source_url", ""),
                 original_title=meta.get("original_title", ""),
                 author=meta.get("author", ""),
@@ -91,8 +98,9 @@ class JSONLoader:
     def load_all(self) -> List[BPKTranscript]:
         """Load all JSON files from the directory."""
         transcripts = []
+        self.aliases = {}
         
-        for path in sorted(self.json_dir.glob("*.json")):
+        for path in iter_files(self.json_dir, TRANSCRIPT_SUFFIXES):
             transcript = self._load_single(path)
             if transcript:
                 transcripts.append(transcript)
@@ -103,14 +111,14 @@ class JSONLoader:
     
     def iter_all(self) -> Iterator[BPKTranscript]:
         """Iterate over all JSON files (memory-efficient for large corpora)."""
-        for path in sorted(self.json_dir.glob("*.json")):
+        for path in iter_files(self.json_dir, TRANSCRIPT_SUFFIXES):
             transcript = self._load_single(path)
             if transcript:
                 yield transcript
     
     def load_by_id(self, video_id: str) -> Optional[BPKTranscript]:
         """Load a specific transcript by video ID."""
-        path = self.json_dir / f"{video_id}.json"
-        if path.exists():
+        path = find_file(self.json_dir, video_id, TRANSCRIPT_SUFFIXES)
+        if path:
             return self._load_single(path)
         return None
@@ -1,12 +1,13 @@
 """
 RTTM Loader for speaker diarization files.
-Single Responsibility: Load and parse RTTM diarization files.
+Single Responsibility: Load and parse RTTM diarization files (plain, .rttm.gz or .rttm.zst).
 """
 
 import logging
 from pathlib import Path
 from typing import List, Dict, Optional
 
+from .formats import RTTM_SUFFIXES, find_file, iter_files, read_text, video_id_of
 from ..models.raw_data import RTTMEntry
 
 logger = logging.getLogger(__name__)
@@ -23,11 +24,10 @@ class RTTMLoader:
         entries = []
         
         try:
-            with open(path, "r", encoding="utf-8") as f:
-                for line in f:
-                    entry = RTTMEntry.from_line(line)
-                    if entry:
-                        entries.append(entry)
+            for line in read_text(path).splitlines():
+                entry = RTTMEntry.from_line(line)
+                if entry:
+                    entries.append(entry)
             
             logger.debug(f"Loaded {len(entries)} entries from {path.name}")
             
@@ -38,8 +38,8 @@ class RTTMLoader:
     
     def load_by_video_id(self, video_id: str) -> List[RTTMEntry]:
         """Load RTTM entries for a specific video ID."""
-        path = self.rttm_dir / f"{video_id}.rttm"
-        if path.exists():
+        path = find_file(self.rttm_dir, video_id, RTTM_SUFFIXES)
+        if path:
             return self._load_single(path)
         
         logger.warning(f"RTTM file not found for video_id: {video_id}")
@@ -49,8 +49,8 @@ class RTTMLoader:
         """Load all RTTM files, keyed by video ID."""
         all_entries = {}
         
-        for path in sorted(self.rttm_dir.glob("*.rttm")):
-            video_id = path.stem
+        for path in iter_files(self.rttm_dir, RTTM_SUFFIXES):
+            video_id = video_id_of(path)
             entries = self._load_single(path)
             if entries:
                 all_entries[video_id] = entries
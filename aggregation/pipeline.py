@@ -7,14 +7,26 @@ import json
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import Any, Dict, List, Type
+from typing import Any, Dict, List, Optional, Type
 
-from .config import RAW_JSON_DIR, RAW_RTTM_DIR, OUTPUT_DIR
-from .loaders import JSONLoader, RTTMLoader
+from .config import (
+    RAW_JSON_DIR, RAW_RTTM_DIR, OUTPUT_DIR,
+    EMBEDDINGS_DIR, SPEAKER_IDENTITY_DIR, SPEAKER_MATCH_THRESHOLD, SEARCH_INDEX_DIR,
+    SKETCH_DIR, CUBE_DIR,
+)
+from .loaders import JSONLoader, RTTMLoader, EmbeddingLoader
 from .extractors.base import BaseExtractor
 from .extractors.basic_stats import BasicStatsExtractor
 from .extractors.speaker_stats import SpeakerStatsExtractor
 from .extractors.content_stats import ContentStatsExtractor
+from .extractors.frequency_stats import FrequencyStatsExtractor
+from .extractors.timeline import TimelineExtractor
+from .extractors.date_cube import DateCubeExtractor
+from .extractors.qa_stats import QAStatsExtractor
+from .extractors.viral_moments import ViralMomentsExtractor
+from .identity import SpeakerIdentityResolver
+from .search import SearchIndex
+from .sketches import VideoSketchStore
 from .models.raw_data import BPKTranscript, RTTMEntry
 
 logger = logging.getLogger(__name__)
@@ -33,25 +45,48 @@ class AggregationPipeline:
         json_dir: Path = RAW_JSON_DIR,
         rttm_dir: Path = RAW_RTTM_DIR,
         output_dir: Path = OUTPUT_DIR,
+        embeddings_dir: Path = EMBEDDINGS_DIR,
+        identity_dir: Path = SPEAKER_IDENTITY_DIR,
+        search_index_dir: Optional[Path] = SEARCH_INDEX_DIR,
+        sketch_dir: Path = SKETCH_DIR,
+        cube_dir: Path = CUBE_DIR,
     ):
         self.json_dir = json_dir
         self.rttm_dir = rttm_dir
         self.output_dir = output_dir
+        self.embeddings_dir = embeddings_dir
+        self.identity_dir = identity_dir
+        self.search_index_dir = search_index_dir
+        self.sketch_dir = sketch_dir
+        self.cube_dir = cube_dir
         
         # Initialize loaders
         self.json_loader = JSONLoader(json_dir)
         self.rttm_loader = RTTMLoader(rttm_dir)
+        self.embedding_loader = EmbeddingLoader(embeddings_dir)
         
         # Registry of extractors (Open/Closed: add new ones here)
+        self._speaker_extractor = SpeakerStatsExtractor()
+        sketch_store = VideoSketchStore(sketch_dir)
+        self._content_extractor = ContentStatsExtractor(sketch_store=sketch_store)
+        self._qa_extractor = QAStatsExtractor(self._content_extractor)
         self._extractors: List[BaseExtractor] = [
             BasicStatsExtractor(),
-            SpeakerStatsExtractor(),
-            ContentStatsExtractor(),
+            self._speaker_extractor,
+            self._content_extractor,
+            FrequencyStatsExtractor(),
+            TimelineExtractor(self._content_extractor),
+            # After content_stats, which stores the per-video sketches the cube merges
+            DateCubeExtractor(self._content_extractor, cube_dir, sketch_store),
+            self._qa_extractor,
+            ViralMomentsExtractor(self._content_extractor),
         ]
         
         # Cached data
         self._transcripts: List[BPKTranscript] = []
         self._diarization: Dict[str, List[RTTMEntry]] = {}
+        self._identity_map: Dict[str, Dict[str, str]] = {}
+        self._search_counts: Dict[str, int] = {}
     
     def register_extractor(self, extractor: BaseExtractor) -> None:
         """Register a new extractor (Open/Closed Principle)."""
@@ -65,8 +100,51 @@ class AggregationPipeline:
         
         logger.info("Loading diarization data...")
         self._diarization = self.rttm_loader.load_all()
+        # Re-uploads count once: their RTTMs go with the skipped alias transcripts
+        for video_id in self.json_loader.aliases:
+            self._diarization.pop(video_id, None)
         
         logger.info(f"Loaded {len(self._transcripts)} transcripts and {len(self._diarization)} RTTM files")
+        
+        self._resolve_speaker_identities()
+    
+    def _resolve_speaker_identities(self) -> None:
+        """
+        Map per-video speaker labels to corpus-wide identities.
+        Incremental: the persisted mapping is reused and only new videos (or videos whose
+        centroids changed, e.g. after --recluster) are clustered.
+        """
+        embeddings = self.embedding_loader.load_all()
+        for video_id in self.json_loader.aliases:
+            embeddings.pop(video_id, None)
+        if not embeddings:
+            logger.warning(
+                f"No speaker centroids in {self.embeddings_dir}: speaker identities not resolved "
+                f"(run the ingest with --state-dir pointing to {self.embeddings_dir.parent})"
+            )
+            return
+        
+        resolver = SpeakerIdentityResolver.load(self.identity_dir, threshold=SPEAKER_MATCH_THRESHOLD)
+        self._identity_map = resolver.resolve(embeddings)
+        resolver.save(self.identity_dir)
+        self._speaker_extractor.set_identity_map(self._identity_map)
+        self._content_extractor.set_identity_map(self._identity_map)
+        self._qa_extractor.set_identity_map(self._identity_map)
+    
+    def update_search_index(self) -> Dict[str, int]:
+        """Index new and changed transcripts for full-text search (see aggregation.search)."""
+        if self.search_index_dir is None:
+            return {}
+        if not self._transcripts:
+            self.load_data()
+        
+        try:
+            index = SearchIndex(self.search_index_dir)
+            self._search_counts = index.update(self._transcripts, self._diarization, self._identity_map)
+        except Exception as e:
+            logger.error(f"Error updating search index: {e}")
+            self._search_counts = {"error": 1}
+        return self._search_counts
     
     def _save_output(self, filename: str, data: Dict[str, Any]) -> Path:
         """Save output to JSON file."""
@@ -110,6 +188,15 @@ class AggregationPipeline:
                 "filename": extractor.output_filename,
                 "success": "error" not in result,
             }
+        # Memoized NER results are only shared between the extractors above
+        self._content_extractor.release_entities()
+        
+        if self.search_index_dir is not None:
+            search_counts = self.update_search_index()
+            results["search_index"] = {
+                "filename": str(self.search_index_dir),
+                "success": "error" not in search_counts,
+            }
         
         # Save a manifest of all outputs
         manifest = {
@@ -119,7 +206,9 @@ class AggregationPipeline:
                 "rttm_dir": str(self.rttm_dir),
                 "transcript_count": len(self._transcripts),
                 "rttm_count": len(self._diarization),
+                "speaker_identity_videos": len(self._identity_map),
             },
+            "search_index": self._search_counts,
             "outputs": results,
         }
         
@@ -12,7 +12,10 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from aggregation.pipeline import AggregationPipeline
-from aggregation.config import RAW_JSON_DIR, RAW_RTTM_DIR, OUTPUT_DIR
+from aggregation.config import (
+    RAW_JSON_DIR, RAW_RTTM_DIR, OUTPUT_DIR, EMBEDDINGS_DIR, SPEAKER_IDENTITY_DIR, SEARCH_INDEX_DIR,
+    SKETCH_DIR, CUBE_DIR,
+)
 
 
 def setup_logging(verbose: bool = False) -> None:
@@ -51,6 +54,47 @@ def main():
         help=f"Output directory for aggregated data (default: {OUTPUT_DIR})"
     )
     
+    parser.add_argument(
+        "--embeddings-dir",
+        type=Path,
+        default=EMBEDDINGS_DIR,
+        help=f"Directory containing per-video speaker centroids (default: {EMBEDDINGS_DIR})"
+    )
+    
+    parser.add_argument(
+        "--identity-dir",
+        type=Path,
+        default=SPEAKER_IDENTITY_DIR,
+        help=f"Directory for the persisted cross-BPK speaker mapping (default: {SPEAKER_IDENTITY_DIR})"
+    )
+    
+    parser.add_argument(
+        "--search-index-dir",
+        type=Path,
+        default=SEARCH_INDEX_DIR,
+        help=f"Directory of the full-text search index (default: {SEARCH_INDEX_DIR})"
+    )
+    
+    parser.add_argument(
+        "--sketch-dir",
+        type=Path,
+        default=SKETCH_DIR,
+        help=f"Directory for per-video distinct-count sketches (default: {SKETCH_DIR})"
+    )
+    
+    parser.add_argument(
+        "--cube-dir",
+        type=Path,
+        default=CUBE_DIR,
+        help=f"Directory of the pre-aggregated date cube (default: {CUBE_DIR})"
+    )
+    
+    parser.add_argument(
+        "--no-search-index",
+        action="store_true",
+        help="Don't update the full-text search index"
+    )
+    
     parser.add_argument(
         "-v", "--verbose",
         action="store_true",
@@ -85,6 +129,11 @@ def main():
         json_dir=args.json_dir,
         rttm_dir=args.rttm_dir,
         output_dir=args.output_dir,
+        embeddings_dir=args.embeddings_dir,
+        identity_dir=args.identity_dir,
+        search_index_dir=None if args.no_search_index else args.search_index_dir,
+        sketch_dir=args.sketch_dir,
+        cube_dir=args.cube_dir,
     )
     
     if args.summary_only:
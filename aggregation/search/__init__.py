@@ -0,0 +1,8 @@
+"""
+Full-text search over BPK transcript segments for the BPK Aggregation Pipeline.
+"""
+
+from .index import SearchIndex, assign_speakers
+from .tokenizer import parse_query, tokenize
+
+__all__ = ["SearchIndex", "assign_speakers", "parse_query", "tokenize"]
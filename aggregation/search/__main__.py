@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+CLI for the transcript search index.
+
+    python -m aggregation.search "Taurus"
+    python -m aggregation.search '"an die Ukraine" Taurus' -k 20 --speaker PERSON_0003
+    python -m aggregation.search --update          # index new/changed transcripts only
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent.parent))
+
+from aggregation.config import RAW_JSON_DIR, RAW_RTTM_DIR, SEARCH_INDEX_DIR, SPEAKER_IDENTITY_DIR
+from aggregation.identity import SpeakerIdentityResolver
+from aggregation.loaders import JSONLoader, RTTMLoader
+from aggregation.search import SearchIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search BPK transcripts (BM25, German-aware)")
+    parser.add_argument("query", nargs="?", help='Search terms; quote phrases: \'"an die Ukraine"\'')
+    parser.add_argument("-k", "--top", type=int, default=10, help="Number of hits (default: 10)")
+    parser.add_argument("--video", default=None, help="Only search this video ID")
+    parser.add_argument("--speaker", default=None, help="Only search this speaker (global or RTTM label)")
+    parser.add_argument("--json", action="store_true", help="Print hits as JSON")
+    parser.add_argument("--update", action="store_true", help="Index new/changed transcripts before searching")
+    parser.add_argument("--index-dir", type=Path, default=SEARCH_INDEX_DIR,
+                        help=f"Search index directory (default: {SEARCH_INDEX_DIR})")
+    parser.add_argument("--json-dir", type=Path, default=RAW_JSON_DIR,
+                        help=f"Directory containing JSON transcripts (default: {RAW_JSON_DIR})")
+    parser.add_argument("--rttm-dir", type=Path, default=RAW_RTTM_DIR,
+                        help=f"Directory containing RTTM files (default: {RAW_RTTM_DIR})")
+    parser.add_argument("--identity-dir", type=Path, default=SPEAKER_IDENTITY_DIR,
+                        help=f"Persisted cross-BPK speaker mapping (default: {SPEAKER_IDENTITY_DIR})")
+    parser.add_argument("-v", "--verbose", action="store_true", help="Enable verbose logging")
+    args = parser.parse_args()
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.INFO,
+        format="%(asctime)s [%(levelname)s] %(name)s: %(message)s",
+        datefmt="%H:%M:%S",
+    )
+    if not args.query and not args.update:
+        parser.error("a query or --update is required")
+
+    index = SearchIndex(args.index_dir)
+    if args.update:
+        transcripts = JSONLoader(args.json_dir).iter_all()
+        diarization = RTTMLoader(args.rttm_dir).load_all() if args.rttm_dir.exists() else {}
+        identity_map = SpeakerIdentityResolver.load(args.identity_dir).mapping
+        counts = index.update(transcripts, diarization, identity_map)
+        print(f"Index: {counts.get('added', 0)} added, {counts.get('updated', 0)} updated, "
+              f"{counts.get('removed', 0)} removed, {counts.get('unchanged', 0)} unchanged "
+              f"({index.doc_count:,} segments of {index.video_count} videos)")
+    if not args.query:
+        return
+    if not index.doc_count:
+        print(f"Search index is empty: run with --update first ({args.index_dir})")
+        sys.exit(1)
+
+    t0 = time.perf_counter()
+    hits = index.search(args.query, k=args.top, video_id=args.video, speaker=args.speaker)
+    elapsed_ms = (time.perf_counter() - t0) * 1000
+
+    if args.json:
+        print(json.dumps(hits, ensure_ascii=False, indent=2))
+        return
+    for hit in hits:
+        minutes, seconds = divmod(int(hit["start"]), 60)
+        hours, minutes = divmod(minutes, 60)
+        speaker = f" [{hit['speaker']}]" if hit["speaker"] else ""
+        print(f"{hit['score']:7.3f}  {hit['video_id']} {hours:d}:{minutes:02d}:{seconds:02d}{speaker}")
+        print(f"         {hit['text']}")
+        print(f"         {hit['url']}")
+    print(f"\n{len(hits)} hits in {elapsed_ms:.1f} ms ({index.doc_count:,} segments)")
+
+
+if __name__ == "__main__":
+    main()
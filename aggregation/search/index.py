@@ -0,0 +1,470 @@
+"""
+Full-text search over timestamped transcript segments.
+Single Responsibility: Build, incrementally update and query a BM25-ranked positional
+inverted index stored as memory-mapped numpy arrays.
+
+Index directory layout:
+    manifest.json         live index segments + per video: (index segment, content signature)
+    seg_000001/           one immutable index segment
+        meta.json         videos, speakers and sorted terms of this segment
+        doc_*.npy         per-document columns (video, speaker, start, end, token count)
+        text_ptr.npy      offsets into text.bin (UTF-8 segment texts)
+        term_ptr.npy      term i -> postings [term_ptr[i], term_ptr[i+1])
+        post_doc.npy      posting -> document (ascending within a term)
+        post_tf.npy       posting -> term frequency
+        pos_ptr.npy       posting -> token positions [pos_ptr[p], pos_ptr[p+1]) in positions.npy
+
+A document is one transcript segment. New or changed videos go into a new index segment;
+the manifest decides which index segment holds a video's live documents, so stale copies
+are skipped at query time and dropped when segments are merged.
+"""
+
+import json
+import logging
+import math
+import shutil
+import zlib
+from bisect import bisect_left
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .tokenizer import parse_query, tokenize
+from ..models.raw_data import BPKTranscript, RTTMEntry, Segment
+
+logger = logging.getLogger(__name__)
+
+# BM25 parameters
+K1 = 1.2
+B = 0.75
+
+
+def assign_speakers(
+    segments: List[Segment],
+    entries: List[RTTMEntry],
+    identity: Optional[Dict[str, str]] = None,
+) -> List[str]:
+    """Speaker with the largest overlap per transcript segment ('' if none), as global ID when known."""
+    if not entries:
+        return [""] * len(segments)
+
+    entries = sorted(entries, key=lambda e: e.start)
+    starts = [e.start for e in entries]
+    max_duration = max(e.duration for e in entries)
+    identity = identity or {}
+
+    speakers = []
+    for seg in segments:
+        overlap: Dict[str, float] = defaultdict(float)
+        lo = bisect_left(starts, seg.start - max_duration)
+        hi = bisect_left(starts, seg.end)
+        for entry in entries[lo:hi]:
+            shared = min(seg.end, entry.end) - max(seg.start, entry.start)
+            if shared > 0:
+                overlap[entry.speaker_id] += shared
+        best = max(overlap, key=overlap.get) if overlap else ""
+        speakers.append(identity.get(best, best))
+    return speakers
+
+
+def _signature(segments: List[Segment], speakers: List[str]) -> str:
+    """Content hash of what gets indexed for one video (text, timing and speakers)."""
+    blob = "\n".join(
+        f"{seg.start:.2f}\t{seg.end:.2f}\t{speaker}\t{seg.text}"
+        for seg, speaker in zip(segments, speakers)
+    )
+    return f"{zlib.crc32(blob.encode('utf-8')):08x}"
+
+
+class _IndexSegment:
+    """One immutable, memory-mapped index segment."""
+
+    ARRAYS = (
+        "doc_video", "doc_speaker", "doc_start", "doc_end", "doc_len", "text_ptr",
+        "term_ptr", "post_doc", "post_tf", "pos_ptr", "positions",
+    )
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.name = path.name
+        with open(path / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        self.videos: List[str] = meta["videos"]
+        self.speakers: List[str] = meta["speakers"]
+        self._video_index = {v: i for i, v in enumerate(self.videos)}
+        self._speaker_index = {s: i for i, s in enumerate(self.speakers)}
+        self._term_index = {t: i for i, t in enumerate(meta["terms"])}
+        for name in self.ARRAYS:
+            setattr(self, name, np.load(path / f"{name}.npy", mmap_mode="r"))
+        text_path = path / "text.bin"
+        self.text = (
+            np.memmap(text_path, dtype=np.uint8, mode="r")
+            if text_path.stat().st_size else np.zeros(0, dtype=np.uint8)
+        )
+        self.live = np.ones(len(self.doc_video), dtype=bool)
+
+    @classmethod
+    def write(cls, path: Path, docs: List[Dict[str, Any]]) -> "_IndexSegment":
+        """Tokenize documents and write them as a new index segment."""
+        videos = sorted({d["video_id"] for d in docs})
+        speakers = sorted({d["speaker"] for d in docs})
+        video_index = {v: i for i, v in enumerate(videos)}
+        speaker_index = {s: i for i, s in enumerate(speakers)}
+
+        postings: Dict[str, List[Tuple[int, List[int]]]] = defaultdict(list)
+        lengths = []
+        for doc_id, doc in enumerate(docs):
+            tokens = tokenize(doc["text"])
+            lengths.append(len(tokens))
+            positions: Dict[str, List[int]] = defaultdict(list)
+            for pos, term in enumerate(tokens):
+                positions[term].append(pos)
+            for term, pos in positions.items():
+                postings[term].append((doc_id, pos))
+
+        terms = sorted(postings)
+        term_ptr = np.zeros(len(terms) + 1, dtype=np.int64)
+        post_doc: List[int] = []
+        post_tf: List[int] = []
+        pos_ptr = [0]
+        all_positions: List[int] = []
+        for i, term in enumerate(terms):
+            for doc_id, pos in postings[term]:
+                post_doc.append(doc_id)
+                post_tf.append(len(pos))
+                all_positions.extend(pos)
+                pos_ptr.append(len(all_positions))
+            term_ptr[i + 1] = len(post_doc)
+
+        encoded = [d["text"].encode("utf-8") for d in docs]
+        text_ptr = np.zeros(len(docs) + 1, dtype=np.int64)
+        text_ptr[1:] = np.cumsum([len(e) for e in encoded])
+
+        arrays = {
+            "doc_video": np.array([video_index[d["video_id"]] for d in docs], dtype=np.int32),
+            "doc_speaker": np.array([speaker_index[d["speaker"]] for d in docs], dtype=np.int32),
+            "doc_start": np.array([d["start"] for d in docs], dtype=np.float32),
+            "doc_end": np.array([d["end"] for d in docs], dtype=np.float32),
+            "doc_len": np.array(lengths, dtype=np.int32),
+            "text_ptr": text_ptr,
+            "term_ptr": term_ptr,
+            "post_doc": np.array(post_doc, dtype=np.int32),
+            "post_tf": np.array(post_tf, dtype=np.int32),
+            "pos_ptr": np.array(pos_ptr, dtype=np.int64),
+            "positions": np.array(all_positions, dtype=np.int32),
+        }
+
+        tmp = path.with_name(path.name + ".tmp")
+        shutil.rmtree(tmp, ignore_errors=True)
+        tmp.mkdir(parents=True)
+        for name, array in arrays.items():
+            np.save(tmp / f"{name}.npy", array)
+        (tmp / "text.bin").write_bytes(b"".join(encoded))
+        with open(tmp / "meta.json", "w", encoding="utf-8") as f:
+            json.dump({"videos": videos, "speakers": speakers, "terms": terms}, f, ensure_ascii=False)
+        # A crash between this rename and the manifest save leaves an orphan under this name
+        shutil.rmtree(path, ignore_errors=True)
+        tmp.replace(path)
+        return cls(path)
+
+    def set_live(self, live_videos: Set[str]) -> None:
+        video_live = np.array([v in live_videos for v in self.videos], dtype=bool)
+        self.live = video_live[self.doc_video] if len(self.videos) else np.zeros(0, dtype=bool)
+
+    def postings(self, term: str) -> Optional[Tuple[int, int]]:
+        i = self._term_index.get(term)
+        return None if i is None else (int(self.term_ptr[i]), int(self.term_ptr[i + 1]))
+
+    def doc_freq(self, term: str) -> int:
+        rng = self.postings(term)
+        return 0 if rng is None else int(self.live[self.post_doc[rng[0]:rng[1]]].sum())
+
+    def accept(self, docs: np.ndarray, video_id: Optional[str], speaker: Optional[str]) -> np.ndarray:
+        """Mask of live documents that pass the video/speaker filters."""
+        keep = self.live[docs]
+        if video_id is not None:
+            keep &= self.doc_video[docs] == self._video_index.get(video_id, -1)
+        if speaker is not None:
+            keep &= self.doc_speaker[docs] == self._speaker_index.get(speaker, -1)
+        return keep
+
+    def phrase_mask(self, docs: np.ndarray, phrase: List[str]) -> np.ndarray:
+        """Mask of documents (sorted ids) that contain the phrase at consecutive positions."""
+        ranges = [self.postings(term) for term in phrase]
+        if not len(docs) or any(rng is None for rng in ranges):
+            return np.zeros(len(docs), dtype=bool)
+
+        # Posting index of every (term, candidate) pair, starting from the rarest term so
+        # the lookups shrink as documents missing a term drop out
+        order = sorted(range(len(phrase)), key=lambda j: ranges[j][1] - ranges[j][0])
+        a, b = ranges[order[0]]
+        rare_docs = np.asarray(self.post_doc[a:b])
+        rows = np.minimum(np.searchsorted(docs, rare_docs), len(docs) - 1)
+        found = docs[rows] == rare_docs
+        rows = rows[found]
+        slots = {order[0]: a + np.flatnonzero(found)}
+        for j in order[1:]:
+            a, b = ranges[j]
+            term_docs = np.asarray(self.post_doc[a:b])
+            idx = np.minimum(np.searchsorted(term_docs, docs[rows]), b - a - 1)
+            found = term_docs[idx] == docs[rows]
+            rows = rows[found]
+            slots = {k: v[found] for k, v in slots.items()}
+            slots[j] = a + idx[found]
+
+        # Candidate phrase starts per term as (doc row << 32 | position - offset); a phrase
+        # matches where the keys of all its terms coincide
+        keys = None
+        for offset in range(len(phrase)):
+            p = slots[offset]
+            lo, hi = self.pos_ptr[p], self.pos_ptr[p + 1]
+            lengths = hi - lo
+            gather = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths) + np.repeat(lo, lengths)
+            term_keys = (np.repeat(rows, lengths).astype(np.int64) << 32) | (
+                self.positions[gather].astype(np.int64) - offset + len(phrase)
+            )
+            keys = term_keys if keys is None else np.intersect1d(keys, term_keys, assume_unique=True)
+            if not len(keys):
+                break
+
+        mask = np.zeros(len(docs), dtype=bool)
+        mask[np.unique(keys >> 32)] = True
+        return mask
+
+    def doc_text(self, doc: int) -> str:
+        return bytes(self.text[self.text_ptr[doc]:self.text_ptr[doc + 1]]).decode("utf-8")
+
+    def hit(self, doc: int, score: float) -> Dict[str, Any]:
+        video_id = self.videos[self.doc_video[doc]]
+        start = float(self.doc_start[doc])
+        return {
+            "video_id": video_id,
+            "start": round(start, 2),
+            "end": round(float(self.doc_end[doc]), 2),
+            "speaker": self.speakers[self.doc_speaker[doc]] or None,
+            "score": round(score, 4),
+            "text": self.doc_text(doc),
+            "url": f"https://www.youtube.com/watch?v={video_id}&t={int(start)}s",
+        }
+
+    def iter_live_docs(self) -> Iterator[Dict[str, Any]]:
+        for doc in np.flatnonzero(self.live):
+            yield {
+                "video_id": self.videos[self.doc_video[doc]],
+                "start": float(self.doc_start[doc]),
+                "end": float(self.doc_end[doc]),
+                "speaker": self.speakers[self.doc_speaker[doc]],
+                "text": self.doc_text(doc),
+            }
+
+
+class SearchIndex:
+    """
+    BM25-ranked positional index over transcript segments.
+
+    `update()` indexes only new or changed videos (compared by content signature) into a
+    new index segment; once more than `max_segments` exist they are merged into one.
+    Queries rank terms with BM25 over the live documents of all segments; quoted phrases
+    must occur at consecutive positions.
+    """
+
+    MANIFEST_FILE = "manifest.json"
+
+    def __init__(self, index_dir: Path, max_segments: int = 8):
+        self.index_dir = index_dir
+        self.max_segments = max_segments
+        # video_id -> {"segment": index segment name (None if it has no text), "signature": str}
+        self._videos: Dict[str, Dict[str, Optional[str]]] = {}
+        self._segments: List[_IndexSegment] = []
+        self._next_segment = 1
+        self._doc_count = 0
+        self._total_len = 0
+        self._load()
+
+    @property
+    def video_count(self) -> int:
+        return len(self._videos)
+
+    @property
+    def doc_count(self) -> int:
+        return self._doc_count
+
+    @property
+    def segment_count(self) -> int:
+        return len(self._segments)
+
+    def _load(self) -> None:
+        manifest_path = self.index_dir / self.MANIFEST_FILE
+        if not manifest_path.exists():
+            return
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        self._videos = manifest.get("videos", {})
+        self._next_segment = manifest.get("next_segment", 1)
+        self._segments = [_IndexSegment(self.index_dir / name) for name in manifest.get("segments", [])]
+        self._refresh()
+
+    def _refresh(self) -> None:
+        """Recompute per-segment liveness and the corpus statistics BM25 needs."""
+        by_segment: Dict[str, Set[str]] = defaultdict(set)
+        for video_id, info in self._videos.items():
+            by_segment[info["segment"]].add(video_id)
+        for seg in self._segments:
+            seg.set_live(by_segment.get(seg.name, set()))
+        self._doc_count = sum(int(seg.live.sum()) for seg in self._segments)
+        self._total_len = sum(int(seg.doc_len[seg.live].sum()) for seg in self._segments)
+
+    def _save(self) -> None:
+        """Persist the manifest (atomic) and delete index segments without live documents."""
+        dead = [seg for seg in self._segments if not seg.live.any()]
+        self._segments = [seg for seg in self._segments if seg.live.any()]
+        manifest = {
+            "version": 1,
+            "next_segment": self._next_segment,
+            "segments": [seg.name for seg in self._segments],
+            "videos": self._videos,
+        }
+        tmp = self.index_dir / (self.MANIFEST_FILE + ".tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, ensure_ascii=False)
+        tmp.replace(self.index_dir / self.MANIFEST_FILE)
+        for seg in dead:
+            shutil.rmtree(seg.path, ignore_errors=True)
+
+    def _write_segment(self, docs: List[Dict[str, Any]]) -> Optional[str]:
+        if not docs:
+            return None
+        name = f"seg_{self._next_segment:06d}"
+        self._next_segment += 1
+        self._segments.append(_IndexSegment.write(self.index_dir / name, docs))
+        return name
+
+    def update(
+        self,
+        transcripts: Iterable[BPKTranscript],
+        diarization: Optional[Dict[str, List[RTTMEntry]]] = None,
+        identity_map: Optional[Dict[str, Dict[str, str]]] = None,
+        prune: bool = True,
+    ) -> Dict[str, int]:
+        """
+        Index new and changed transcripts. With `prune`, videos missing from
+        `transcripts` are removed (pass the whole corpus); returns per-outcome counts.
+        """
+        diarization = diarization or {}
+        identity_map = identity_map or {}
+        counts: Counter = Counter()
+        docs: List[Dict[str, Any]] = []
+        changed: List[Tuple[str, str]] = []
+        seen = set()
+
+        for transcript in transcripts:
+            video_id = transcript.video_id
+            seen.add(video_id)
+            speakers = assign_speakers(
+                transcript.segments, diarization.get(video_id, []), identity_map.get(video_id)
+            )
+            signature = _signature(transcript.segments, speakers)
+            current = self._videos.get(video_id)
+            if current and current["signature"] == signature:
+                counts["unchanged"] += 1
+                continue
+            counts["updated" if current else "added"] += 1
+            changed.append((video_id, signature))
+            docs.extend(
+                {"video_id": video_id, "start": seg.start, "end": seg.end, "speaker": speaker, "text": seg.text}
+                for seg, speaker in zip(transcript.segments, speakers)
+                if seg.text
+            )
+
+        removed = [video_id for video_id in self._videos if video_id not in seen] if prune else []
+        if not changed and not removed:
+            return dict(counts)
+
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        name = self._write_segment(docs)
+        for video_id, signature in changed:
+            self._videos[video_id] = {"segment": name, "signature": signature}
+        for video_id in removed:
+            del self._videos[video_id]
+        counts["removed"] = len(removed)
+
+        self._refresh()
+        if len(self._segments) > self.max_segments:
+            self.merge()
+        else:
+            self._save()
+
+        logger.info(
+            f"Search index: {counts['added']} added, {counts['updated']} updated, "
+            f"{counts['removed']} removed; {self._doc_count} segments of {self.video_count} videos "
+            f"in {len(self._segments)} index segments"
+        )
+        return dict(counts)
+
+    def merge(self) -> None:
+        """Rewrite all live documents into a single index segment."""
+        old = self._segments
+        self._segments = []
+        docs = [doc for seg in old for doc in seg.iter_live_docs()]
+        name = self._write_segment(docs)
+        for info in self._videos.values():
+            if info["segment"] is not None:
+                info["segment"] = name
+        self._refresh()
+        self._save()
+        for seg in old:
+            shutil.rmtree(seg.path, ignore_errors=True)
+
+    def search(
+        self,
+        query: str,
+        k: int = 10,
+        video_id: Optional[str] = None,
+        speaker: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Top-k segments for a query: `Taurus Lieferung`, `"an die Ukraine"`.
+        Each hit has video_id, start, end, speaker, score, text and a timestamped url.
+        """
+        terms, phrases = parse_query(query)
+        if not terms or not self._doc_count or k <= 0:
+            return []
+
+        unique_terms = list(dict.fromkeys(terms))
+        avgdl = self._total_len / self._doc_count
+        idf = {}
+        for term in unique_terms:
+            df = sum(seg.doc_freq(term) for seg in self._segments)
+            idf[term] = math.log(1 + (self._doc_count - df + 0.5) / (df + 0.5))
+
+        hits: List[Tuple[float, _IndexSegment, int]] = []
+        for seg in self._segments:
+            doc_parts, score_parts = [], []
+            for term in unique_terms:
+                rng = seg.postings(term)
+                if rng is None:
+                    continue
+                docs = np.asarray(seg.post_doc[rng[0]:rng[1]])
+                keep = seg.accept(docs, video_id, speaker)
+                docs = docs[keep]
+                tf = seg.post_tf[rng[0]:rng[1]][keep].astype(np.float32)
+                norm = K1 * (1 - B + B * seg.doc_len[docs] / avgdl)
+                doc_parts.append(docs)
+                score_parts.append(idf[term] * tf * (K1 + 1) / (tf + norm))
+            if not doc_parts:
+                continue
+
+            docs, inverse = np.unique(np.concatenate(doc_parts), return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+            for phrase in phrases:
+                match = seg.phrase_mask(docs, phrase)
+                docs, scores = docs[match], scores[match]
+            if len(scores) > k:
+                top = np.argpartition(-scores, k - 1)[:k]
+                docs, scores = docs[top], scores[top]
+            hits.extend((float(score), seg, int(doc)) for doc, score in zip(docs, scores))
+
+        hits.sort(key=lambda h: -h[0])
+        return [seg.hit(doc, score) for score, seg, doc in hits[:k]]
@@ -0,0 +1,65 @@
+"""
+German-aware tokenizer for the full-text search index.
+Single Responsibility: Turn transcript text (and queries) into normalized index terms.
+
+Normalization: NFKC + casefold (ß -> ss), umlauts and accents folded (ä -> a), then the
+CISTEM stemmer (Weissweiler & Fraser, 2017) so that inflections share one term
+("Lieferungen", "Lieferung" -> "lieferung"). Hyphenated compounds are split into their
+parts ("Taurus-Lieferung" -> "tauru", "lieferung").
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+from typing import List, Tuple
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+_PHRASE_RE = re.compile(r'"([^"]*)"')
+
+
+def fold(word: str) -> str:
+    """Casefold and strip diacritics (umlauts, accents)."""
+    word = unicodedata.normalize("NFKD", word.casefold())
+    return "".join(ch for ch in word if not unicodedata.combining(ch))
+
+
+@lru_cache(maxsize=200_000)
+def stem(word: str) -> str:
+    """CISTEM stemming of one folded, lowercase word (case-insensitive variant)."""
+    if len(word) <= 3 or word.isdigit():
+        return word
+    word = word.replace("sch", "$").replace("ei", "%").replace("ie", "&")
+    word = re.sub(r"(.)\1", r"\1*", word)
+    while len(word) > 3:
+        if len(word) > 5:
+            word, n = re.subn(r"e[mr]$", "", word)
+            if n:
+                continue
+            word, n = re.subn(r"nd$", "", word)
+            if n:
+                continue
+        word, n = re.subn(r"[tesn]$", "", word)
+        if not n:
+            break
+    word = re.sub(r"(.)\*", r"\1\1", word)
+    return word.replace("$", "sch").replace("%", "ei").replace("&", "ie")
+
+
+def tokenize(text: str) -> List[str]:
+    """Index terms of a text, in order (positions are list indices)."""
+    return [stem(fold(word)) for word in _WORD_RE.findall(text or "")]
+
+
+def parse_query(query: str) -> Tuple[List[str], List[List[str]]]:
+    """
+    Split a query into ranked terms and required phrases.
+
+    `Taurus "an die Ukraine"` -> (["tauru", "an", "die", "ukrain"], [["an", "die", "ukrain"]])
+    Phrase terms also count towards the BM25 score.
+    """
+    phrases = [tokenize(p) for p in _PHRASE_RE.findall(query)]
+    phrases = [p for p in phrases if p]
+    terms = tokenize(_PHRASE_RE.sub(" ", query))
+    for phrase in phrases:
+        terms.extend(phrase)
+    return terms, phrases
@@ -0,0 +1,9 @@
+"""
+Mergeable, fixed-memory sketches for the BPK Aggregation Pipeline.
+"""
+
+from .hyperloglog import HyperLogLog
+from .space_saving import SpaceSaving
+from .store import VideoSketchStore
+
+__all__ = ["HyperLogLog", "SpaceSaving", "VideoSketchStore"]
@@ -0,0 +1,77 @@
+"""
+HyperLogLog distinct-count sketch.
+Single Responsibility: Estimate the number of distinct items in fixed memory, mergeable by union.
+"""
+
+import hashlib
+import math
+from typing import Hashable, Iterable, Optional
+
+import numpy as np
+
+
+class HyperLogLog:
+    """
+    HyperLogLog (Flajolet et al., 2007) with linear counting for small cardinalities.
+
+    Uses 2**p one-byte registers; the relative standard error of `count()` is
+    1.04 / sqrt(2**p) (p=12: 4 KiB, ±1.6%). Merging (register-wise max) gives exactly the
+    sketch of the union, so per-video sketches combine into corpus or date-range counts.
+    """
+
+    def __init__(self, p: int = 12, registers: Optional[np.ndarray] = None):
+        if not 4 <= p <= 18:
+            raise ValueError("p must be between 4 and 18")
+        self.p = p
+        self.m = 1 << p
+        if registers is None:
+            registers = np.zeros(self.m, dtype=np.uint8)
+        elif len(registers) != self.m:
+            raise ValueError(f"Expected {self.m} registers, got {len(registers)}")
+        self.registers = np.asarray(registers, dtype=np.uint8)
+
+    @property
+    def relative_error(self) -> float:
+        return 1.04 / math.sqrt(self.m)
+
+    @staticmethod
+    def _hash(item: Hashable) -> int:
+        return int.from_bytes(hashlib.blake2b(str(item).encode("utf-8"), digest_size=8).digest(), "big")
+
+    def add(self, item: Hashable) -> None:
+        h = self._hash(item)
+        index = h >> (64 - self.p)
+        rest = (h << self.p) & 0xFFFFFFFFFFFFFFFF
+        rank = min(64 - self.p, 64 - rest.bit_length()) + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, items: Iterable[Hashable]) -> None:
+        for item in items:
+            self.add(item)
+
+    def merge(self, other: "HyperLogLog") -> "HyperLogLog":
+        """Union with another sketch (in place)."""
+        if other.p != self.p:
+            raise ValueError(f"Cannot merge HyperLogLog sketches with p={self.p} and p={other.p}")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+
+    def count(self) -> int:
+        """Estimated number of distinct items."""
+        alpha = 0.7213 / (1 + 1.079 / self.m)
+        estimate = alpha * self.m ** 2 / float(np.sum(np.ldexp(1.0, -self.registers.astype(np.int32))))
+        zeros = int(np.count_nonzero(self.registers == 0))
+        if estimate <= 2.5 * self.m and zeros:
+            estimate = self.m * math.log(self.m / zeros)
+        return int(round(estimate))
+
+    def copy(self) -> "HyperLogLog":
+        return HyperLogLog(self.p, self.registers.copy())
+
+    @classmethod
+    def union(cls, sketches: Iterable["HyperLogLog"], p: int = 12) -> "HyperLogLog":
+        merged = None
+        for sketch in sketches:
+            merged = sketch.copy() if merged is None else merged.merge(sketch)
+        return merged if merged is not None else cls(p)
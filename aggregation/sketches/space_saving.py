@@ -0,0 +1,114 @@
+"""
+Space-Saving heavy-hitters sketch.
+Single Responsibility: Approximate top-k counting in fixed memory, mergeable across videos.
+"""
+
+import heapq
+from typing import Any, Dict, Hashable, Iterable, List, Mapping, Tuple
+
+
+class SpaceSaving:
+    """
+    Space-Saving summary (Metwally et al., 2005) with the merge of Cafaro et al. (2016).
+
+    Monitors at most `capacity` items. Every monitored item has a count that
+    over-estimates its true frequency by at most `errors[item]`, and any item that is not
+    monitored occurred at most `floor` times. All errors are bounded by `total / capacity`.
+    """
+
+    def __init__(self, capacity: int = 1000):
+        if capacity < 1:
+            raise ValueError("capacity must be >= 1")
+        self.capacity = capacity
+        self.total = 0
+        self.counts: Dict[Hashable, int] = {}
+        self.errors: Dict[Hashable, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    def __contains__(self, item: Hashable) -> bool:
+        return item in self.counts
+
+    @property
+    def floor(self) -> int:
+        """Upper bound on the count of any unmonitored item."""
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def add(self, item: Hashable, count: int = 1) -> None:
+        """Stream one item (O(capacity) when an item has to be evicted)."""
+        self.total += count
+        if item in self.counts:
+            self.counts[item] += count
+            return
+        if len(self.counts) < self.capacity:
+            self.counts[item] = count
+            self.errors[item] = 0
+            return
+        victim = min(self.counts, key=self.counts.get)
+        floor = self.counts.pop(victim)
+        del self.errors[victim]
+        self.counts[item] = floor + count
+        self.errors[item] = floor
+
+    def update(self, items: Iterable[Hashable]) -> None:
+        for item in items:
+            self.add(item)
+
+    @classmethod
+    def from_counts(cls, counts: Mapping[Hashable, int], capacity: int = 1000) -> "SpaceSaving":
+        """
+        Summary of exact counts (e.g. one video's Counter): the `capacity` largest are kept
+        exactly, and every dropped item is bounded by the smallest kept count.
+        """
+        sketch = cls(capacity)
+        sketch.total = sum(counts.values())
+        top = heapq.nlargest(capacity, counts.items(), key=lambda kv: kv[1])
+        sketch.counts = dict(top)
+        sketch.errors = {item: 0 for item, _ in top}
+        return sketch
+
+    def merge(self, other: "SpaceSaving") -> "SpaceSaving":
+        """Merge another summary into this one (in place); the error bound stays total / capacity."""
+        floor_self, floor_other = self.floor, other.floor
+        items = set(self.counts) | set(other.counts)
+        counts = {
+            item: self.counts.get(item, floor_self) + other.counts.get(item, floor_other)
+            for item in items
+        }
+        top = heapq.nlargest(self.capacity, counts.items(), key=lambda kv: kv[1])
+        self.errors = {
+            item: self.errors.get(item, floor_self) + other.errors.get(item, floor_other)
+            for item, _ in top
+        }
+        self.counts = dict(top)
+        self.total += other.total
+        return self
+
+    def top(self, k: int) -> List[Tuple[Hashable, int, int, bool]]:
+        """
+        The k largest items as (item, count, error, guaranteed). The true count lies in
+        [count - error, count]; `guaranteed` means the item is certainly among the true top-k.
+        """
+        ranked = sorted(self.counts.items(), key=lambda kv: (-kv[1], str(kv[0])))
+        threshold = ranked[k][1] if len(ranked) > k else self.floor
+        return [
+            (item, count, self.errors[item], count - self.errors[item] >= threshold)
+            for item, count in ranked[:k]
+        ]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "capacity": self.capacity,
+            "total": self.total,
+            "items": [[item, count, self.errors[item]] for item, count in self.counts.items()],
+        }
+
+    @classmethod
+    def from_dict(cls, data: Mapping[str, Any]) -> "SpaceSaving":
+        sketch = cls(int(data["capacity"]))
+        sketch.total = int(data["total"])
+        for item, count, error in data["items"]:
+            sketch.counts[item] = int(count)
+            sketch.errors[item] = int(error)
+        return sketch
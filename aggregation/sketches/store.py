@@ -0,0 +1,94 @@
+"""
+Per-video sketch store.
+Single Responsibility: Persist per-video distinct-count sketches and answer corpus or
+date-range cardinalities by merging them instead of rescanning transcripts.
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+
+from .hyperloglog import HyperLogLog
+
+logger = logging.getLogger(__name__)
+
+
+class VideoSketchStore:
+    """
+    `<video_id>.npz` per video: one HyperLogLog register array per kind
+    (persons, locations, organizations, vocabulary, speakers, ...) plus the video's date.
+    """
+
+    def __init__(self, sketch_dir: Path, p: int = 12):
+        self.sketch_dir = sketch_dir
+        self.p = p
+
+    def save(self, video_id: str, sketches: Dict[str, HyperLogLog], date: Optional[str] = None) -> None:
+        self.sketch_dir.mkdir(parents=True, exist_ok=True)
+        arrays = {f"hll_{kind}": sketch.registers for kind, sketch in sketches.items()}
+        path = self.sketch_dir / f"{video_id}.npz"
+        tmp = self.sketch_dir / f"{video_id}.tmp.npz"
+        np.savez_compressed(tmp, date=np.array(date or ""), **arrays)
+        tmp.replace(path)
+
+    def load(self, video_id: str) -> Optional[Dict[str, HyperLogLog]]:
+        path = self.sketch_dir / f"{video_id}.npz"
+        if not path.exists():
+            return None
+        with np.load(path) as data:
+            return {
+                key[len("hll_"):]: HyperLogLog(self.p, data[key])
+                for key in data.files if key.startswith("hll_")
+            }
+
+    def dates(self) -> Dict[str, str]:
+        """video_id -> date (YYYY-MM-DD, '' if unknown) of every stored video."""
+        dates = {}
+        for path in sorted(self.sketch_dir.glob("*.npz")):
+            if path.name.endswith(".tmp.npz"):
+                continue
+            with np.load(path) as data:
+                dates[path.stem] = str(data["date"])
+        return dates
+
+    def video_ids(self, start: Optional[str] = None, end: Optional[str] = None) -> List[str]:
+        """Stored videos, optionally restricted to dates in [start, end] (inclusive, YYYY-MM-DD)."""
+        if start is None and end is None:
+            return [p.stem for p in sorted(self.sketch_dir.glob("*.npz")) if not p.name.endswith(".tmp.npz")]
+        return [
+            video_id for video_id, date in self.dates().items()
+            if date and (start is None or date >= start) and (end is None or date <= end)
+        ]
+
+    def merged(self, kinds: Iterable[str], video_ids: Iterable[str]) -> Dict[str, HyperLogLog]:
+        """Union sketch per kind over the given videos."""
+        kinds = list(kinds)
+        merged = {kind: HyperLogLog(self.p) for kind in kinds}
+        for video_id in video_ids:
+            sketches = self.load(video_id) or {}
+            for kind in kinds:
+                if kind in sketches:
+                    merged[kind].merge(sketches[kind])
+        return merged
+
+    def cardinalities(
+        self,
+        kinds: Iterable[str],
+        start: Optional[str] = None,
+        end: Optional[str] = None,
+    ) -> Dict[str, int]:
+        """Estimated distinct counts per kind for the whole corpus or a date range."""
+        merged = self.merged(kinds, self.video_ids(start, end))
+        return {kind: sketch.count() for kind, sketch in merged.items()}
+
+    def prune(self, keep: Iterable[str]) -> int:
+        """Delete sketches of videos that are no longer in the corpus."""
+        keep = set(keep)
+        removed = 0
+        for path in self.sketch_dir.glob("*.npz"):
+            if path.stem not in keep and not path.name.endswith(".tmp.npz"):
+                path.unlink()
+                removed += 1
+        return removed
@@ -1,16 +1,23 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """
-BPK Pipeline (MLX-Whisper + Pyannote Diarization)
+BPK Pipeline (MLX-Whisper / faster-whisper + Pyannote Diarization)
 - Resilient: SQLite state tracking, atomic writes, graceful shutdown, retry logic
 - Scalable: Streaming playlist fetch, efficient memory management
+- Distributed: lease-based work claiming in the StateDB, static --shard i/N partitioning
+- Portable: pluggable ASR/diarization backends (mlx, cpu, stub) with a built-in RTF benchmark
+- Deduplicating: audio fingerprints catch re-uploads before ASR and reuse existing outputs
 - User-friendly: Rich progress UI, bundled logs, real-time stats
+- Observable: buffered event log, per-stage Prometheus metrics (textfile or local HTTP)
 """
 
+import abc
 import argparse
 import contextlib
 import datetime as dt
 import gc
+import glob
+import gzip
 import inspect
 import json
 import logging
@@ -20,14 +27,19 @@ import random
 import re
 import shutil
 import signal
+import socket
 import sqlite3
 import subprocess
 import sys
+import threading
 import time
 import warnings
-from collections import deque
+import wave
+import zlib
+from collections import Counter, deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
-from typing import Dict, Iterable, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
 
 # -----------------------------
 # Suppress noisy warnings
@@ -39,6 +51,13 @@ warnings.filterwarnings("ignore", message=".*weights_only.*")
 
 LOG = logging.getLogger("BPK_Pipeline")
 
+SAMPLE_RATE = 16000
+# Same directory as aggregation.config.STATE_DIR: speaker centroids etc., outside the served public/
+DEFAULT_STATE_DIR = Path(__file__).resolve().parent / ".state"
+
+# 16 kHz mono audio: a WAV path on disk, or a float32 numpy buffer decoded in memory
+Audio = Union[Path, Any]
+
 # -----------------------------
 # Graceful shutdown
 # -----------------------------
@@ -51,7 +70,7 @@ class StopFlag:
 
     def _handle(self, signum, frame):
         if not self.stop:
-            LOG.warning("\n[STOP] Shutdown signal received. Finishing current video, then exiting...")
+            LOG.warning("\n[STOP] Shutdown signal received. Finishing current video (or ASR chunk), then exiting...")
         self.stop = True
 
 
@@ -68,24 +87,63 @@ def atomic_write_text(path: Path, text: str, encoding: str = "utf-8"):
     tmp.write_text(text, encoding=encoding)
     tmp.replace(path)
 
-def append_jsonl(path: Path, obj: Dict):
-    path.parent.mkdir(parents=True, exist_ok=True)
-    with path.open("a", encoding="utf-8") as f:
-        f.write(json.dumps(obj, ensure_ascii=False) + "\n")
-
 def tail(s: str, max_chars: int = 4000) -> str:
     s = s or ""
     return s if len(s) <= max_chars else s[-max_chars:]
 
+def parse_shard(spec: Optional[str]) -> Optional[Tuple[int, int]]:
+    """Parse '--shard i/N' into (i, N); None means no static partitioning."""
+    if not spec:
+        return None
+    m = re.fullmatch(r"\s*(\d+)\s*/\s*(\d+)\s*", spec)
+    if not m:
+        raise ValueError(f"Invalid shard spec {spec!r} (expected i/N)")
+    i, n = int(m.group(1)), int(m.group(2))
+    if n < 1 or not (0 <= i < n):
+        raise ValueError(f"Invalid shard spec {spec!r} (need 0 <= i < N)")
+    return i, n
+
+def shard_key(vid: str) -> int:
+    """Stable (cross-host) hash used for static sharding."""
+    return zlib.crc32(vid.encode("utf-8"))
+
 def normalize_url(url: str) -> str:
     url = url.replace("\\?", "?").replace("\\=", "=").replace("\\&", "&").replace("\\", "")
     return url.strip()
 
+def _num(v: Any) -> Optional[float]:
+    try:
+        return float(v) if v not in (None, "", "NA", "None") else None
+    except (TypeError, ValueError):
+        return None
+
+def video_publish_ts(meta: Dict) -> Optional[float]:
+    """Publish time (epoch seconds) from yt-dlp fields: timestamp, release_timestamp or upload_date."""
+    ts = _num(meta.get("timestamp")) or _num(meta.get("release_timestamp"))
+    if ts:
+        return ts
+    upload_date = str(meta.get("upload_date") or "")
+    if re.fullmatch(r"\d{8}", upload_date):
+        return dt.datetime.strptime(upload_date, "%Y%m%d").replace(tzinfo=dt.timezone.utc).timestamp()
+    return None
+
+# Flat-playlist fields printed per manifest entry (missing ones come back as "NA")
+MANIFEST_PRINT = "%(id)s\t%(duration)s\t%(timestamp)s\t%(release_timestamp)s\t%(upload_date)s"
+
+def parse_manifest_line(line: str) -> Optional[Tuple[str, Optional[float], Optional[float]]]:
+    """(video_id, duration_s, publish_ts) from one MANIFEST_PRINT line."""
+    parts = line.rstrip("\n").split("\t")
+    vid = parts[0].strip()
+    if not vid:
+        return None
+    fields = dict(zip(("duration", "timestamp", "release_timestamp", "upload_date"), parts[1:]))
+    return vid, _num(fields.get("duration")), video_publish_ts(fields)
+
 def word_count(text: str) -> int:
     return len([w for w in re.split(r"\s+", (text or "").strip()) if w])
 
-def filter_hallucinations(segments: List[Dict]) -> List[Dict]:
-    """Remove Whisper hallucinations (repetitive words > 60% of segment)."""
+def filter_hallucinations(segments: List[Dict], max_repeat_ratio: float = 0.6) -> List[Dict]:
+    """Remove Whisper hallucinations (repetitive words > max_repeat_ratio of segment)."""
     clean = []
     for s in segments:
         text = (s.get("text") or "").strip()
@@ -94,7 +152,7 @@ def filter_hallucinations(segments: List[Dict]) -> List[Dict]:
         words = re.split(r"\s+", text)
         if len(words) > 5:
             most_common = max(set(words), key=words.count)
-            if (words.count(most_common) / len(words)) > 0.6:
+            if (words.count(most_common) / len(words)) > max_repeat_ratio:
                 continue
         clean.append(s)
     return clean
@@ -133,6 +191,31 @@ def trim_segments_by_cutoff(segments: List[Dict], cutoff_s: Optional[float]) ->
     cutoff_s = float(cutoff_s)
     return [s for s in segments if float(s.get("end", 0.0)) <= cutoff_s]
 
+def normalize_asr_segments(raw_segments: Iterable[Dict]) -> List[Dict]:
+    """Whisper segments -> [{start, end, text}] (drops inverted timestamps)."""
+    segments = []
+    for s in raw_segments or []:
+        start_s = float(s.get("start", 0.0) or 0.0)
+        end_s = float(s.get("end", 0.0) or 0.0)
+        if end_s < start_s:
+            continue
+        text = (s.get("text", "") or "").strip()
+        segments.append({"start": start_s, "end": end_s, "text": text})
+    return segments
+
+def postprocess_segments(
+    segments: List[Dict],
+    *,
+    outro_window_s: float,
+    hallucination_ratio: float = 0.6,
+) -> Tuple[List[Dict], Optional[float], str]:
+    """Hallucination filter + outro trim; returns (kept segments, cutoff, transcript text)."""
+    segments = filter_hallucinations(segments, max_repeat_ratio=hallucination_ratio)
+    cutoff = detect_outro_cutoff(segments, window_s=float(outro_window_s))
+    kept = trim_segments_by_cutoff(segments, cutoff)
+    transcript_text = "\n".join(s["text"] for s in kept if s.get("text")).strip()
+    return kept, cutoff, transcript_text
+
 
 # -----------------------------
 # Tool resolution
@@ -206,12 +289,21 @@ def iter_cmd_stdout_lines(
 # SQLite state
 # -----------------------------
 class StateDB:
-    """SQLite-based state tracker for videos (status, attempts, errors, timings)."""
-    def __init__(self, path: Path):
+    """SQLite-based state tracker for videos (status, attempts, errors, timings, leases, priorities)."""
+    # Claim order per scheduling policy (lower first); failures being retried always go last
+    SCHEDULES = {
+        "fifo": "pos",
+        "newest": "-COALESCE(publish_ts, first_seen_ts, 0)",
+        "shortest": "COALESCE(duration_s, 1e9)",
+    }
+    RETRY_LAST = " + CASE WHEN status='failed' THEN 1e12 ELSE 0 END"
+
+    def __init__(self, path: Path, *, wal: bool = True):
         self.path = path
         self.path.parent.mkdir(parents=True, exist_ok=True)
-        self.conn = sqlite3.connect(str(self.path), check_same_thread=False)
-        self.conn.execute("PRAGMA journal_mode=WAL;")
+        self.conn = sqlite3.connect(str(self.path), check_same_thread=False, timeout=30.0)
+        # WAL needs shared memory; use rollback journal when several hosts share the state dir.
+        self.conn.execute("PRAGMA journal_mode=WAL;" if wal else "PRAGMA journal_mode=DELETE;")
         self.conn.execute("PRAGMA synchronous=NORMAL;")
         self._init()
 
@@ -235,12 +327,95 @@ class StateDB:
           v TEXT
         );
         """)
+        self._add_columns("videos", {
+            "pos": "INTEGER",
+            "shard_key": "INTEGER",
+            "worker_id": "TEXT",
+            "lease_until": "REAL",
+            "priority": "REAL",
+            "publish_ts": "REAL",
+            "duration_s": "REAL",
+            "first_seen_ts": "REAL",
+        })
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_videos_claim ON videos(status, pos);")
+        # The work queue proper: unfinished videos in claim order
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_videos_queue ON videos(priority, pos) WHERE status != 'ok';")
+        # Clustered by hash: a lookup is one B-tree range scan regardless of store size
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS fingerprints (
+          hash INTEGER NOT NULL,
+          video_id TEXT NOT NULL,
+          t INTEGER NOT NULL,
+          PRIMARY KEY (hash, video_id, t)
+        ) WITHOUT ROWID;
+        """)
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS stage_runs (
+          id INTEGER PRIMARY KEY,
+          video_id TEXT NOT NULL,
+          worker_id TEXT,
+          stage TEXT NOT NULL,
+          status TEXT NOT NULL,
+          started REAL NOT NULL,
+          ended REAL NOT NULL,
+          seconds REAL NOT NULL,
+          bytes INTEGER,
+          audio_s REAL
+        );
+        """)
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_stage_runs_stage ON stage_runs(stage, status, started);")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_stage_runs_started ON stage_runs(started);")
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_stage_runs_video ON stage_runs(video_id);")
+        self.conn.execute("""
+        CREATE TABLE IF NOT EXISTS aliases (
+          video_id TEXT PRIMARY KEY,
+          canonical_id TEXT NOT NULL,
+          offset_s REAL NOT NULL,
+          score REAL NOT NULL,
+          created_ts TEXT
+        );
+        """)
         self.conn.commit()
 
+    def _add_columns(self, table: str, columns: Dict[str, str]):
+        """Lightweight migration: add missing columns to state DBs from older runs."""
+        have = {row[1] for row in self.conn.execute(f"PRAGMA table_info({table})")}
+        for name, decl in columns.items():
+            if name not in have:
+                self.conn.execute(f"ALTER TABLE {table} ADD COLUMN {name} {decl}")
+
     def close(self):
         self.conn.commit()
         self.conn.close()
 
+    def get_meta(self, k: str) -> Optional[str]:
+        row = self.conn.execute("SELECT v FROM meta WHERE k=?", (k,)).fetchone()
+        return row[0] if row else None
+
+    def set_meta(self, k: str, v: str):
+        self.conn.execute("INSERT OR REPLACE INTO meta(k,v) VALUES(?, ?)", (k, v))
+        self.conn.commit()
+
+    def update_meta(self, k: str, fn: Callable[[Optional[str]], Optional[str]]) -> Optional[str]:
+        """
+        Read-modify-write of one meta value under the database write lock (BEGIN IMMEDIATE),
+        so concurrent workers apply their updates one after another. fn returns the new
+        value, or None to leave it unchanged.
+        """
+        if self.conn.in_transaction:
+            self.conn.commit()
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = self.conn.execute("SELECT v FROM meta WHERE k=?", (k,)).fetchone()
+            value = fn(row[0] if row else None)
+            if value is not None:
+                self.conn.execute("INSERT OR REPLACE INTO meta(k,v) VALUES(?, ?)", (k, value))
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+        return value
+
     def get_total(self) -> Optional[int]:
         row = self.conn.execute("SELECT v FROM meta WHERE k='total'").fetchone()
         return int(row[0]) if row and row[0].isdigit() else None
@@ -253,6 +428,232 @@ class StateDB:
         row = self.conn.execute("SELECT status FROM videos WHERE video_id=?", (vid,)).fetchone()
         return row[0] if row else None
 
+    # --- work queue / leases ---
+    @staticmethod
+    def _shard_sql(shard: Optional[Tuple[int, int]]) -> Tuple[str, Tuple]:
+        if not shard:
+            return "", ()
+        i, n = shard
+        return " AND shard_key % ? = ?", (n, i)
+
+    def enqueue(self, vids: Iterable[str]) -> int:
+        """
+        Register manifest ids in file order; existing rows keep their status.
+        Rows no longer in the manifest (or beyond --limit) lose their position and are not claimed.
+        Ids first seen after the initial manifest get first_seen_ts (a publish-time stand-in).
+        """
+        rows = [(vid, pos, shard_key(vid)) for pos, vid in enumerate(vids)]
+        has_rows = self.conn.execute("SELECT 1 FROM videos LIMIT 1").fetchone() is not None
+        first_seen = time.time() if has_rows else None
+        self.conn.execute("UPDATE videos SET pos=NULL WHERE pos IS NOT NULL;")
+        self.conn.executemany("""
+        INSERT INTO videos(video_id,status,pos,shard_key,first_seen_ts) VALUES(?, 'pending', ?, ?, ?)
+        ON CONFLICT(video_id) DO UPDATE SET
+          pos=excluded.pos,
+          shard_key=excluded.shard_key;
+        """, [row + (first_seen,) for row in rows])
+        self.conn.execute(f"UPDATE videos SET priority={self._priority_sql()} WHERE pos IS NOT NULL;")
+        self.conn.commit()
+        return len(rows)
+
+    # --- scheduling ---
+    def get_schedule(self) -> str:
+        name = self.get_meta("schedule")
+        return name if name in self.SCHEDULES else "fifo"
+
+    def _priority_sql(self) -> str:
+        return self.SCHEDULES[self.get_schedule()] + self.RETRY_LAST
+
+    def set_schedule(self, name: str):
+        """Switch the (shared) scheduling policy and re-rank the whole queue."""
+        if name not in self.SCHEDULES:
+            raise ValueError(f"Unknown schedule {name!r} (choose from {', '.join(self.SCHEDULES)})")
+        self.set_meta("schedule", name)
+        self.conn.execute(f"UPDATE videos SET priority={self._priority_sql()};")
+        self.conn.commit()
+
+    def set_video_meta(self, rows: Iterable[Tuple[str, Optional[float], Optional[float]]]):
+        """Record (video_id, duration_s, publish_ts) from playlist/video metadata; None keeps the old value."""
+        rows = [(duration_s, publish_ts, vid) for vid, duration_s, publish_ts in rows]
+        self.conn.executemany("""
+        UPDATE videos SET duration_s=COALESCE(?, duration_s), publish_ts=COALESCE(?, publish_ts)
+        WHERE video_id=?;
+        """, rows)
+        self.conn.executemany(
+            f"UPDATE videos SET priority={self._priority_sql()} WHERE video_id=?;",
+            [(row[2],) for row in rows],
+        )
+        self.conn.commit()
+
+    def count_queued(self, *, shard: Optional[Tuple[int, int]] = None,
+                     statuses: Optional[Tuple[str, ...]] = None) -> int:
+        sql = "SELECT COUNT(*) FROM videos WHERE pos IS NOT NULL"
+        params: Tuple = ()
+        if statuses:
+            sql += f" AND status IN ({','.join('?' * len(statuses))})"
+            params += tuple(statuses)
+        shard_sql, shard_params = self._shard_sql(shard)
+        return int(self.conn.execute(sql + shard_sql, params + shard_params).fetchone()[0])
+
+    def claim_next(
+        self,
+        worker_id: str,
+        *,
+        lease_s: float,
+        retry_failed_before: Optional[str] = None,
+        shard: Optional[Tuple[int, int]] = None,
+    ) -> Optional[str]:
+        """
+        Atomically claim the next claimable video in priority order (see SCHEDULES).
+        Claimable: pending, in_progress with an expired (or missing) lease, and -- if
+        retry_failed_before is given -- failures that finished before that timestamp.
+        """
+        claimable = "(status='pending' OR (status='in_progress' AND (lease_until IS NULL OR lease_until < ?))"
+        if retry_failed_before:
+            claimable += " OR (status='failed' AND (finished_ts IS NULL OR finished_ts < ?))"
+        claimable += ")"
+        shard_sql, shard_params = self._shard_sql(shard)
+        while True:
+            now = time.time()
+            params = (now,) + ((retry_failed_before,) if retry_failed_before else ())
+            row = self.conn.execute(
+                f"SELECT video_id FROM videos WHERE status != 'ok' AND pos IS NOT NULL AND {claimable}{shard_sql} "
+                f"ORDER BY priority, pos LIMIT 1",
+                params + shard_params,
+            ).fetchone()
+            if not row:
+                return None
+            # Compare-and-swap: only succeeds if nobody claimed the row in between.
+            cur = self.conn.execute(
+                f"UPDATE videos SET status='in_progress', worker_id=?, lease_until=? "
+                f"WHERE video_id=? AND {claimable}",
+                (worker_id, now + float(lease_s), row[0]) + params,
+            )
+            self.conn.commit()
+            if cur.rowcount == 1:
+                return row[0]
+
+    def heartbeat(self, vid: str, worker_id: str, *, lease_s: float) -> bool:
+        """Extend our lease; False means the lease was lost (expired and reclaimed)."""
+        cur = self.conn.execute("""
+        UPDATE videos SET lease_until=?
+        WHERE video_id=? AND worker_id=? AND status='in_progress';
+        """, (time.time() + float(lease_s), vid, worker_id))
+        self.conn.commit()
+        return cur.rowcount == 1
+
+    def release(self, vid: str, worker_id: str):
+        """Give a claimed but unprocessed video back to the queue."""
+        self.conn.execute("""
+        UPDATE videos SET status='pending', worker_id=NULL, lease_until=NULL
+        WHERE video_id=? AND worker_id=? AND status='in_progress';
+        """, (vid, worker_id))
+        self.conn.commit()
+
+    def queue_depths(self, *, shard: Optional[Tuple[int, int]] = None) -> Dict[str, int]:
+        """Queued (manifest) videos per status."""
+        shard_sql, shard_params = self._shard_sql(shard)
+        rows = self.conn.execute(
+            f"SELECT status, COUNT(*) FROM videos WHERE pos IS NOT NULL{shard_sql} GROUP BY status",
+            shard_params,
+        ).fetchall()
+        return {status: int(n) for status, n in rows}
+
+    def next_lease_expiry(self, *, shard: Optional[Tuple[int, int]] = None) -> Optional[float]:
+        """Earliest lease expiry among videos other workers are processing."""
+        shard_sql, shard_params = self._shard_sql(shard)
+        row = self.conn.execute(
+            "SELECT MIN(lease_until) FROM videos WHERE status='in_progress' AND lease_until IS NOT NULL"
+            + shard_sql, shard_params,
+        ).fetchone()
+        return float(row[0]) if row and row[0] is not None else None
+
+    # --- fingerprints / aliases ---
+    def add_fingerprints(self, vid: str, hashes, times):
+        """Store a processed video's fingerprint (idempotent: hashes are deterministic)."""
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO fingerprints(hash,video_id,t) VALUES(?,?,?)",
+            zip(map(int, hashes), [vid] * len(hashes), map(int, times)),
+        )
+        self.conn.commit()
+
+    def fingerprint_postings(self, hashes: Iterable[int], *, batch: int = 500) -> Iterator[Tuple[int, str, int]]:
+        """(hash, video_id, t) rows for the given hashes."""
+        hashes = sorted(set(int(h) for h in hashes))
+        for i in range(0, len(hashes), batch):
+            part = hashes[i:i + batch]
+            yield from self.conn.execute(
+                f"SELECT hash, video_id, t FROM fingerprints WHERE hash IN ({','.join('?' * len(part))})",
+                part,
+            )
+
+    def add_alias(self, vid: str, canonical_id: str, *, offset_s: float, score: float):
+        self.conn.execute("""
+        INSERT OR REPLACE INTO aliases(video_id,canonical_id,offset_s,score,created_ts)
+        VALUES(?,?,?,?,?);
+        """, (vid, canonical_id, float(offset_s), float(score), now_utc_iso()))
+        self.conn.commit()
+
+    # --- stage timings ---
+    def record_stage(self, vid: str, stage: str, *, worker_id: str, started: float, seconds: float,
+                     status: str = "ok", nbytes: Optional[int] = None, audio_s: Optional[float] = None):
+        self.conn.execute("""
+        INSERT INTO stage_runs(video_id,worker_id,stage,status,started,ended,seconds,bytes,audio_s)
+        VALUES(?,?,?,?,?,?,?,?,?);
+        """, (vid, worker_id, stage, status, float(started), float(started) + float(seconds), float(seconds),
+              int(nbytes) if nbytes is not None else None, float(audio_s) if audio_s else None))
+        self.conn.commit()
+
+    def stage_percentiles(self, since: float) -> List[Tuple]:
+        """(stage, n, failed, p50, p90, p99, max, total seconds) over successful stage runs since `since`."""
+        return self.conn.execute("""
+        WITH ranked AS (
+          SELECT stage, seconds,
+                 ROW_NUMBER() OVER (PARTITION BY stage ORDER BY seconds) AS rn,
+                 COUNT(*) OVER (PARTITION BY stage) AS n
+          FROM stage_runs WHERE status='ok' AND started >= ?
+        ),
+        failed AS (
+          SELECT stage, COUNT(*) AS n FROM stage_runs WHERE status='failed' AND started >= ? GROUP BY stage
+        )
+        SELECT r.stage, r.n, COALESCE(f.n, 0),
+               MIN(CASE WHEN r.rn >= 0.50 * r.n THEN r.seconds END),
+               MIN(CASE WHEN r.rn >= 0.90 * r.n THEN r.seconds END),
+               MIN(CASE WHEN r.rn >= 0.99 * r.n THEN r.seconds END),
+               MAX(r.seconds), SUM(r.seconds)
+        FROM ranked r LEFT JOIN failed f ON f.stage = r.stage
+        GROUP BY r.stage ORDER BY SUM(r.seconds) DESC;
+        """, (since, since)).fetchall()
+
+    def stage_rtf_by_length(self, since: float) -> List[Tuple]:
+        """(stage, length bucket, n, real-time factor) -- how stage cost scales with video length."""
+        return self.conn.execute("""
+        SELECT stage,
+               CASE WHEN audio_s < 900 THEN '<15m' WHEN audio_s < 1800 THEN '15-30m'
+                    WHEN audio_s < 3600 THEN '30-60m' ELSE '>60m' END AS bucket,
+               COUNT(*), SUM(seconds) / SUM(audio_s)
+        FROM stage_runs WHERE status='ok' AND audio_s > 0 AND started >= ?
+        GROUP BY stage, bucket ORDER BY stage, MIN(audio_s);
+        """, (since,)).fetchall()
+
+    def daily_throughput(self, since: float) -> List[Tuple]:
+        """(day, videos, audio hours, stage hours, real-time factor, 7-day avg videos/day) per UTC day."""
+        return self.conn.execute("""
+        WITH days AS (
+          SELECT date(started, 'unixepoch') AS day,
+                 SUM(CASE WHEN stage='write_json' AND status='ok' THEN 1 ELSE 0 END) AS videos,
+                 SUM(CASE WHEN stage='write_json' AND status='ok' THEN audio_s ELSE 0 END) AS audio_s,
+                 SUM(CASE WHEN stage != 'diarization_run' THEN seconds ELSE 0 END) AS busy_s
+          FROM stage_runs WHERE started >= ?
+          GROUP BY day
+        )
+        SELECT day, videos, audio_s / 3600.0, busy_s / 3600.0,
+               CASE WHEN audio_s > 0 THEN busy_s / audio_s END,
+               AVG(videos) OVER (ORDER BY day ROWS BETWEEN 6 PRECEDING AND CURRENT ROW)
+        FROM days ORDER BY day;
+        """, (since,)).fetchall()
+
+    # --- status transitions ---
     def mark_in_progress(self, vid: str, stage: str):
         self.conn.execute("""
         INSERT INTO videos(video_id,status,last_stage,attempts,started_ts)
@@ -265,9 +666,17 @@ class StateDB:
         """, (vid, stage, now_utc_iso()))
         self.conn.commit()
 
+    def mark_existing_ok(self, vid: str):
+        """Outputs already on disk (e.g. state DB was reset): mark done without processing."""
+        self.conn.execute("""
+        UPDATE videos SET status='ok', worker_id=NULL, lease_until=NULL WHERE video_id=?;
+        """, (vid,))
+        self.conn.commit()
+
     def mark_ok(self, vid: str, *, seconds: float, words: int):
         self.conn.execute("""
-        UPDATE videos SET status='ok', finished_ts=?, seconds=?, words=?, last_error=NULL
+        UPDATE videos SET status='ok', finished_ts=?, seconds=?, words=?, last_error=NULL,
+          worker_id=NULL, lease_until=NULL
         WHERE video_id=?;
         """, (now_utc_iso(), float(seconds), int(words), vid))
         self.conn.commit()
@@ -281,11 +690,314 @@ class StateDB:
           last_stage=excluded.last_stage,
           attempts=videos.attempts+1,
           last_error=excluded.last_error,
-          finished_ts=excluded.finished_ts;
+          finished_ts=excluded.finished_ts,
+          worker_id=NULL,
+          lease_until=NULL;
         """, (vid, stage, tail(error, 8000), now_utc_iso()))
+        self.conn.execute(f"UPDATE videos SET priority={self._priority_sql()} WHERE video_id=?;", (vid,))
         self.conn.commit()
 
 
+class LeaseLost(Exception):
+    """Our lease on a video expired and another worker reclaimed it."""
+
+class LeaseHeartbeat:
+    """Background thread that keeps the lease on a claimed video alive (own DB connection)."""
+    def __init__(self, db_path: Path, vid: str, worker_id: str, *, lease_s: float, wal: bool = True):
+        self.db_path = db_path
+        self.vid = vid
+        self.worker_id = worker_id
+        self.lease_s = float(lease_s)
+        self.wal = wal
+        self.lost = False
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name=f"lease-{vid}", daemon=True)
+
+    def start(self) -> "LeaseHeartbeat":
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join(timeout=10)
+
+    def check(self, db: "StateDB"):
+        """Renew the lease now; raise LeaseLost if it is gone (call before writing outputs)."""
+        if self.lost or not db.heartbeat(self.vid, self.worker_id, lease_s=self.lease_s):
+            self.lost = True
+            raise LeaseLost(f"Lease on {self.vid} lost; leaving it to the worker that reclaimed it")
+
+    def _run(self):
+        db = StateDB(self.db_path, wal=self.wal)
+        try:
+            while not self._stop.wait(max(1.0, self.lease_s / 3)):
+                try:
+                    if not db.heartbeat(self.vid, self.worker_id, lease_s=self.lease_s) and not self.lost:
+                        self.lost = True
+                        LOG.warning("Lease on %s lost (expired and reclaimed by another worker?)", self.vid)
+                except sqlite3.Error as e:
+                    LOG.warning("Lease heartbeat for %s failed: %s", self.vid, e)
+        finally:
+            db.close()
+
+
+# -----------------------------
+# Observability: event log, stage clock, metrics
+# -----------------------------
+class EventSink:
+    """
+    Buffered, thread-safe JSONL event writer. Events are written in batches when
+    max_buffer is reached or flush_interval_s has passed (background flusher), and on close().
+    """
+    def __init__(self, path: Path, *, max_buffer: int = 200, flush_interval_s: float = 2.0):
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_buffer = max_buffer
+        self.flush_interval_s = float(flush_interval_s)
+        self._buf: List[str] = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="event-sink", daemon=True)
+        self._thread.start()
+
+    def emit(self, obj: Dict):
+        line = json.dumps(obj, ensure_ascii=False) + "\n"
+        with self._lock:
+            self._buf.append(line)
+            full = len(self._buf) >= self.max_buffer
+        if full:
+            self.flush()
+
+    def flush(self):
+        with self._lock:
+            lines, self._buf = self._buf, []
+            if lines:
+                # One append per batch; a single write keeps concurrent workers' lines intact
+                with self.path.open("a", encoding="utf-8") as f:
+                    f.write("".join(lines))
+
+    def close(self):
+        self._stop.set()
+        self.flush()
+
+    def _run(self):
+        while not self._stop.wait(self.flush_interval_s):
+            try:
+                self.flush()
+            except OSError as e:
+                LOG.warning("Event log flush failed: %s", e)
+
+
+class StageClock:
+    """
+    Times the stages of one video: `stage = clock.enter("download")` closes the previous
+    stage and reports it to every listener as (stage, seconds, info). note() attaches
+    measurements (audio_s, bytes) to the running stage; info always carries "started".
+    """
+    def __init__(self, listeners: Iterable[Callable[[str, float, Dict], None]] = ()):
+        self.listeners = list(listeners)
+        self.stage: Optional[str] = None
+        self._t0 = 0.0
+        self._info: Dict[str, Any] = {}
+
+    def enter(self, stage: str) -> str:
+        self.close()
+        self.stage = stage
+        self._t0 = time.time()
+        self._info = {}
+        return stage
+
+    def note(self, **info):
+        self._info.update(info)
+
+    def close(self, **info):
+        """End the running stage (if any); info is merged into its notes."""
+        if self.stage is None:
+            return
+        self._info.update(info)
+        stage, seconds, notes = self.stage, time.time() - self._t0, self._info
+        self.stage = None
+        self.record(stage, seconds, started=self._t0, **notes)
+
+    def record(self, stage: str, seconds: float, **info):
+        """Report a stage timed elsewhere (e.g. in a background thread)."""
+        info.setdefault("started", time.time() - seconds)
+        for listener in self.listeners:
+            try:
+                listener(stage, seconds, info)
+            except Exception as e:
+                LOG.warning("Stage listener failed for %s: %s", stage, e)
+
+
+class Metrics:
+    """In-process metrics registry rendered in the Prometheus text exposition format."""
+    STAGE_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1200, 1800, 3600, 7200)
+    # Stages timed in a background thread: they overlap the main loop, so they get their own metrics
+    BACKGROUND_STAGES = ("diarization_run",)
+
+    def __init__(self, worker_id: str):
+        self.worker_id = worker_id
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self._stage_hist: Dict[str, List[float]] = {}  # stage -> bucket counts + [sum, count]
+        self._background_hist: Dict[str, List[float]] = {}
+        self._background_rtf: Dict[str, float] = {}
+        self._videos: Counter = Counter()
+        self._failures: Counter = Counter()
+        self._queue: Dict[str, int] = {}
+        self._rtf: Dict[str, float] = {}
+        self._audio_s = 0.0
+        self._throttle_delay_s: Optional[float] = None
+
+    def observe_stage(self, stage: str, seconds: float, info: Dict):
+        background = stage in self.BACKGROUND_STAGES
+        with self._lock:
+            hists = self._background_hist if background else self._stage_hist
+            hist = hists.setdefault(stage, [0.0] * (len(self.STAGE_BUCKETS) + 2))
+            for i, bound in enumerate(self.STAGE_BUCKETS):
+                if seconds <= bound:
+                    hist[i] += 1
+            hist[-2] += seconds
+            hist[-1] += 1
+            # A failed or cut-short stage says nothing about the processing speed
+            if info.get("audio_s") and not info.get("failed") and not info.get("interrupted"):
+                (self._background_rtf if background else self._rtf)[stage] = seconds / float(info["audio_s"])
+
+    def video_done(self, status: str, *, seconds: float = 0.0, audio_s: Optional[float] = None,
+                   failed_stage: Optional[str] = None):
+        with self._lock:
+            self._videos[status] += 1
+            if failed_stage:
+                self._failures[failed_stage] += 1
+            if audio_s:
+                self._audio_s += audio_s
+                if status == "ok" and seconds > 0:
+                    self._rtf["video"] = seconds / audio_s
+
+    def set_throttle(self, delay_s: float):
+        with self._lock:
+            self._throttle_delay_s = delay_s
+
+    def set_queue(self, depths: Dict[str, int]):
+        with self._lock:
+            self._queue = dict(depths)
+
+    def render(self) -> str:
+        def fmt(name: str, labels: Dict[str, Any], value: float) -> str:
+            labels = {"worker": self.worker_id, **labels}
+            lbl = ",".join(f'{k}="{str(v).replace(chr(34), "")}"' for k, v in labels.items())
+            return f"{name}{{{lbl}}} {value:.6g}"
+
+        def histogram(name: str, labels: Dict[str, Any], hist: List[float]) -> List[str]:
+            out = [fmt(f"{name}_bucket", {**labels, "le": bound}, n) for bound, n in zip(self.STAGE_BUCKETS, hist)]
+            out.append(fmt(f"{name}_bucket", {**labels, "le": "+Inf"}, hist[-1]))
+            out.append(fmt(f"{name}_sum", labels, hist[-2]))
+            out.append(fmt(f"{name}_count", labels, hist[-1]))
+            return out
+
+        with self._lock:
+            elapsed_min = max(1e-9, (time.time() - self.started) / 60.0)
+            lines = [
+                "# HELP bpk_stage_duration_seconds Wall time per stage of the main loop "
+                "(stage diarization: waiting for the background diarization run).",
+                "# TYPE bpk_stage_duration_seconds histogram",
+            ]
+            for stage, hist in sorted(self._stage_hist.items()):
+                lines += histogram("bpk_stage_duration_seconds", {"stage": stage}, hist)
+            for stage, hist in sorted(self._background_hist.items()):
+                lines += [f"# HELP bpk_{stage}_seconds Compute time of the background {stage.replace('_', ' ')} "
+                          "per video, failed runs included.",
+                          f"# TYPE bpk_{stage}_seconds histogram"]
+                lines += histogram(f"bpk_{stage}_seconds", {}, hist)
+            for stage, rtf in sorted(self._background_rtf.items()):
+                lines += [f"# HELP bpk_{stage}_realtime_factor Background {stage.replace('_', ' ')} time / "
+                          "audio duration of the last video.",
+                          f"# TYPE bpk_{stage}_realtime_factor gauge",
+                          fmt(f"bpk_{stage}_realtime_factor", {}, rtf)]
+            lines += ["# HELP bpk_videos_total Videos finished by this worker, by outcome.",
+                      "# TYPE bpk_videos_total counter"]
+            lines += [fmt("bpk_videos_total", {"status": k}, v) for k, v in sorted(self._videos.items())]
+            lines += ["# HELP bpk_videos_per_minute Successfully processed videos per minute since start.",
+                      "# TYPE bpk_videos_per_minute gauge",
+                      fmt("bpk_videos_per_minute", {}, self._videos["ok"] / elapsed_min)]
+            lines += ["# HELP bpk_failures_total Failed videos by failing stage.",
+                      "# TYPE bpk_failures_total counter"]
+            lines += [fmt("bpk_failures_total", {"stage": k}, v) for k, v in sorted(self._failures.items())]
+            lines += ["# HELP bpk_queue_videos Videos in the work queue by status.",
+                      "# TYPE bpk_queue_videos gauge"]
+            lines += [fmt("bpk_queue_videos", {"status": k}, v) for k, v in sorted(self._queue.items())]
+            lines += ["# HELP bpk_audio_seconds_total Audio seconds of finished videos.",
+                      "# TYPE bpk_audio_seconds_total counter",
+                      fmt("bpk_audio_seconds_total", {}, self._audio_s)]
+            lines += ["# HELP bpk_realtime_factor Processing time / audio duration of the last video, by stage.",
+                      "# TYPE bpk_realtime_factor gauge"]
+            lines += [fmt("bpk_realtime_factor", {"stage": k}, v) for k, v in sorted(self._rtf.items())]
+            if self._throttle_delay_s is not None:
+                lines += ["# HELP bpk_throttle_delay_seconds Current adaptive inter-video delay.",
+                          "# TYPE bpk_throttle_delay_seconds gauge",
+                          fmt("bpk_throttle_delay_seconds", {}, self._throttle_delay_s)]
+        return "\n".join(lines) + "\n"
+
+
+class MetricsExporter:
+    """Publishes Metrics to a node_exporter textfile (rewritten atomically) and/or a local HTTP /metrics."""
+    def __init__(self, metrics: Metrics, *, textfile: Optional[Path] = None, port: Optional[int] = None,
+                 interval_s: float = 15.0):
+        self.metrics = metrics
+        self.textfile = textfile
+        self.port = port
+        self.interval_s = float(interval_s)
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._server = None
+
+    def start(self) -> "MetricsExporter":
+        if self.port:
+            from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+            metrics = self.metrics
+
+            class Handler(BaseHTTPRequestHandler):
+                def do_GET(self):
+                    if self.path.split("?")[0] not in ("/", "/metrics"):
+                        self.send_error(404)
+                        return
+                    body = metrics.render().encode("utf-8")
+                    self.send_response(200)
+                    self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+
+                def log_message(self, format, *args):
+                    pass
+
+            self._server = ThreadingHTTPServer(("127.0.0.1", int(self.port)), Handler)
+            threading.Thread(target=self._server.serve_forever, name="metrics-http", daemon=True).start()
+        if self.textfile:
+            self._thread = threading.Thread(target=self._run, name="metrics-textfile", daemon=True)
+            self._thread.start()
+        return self
+
+    def write_textfile(self):
+        if self.textfile:
+            atomic_write_text(self.textfile, self.metrics.render())
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=10)
+        self.write_textfile()
+        if self._server is not None:
+            self._server.shutdown()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_s):
+            try:
+                self.write_textfile()
+            except OSError as e:
+                LOG.warning("Metrics textfile write failed: %s", e)
+
+
 # -----------------------------
 # yt-dlp helpers
 # -----------------------------
@@ -354,6 +1066,141 @@ def download_best_audio(
     return files[0]
 
 
+# -----------------------------
+# Audio cache
+# -----------------------------
+class AudioCache:
+    """
+    Size-bounded LRU cache for downloaded source audio and 16 kHz WAVs.
+    Entries are keyed by video id + format (<root>/<vid>/<vid>.<fmt><ext>); recency is the
+    file mtime, refreshed on every hit, so several workers can share one cache directory.
+    Entries returned by get()/put() are pinned (<entry>.<host>-<pid>.pin) until release(vid),
+    so another worker's evict() never deletes a file that is still being read. Pins of dead
+    local processes, and any pin older than pin_ttl_s, no longer count.
+    """
+    def __init__(self, root: Path, max_bytes: int, pin_ttl_s: float = 24 * 3600):
+        self.root = root
+        self.max_bytes = int(max_bytes)
+        self.pin_ttl_s = float(pin_ttl_s)
+        self.owner = f"{socket.gethostname()}-{os.getpid()}"
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _entries(self) -> List[Path]:
+        return [p for p in self.root.glob("*/*") if p.is_file() and not p.name.endswith((".tmp", ".pin"))]
+
+    def _pin(self, entry: Path) -> Path:
+        pin = entry.with_name(f"{entry.name}.{self.owner}.pin")
+        pin.touch()
+        return pin
+
+    def _pin_alive(self, entry: Path, pin: Path, now: float) -> bool:
+        try:
+            if now - pin.stat().st_mtime > self.pin_ttl_s:
+                return False
+        except OSError:
+            return False
+        host, _, pid = pin.name[len(entry.name) + 1:-len(".pin")].rpartition("-")
+        if host == socket.gethostname() and pid.isdigit():
+            try:
+                os.kill(int(pid), 0)
+            except ProcessLookupError:
+                return False
+            except OSError:
+                pass
+        return True
+
+    def pinned(self, entry: Path) -> bool:
+        now = time.time()
+        return any(self._pin_alive(entry, pin, now) for pin in entry.parent.glob(f"{glob.escape(entry.name)}.*.pin"))
+
+    def get(self, vid: str, fmt: str) -> Optional[Path]:
+        d = self.root / vid
+        for p in sorted(d.glob(f"{vid}.{fmt}.*")) if d.is_dir() else []:
+            if p.name.endswith((".tmp", ".pin")):
+                continue
+            # Pin first, then check the entry survived a concurrent evict()
+            try:
+                pin = self._pin(p)
+            except OSError:
+                continue
+            try:
+                size = p.stat().st_size
+            except OSError:
+                size = 0
+            if size == 0:
+                with contextlib.suppress(OSError):
+                    pin.unlink()
+                continue
+            with contextlib.suppress(OSError):
+                os.utime(p)
+            self.hits[fmt] += 1
+            return p
+        self.misses[fmt] += 1
+        return None
+
+    def put(self, vid: str, fmt: str, src: Path) -> Path:
+        """Move a finished file into the cache (atomic rename) and return its cached, pinned path."""
+        dst = self.root / vid / f"{vid}.{fmt}{src.suffix}"
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dst.with_name(f"{dst.name}.{os.getpid()}.tmp")
+        shutil.move(str(src), str(tmp))
+        self._pin(dst)
+        tmp.replace(dst)
+        self.evict(keep=dst)
+        return dst
+
+    def release(self, vid: str):
+        """Unpin this process's entries of `vid` (once the video is done with its audio)."""
+        d = self.root / vid
+        for pin in d.glob(f"*.{self.owner}.pin") if d.is_dir() else []:
+            with contextlib.suppress(OSError):
+                pin.unlink()
+        with contextlib.suppress(OSError):
+            d.rmdir()  # only succeeds if the entries were evicted meanwhile
+
+    def evict(self, keep: Optional[Path] = None):
+        """Drop least-recently-used, unpinned entries until the cache fits into max_bytes."""
+        entries = []
+        for p in self._entries():
+            with contextlib.suppress(OSError):
+                st = p.stat()
+                entries.append((st.st_mtime, st.st_size, p))
+        total = sum(size for _, size, _ in entries)
+        for _, size, p in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_bytes:
+                break
+            if (keep is not None and p == keep) or self.pinned(p):
+                continue
+            # Move the entry aside before the final pin check: a get() that pinned it meanwhile
+            # either sees it gone (a miss) or gets it back
+            doomed = p.with_name(f"{p.name}.{os.getpid()}.evict.tmp")
+            try:
+                p.replace(doomed)
+            except OSError:
+                continue
+            if self.pinned(p):
+                with contextlib.suppress(OSError):
+                    doomed.replace(p)
+                continue
+            with contextlib.suppress(OSError):
+                doomed.unlink()
+                total -= size
+            for pin in p.parent.glob(f"{glob.escape(p.name)}.*.pin"):
+                with contextlib.suppress(OSError):
+                    pin.unlink()  # stale pins of the deleted entry
+            with contextlib.suppress(OSError):
+                p.parent.rmdir()  # only succeeds once the video dir is empty
+
+    def summary(self) -> Dict[str, Dict]:
+        out = {}
+        for fmt in sorted(set(self.hits) | set(self.misses)):
+            h, m = self.hits[fmt], self.misses[fmt]
+            out[fmt] = {"hits": h, "misses": m, "hit_rate": round(h / (h + m), 3) if (h + m) else 0.0}
+        return out
+
+
 # -----------------------------
 # ffmpeg
 # -----------------------------
@@ -367,63 +1214,1226 @@ def to_16k_mono_wav(ffmpeg: str, in_path: Path, out_path: Path, *, env: Dict[str
     if rc != 0:
         raise RuntimeError(f"ffmpeg convert failed rc={rc}\n{tail(err, 4000)}")
 
+def decode_16k_mono_f32(ffmpeg: str, in_path: Path, *, env: Dict[str, str], timeout: int = 3600):
+    """
+    Decode straight into a float32 buffer via an ffmpeg pipe (no WAV on disk).
+    The buffer is writable and shared by ASR and diarization; ~230 MB per hour of audio.
+    """
+    import numpy as np
+    cmd = [
+        ffmpeg, "-nostdin", "-loglevel", "error", "-i", str(in_path),
+        "-f", "f32le", "-acodec", "pcm_f32le", "-ac", "1", "-ar", str(SAMPLE_RATE),
+        "pipe:1",
+    ]
+    start = time.time()
+    buf = bytearray()
+    with subprocess.Popen(cmd, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE) as p:
+        assert p.stdout is not None and p.stderr is not None
+        while True:
+            chunk = p.stdout.read(1 << 20)
+            if not chunk:
+                break
+            buf += chunk
+            if (time.time() - start) > timeout:
+                with contextlib.suppress(Exception):
+                    p.kill()
+                raise RuntimeError("ffmpeg decode failed: TimeoutExpired")
+        err = p.stderr.read().decode("utf-8", errors="replace")
+        rc = p.wait()
+    if rc != 0:
+        raise RuntimeError(f"ffmpeg decode failed rc={rc}\n{tail(err, 4000)}")
+    del buf[len(buf) - (len(buf) % 4):]
+    if not buf:
+        raise RuntimeError("ffmpeg decode produced no samples.")
+    return np.frombuffer(buf, dtype=np.float32)
+
+def asr_input(audio: Audio):
+    """Whisper implementations accept a file path or a float32 array."""
+    return str(audio) if isinstance(audio, Path) else audio
+
 
 # -----------------------------
 # Diarization (pyannote)
 # -----------------------------
-def diarize_to_rttm(
-    pipeline,
-    wav_path: Path,
-    out_rttm: Path,
-    *,
-    min_speakers: int,
-    max_speakers: int,
-):
-    """Run pyannote diarization and write RTTM atomically."""
-    diarization = pipeline(str(wav_path), min_speakers=min_speakers, max_speakers=max_speakers)
+def diarization_input(audio: Audio, uri: str):
+    """pyannote accepts a file path or an in-memory {'waveform', 'sample_rate'} mapping."""
+    if isinstance(audio, Path):
+        return str(audio)
+    import torch
+    return {"waveform": torch.from_numpy(audio).unsqueeze(0), "sample_rate": SAMPLE_RATE, "uri": uri}
+
+def write_rttm_atomic(annotation, out_rttm: Path):
     out_rttm.parent.mkdir(parents=True, exist_ok=True)
     tmp = out_rttm.with_suffix(out_rttm.suffix + ".tmp")
     with tmp.open("w", encoding="utf-8") as f:
-        diarization.write_rttm(f)
+        annotation.write_rttm(f)
     tmp.replace(out_rttm)
     # Validate RTTM
     if not out_rttm.exists() or out_rttm.stat().st_size == 0:
         raise RuntimeError("Diarization produced empty or missing RTTM file.")
+    remove_output_variants(out_rttm.parent, out_rttm.name.split(".")[0], RTTM_SUFFIXES, keep=out_rttm)
+
+# Non-public SpeakerDiarization members the array path relies on (checked before use)
+DIARIZATION_ARRAY_MEMBERS = (
+    "_segmentation", "get_segmentations", "speaker_count", "get_embeddings",
+    "clustering", "set_num_speakers", "reconstruct", "to_annotation", "classes",
+)
+# Minimum frame agreement of the array path with pipeline(file) on the first video
+DIARIZATION_PARITY_MIN = 0.98
+
+def diarization_arrays_supported(pipeline) -> bool:
+    """Whether this pyannote version exposes the internals extract/recluster_arrays need."""
+    if not all(hasattr(pipeline, name) for name in DIARIZATION_ARRAY_MEMBERS):
+        return False
+    model = getattr(pipeline._segmentation, "model", None)
+    return model is not None and (
+        getattr(model, "_receptive_field", None) is not None or hasattr(pipeline, "_frames")
+    )
+
+def annotation_tracks(annotation) -> List[Tuple[float, float, str]]:
+    return [(seg.start, seg.end, str(label)) for seg, _, label in annotation.itertracks(yield_label=True)]
+
+def diarization_agreement(ref: List[Tuple[float, float, str]], hyp: List[Tuple[float, float, str]],
+                          step_s: float = 0.1) -> float:
+    """
+    Share of frames (step_s grid, speech in either input) whose active speaker sets agree once
+    hyp labels are mapped greedily onto ref labels by co-occurrence. 1.0 = identical RTTMs.
+    """
+    import numpy as np
+    end = max([e for _, e, _ in ref + hyp], default=0.0)
+    n = int(np.ceil(end / step_s))
+    if n == 0:
+        return 1.0
+
+    def activity(tracks):
+        labels = sorted({label for _, _, label in tracks})
+        act = np.zeros((len(labels), n), dtype=bool)
+        for start, stop, label in tracks:
+            act[labels.index(label), int(start / step_s):int(np.ceil(stop / step_s))] = True
+        return act
+
+    ref_act, hyp_act = activity(ref), activity(hyp)
+    co = ref_act.astype(np.int64) @ hyp_act.T.astype(np.int64)
+    mapped = np.zeros_like(ref_act)
+    while co.size and co.max() > 0:
+        r, h = np.unravel_index(int(co.argmax()), co.shape)
+        mapped[r] = hyp_act[h]
+        co[r, :] = -1
+        co[:, h] = -1
+    speech = ref_act.any(axis=0) | hyp_act.any(axis=0)
+    if not speech.any():
+        return 1.0
+    agree = (ref_act == mapped).all(axis=0) & (hyp_act.sum(axis=0) == mapped.sum(axis=0))
+    return float((agree & speech).sum() / speech.sum())
+
+def _receptive_field(pipeline):
+    """Frame grid of the segmentation model (attribute name differs across pyannote 3.x)."""
+    model = pipeline._segmentation.model
+    return getattr(model, "_receptive_field", None) or getattr(pipeline, "_frames")
+
+def extract_diarization_arrays(pipeline, file) -> Dict[str, Any]:
+    """
+    Run the audio-dependent half of pyannote's SpeakerDiarization.apply (segmentation,
+    speaker counting, embeddings) and return it as plain numpy arrays.
+    """
+    import numpy as np
+    from pyannote.audio.utils.signal import binarize
+
+    segmentations = pipeline.get_segmentations(file)
+    if pipeline._segmentation.model.specifications.powerset:
+        binarized = segmentations
+    else:
+        binarized = binarize(segmentations, onset=pipeline.segmentation.threshold, initial_state=False)
+    count = pipeline.speaker_count(binarized, _receptive_field(pipeline), warm_up=(0.0, 0.0))
+    embeddings = pipeline.get_embeddings(file, binarized, exclude_overlap=pipeline.embedding_exclude_overlap)
+
+    def window(swf) -> "np.ndarray":
+        sw = swf.sliding_window
+        return np.array([sw.start, sw.duration, sw.step], dtype=np.float64)
+
+    return {
+        "uri": np.array(file["uri"] if isinstance(file, dict) else Path(file).stem),
+        "segmentations": segmentations.data,
+        "segmentations_window": window(segmentations),
+        "binarized": None if binarized is segmentations else binarized.data,
+        "count": count.data,
+        "count_window": window(count),
+        "embeddings": embeddings,
+    }
+
+def save_diarization_arrays(path: Path, arrays: Dict[str, Any]):
+    """Compact npz: binary segmentations are bit-packed, embeddings stored as float16."""
+    import numpy as np
+    seg = arrays["segmentations"]
+    out = {
+        "uri": arrays["uri"],
+        "segmentations_shape": np.array(seg.shape, dtype=np.int64),
+        "segmentations_window": arrays["segmentations_window"],
+        "count": arrays["count"].astype(np.int8),
+        "count_window": arrays["count_window"],
+        "embeddings": arrays["embeddings"].astype(np.float16),
+    }
+    if np.isin(seg, (0.0, 1.0)).all():
+        out["segmentations_bits"] = np.packbits(seg.astype(np.uint8).ravel())
+    else:
+        out["segmentations"] = seg.astype(np.float16)
+    if arrays["binarized"] is not None:
+        out["binarized_bits"] = np.packbits(arrays["binarized"].astype(np.uint8).ravel())
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        np.savez_compressed(f, **out)
+    tmp.replace(path)
+
+def load_diarization_arrays(path: Path) -> Dict[str, Any]:
+    import numpy as np
+    with np.load(path) as z:
+        shape = tuple(int(x) for x in z["segmentations_shape"])
+        n = int(np.prod(shape))
+        if "segmentations_bits" in z:
+            seg = np.unpackbits(z["segmentations_bits"])[:n].reshape(shape).astype(np.float32)
+        else:
+            seg = z["segmentations"].astype(np.float32)
+        binarized = None
+        if "binarized_bits" in z:
+            binarized = np.unpackbits(z["binarized_bits"])[:n].reshape(shape).astype(np.float32)
+        return {
+            "uri": str(z["uri"]),
+            "segmentations": seg,
+            "segmentations_window": z["segmentations_window"],
+            "binarized": binarized,
+            "count": z["count"],
+            "count_window": z["count_window"],
+            "embeddings": z["embeddings"].astype(np.float32),
+        }
+
+def recluster_arrays(
+    pipeline,
+    arrays: Dict[str, Any],
+    *,
+    min_speakers: int,
+    max_speakers: int,
+    clustering_threshold: Optional[float] = None,
+):
+    """
+    The audio-free half of SpeakerDiarization.apply: clustering + reconstruction from stored
+    arrays. Returns (annotation with SPEAKER_xx labels, centroids aligned with its labels).
+    """
+    import numpy as np
+    from pyannote.core import Annotation, SlidingWindow, SlidingWindowFeature
+
+    def swf(data, win):
+        return SlidingWindowFeature(data, SlidingWindow(start=float(win[0]), duration=float(win[1]), step=float(win[2])))
+
+    segmentations = swf(arrays["segmentations"], arrays["segmentations_window"])
+    binarized = segmentations if arrays["binarized"] is None else swf(arrays["binarized"], arrays["segmentations_window"])
+    count = swf(arrays["count"].astype(np.int8), arrays["count_window"])
+    embeddings = arrays["embeddings"]
+    uri = arrays["uri"]
+
+    if np.nanmax(count.data) == 0.0:
+        return Annotation(uri=uri), np.zeros((0, embeddings.shape[-1]), dtype=np.float32)
+
+    if clustering_threshold is not None:
+        pipeline.clustering.threshold = float(clustering_threshold)
+    num_speakers, min_speakers, max_speakers = pipeline.set_num_speakers(
+        min_speakers=min_speakers, max_speakers=max_speakers,
+    )
+    hard_clusters, _, centroids = pipeline.clustering(
+        embeddings=embeddings,
+        segmentations=binarized,
+        num_clusters=num_speakers,
+        min_clusters=min_speakers,
+        max_clusters=max_speakers,
+        file={"uri": uri},
+        frames=_receptive_field(pipeline),
+    )
+    count.data = np.minimum(count.data, max_speakers).astype(np.int8)
+    inactive_speakers = np.sum(binarized.data, axis=1) == 0
+    hard_clusters[inactive_speakers] = -2
+    discrete = pipeline.reconstruct(segmentations, hard_clusters, count)
+    diarization = pipeline.to_annotation(
+        discrete, min_duration_on=0.0, min_duration_off=pipeline.segmentation.min_duration_off,
+    )
+    diarization.uri = uri
+    mapping = {label: expected for label, expected in zip(diarization.labels(), pipeline.classes())}
+    diarization = diarization.rename_labels(mapping=mapping)
+
+    if centroids is None:
+        return diarization, None
+    labels = diarization.labels()
+    if len(labels) > centroids.shape[0]:
+        centroids = np.pad(centroids, ((0, len(labels) - centroids.shape[0]), (0, 0)))
+    inverse = {label: index for index, label in mapping.items()}
+    return diarization, centroids[[inverse[label] for label in labels]]
+
+def save_speaker_centroids(path: Path, annotation, centroids):
+    """Per-video speaker centroids (one row per RTTM label) for cross-BPK identity resolution."""
+    import numpy as np
+    labels = list(annotation.labels())
+    if centroids is None or not labels:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with tmp.open("wb") as f:
+        np.savez_compressed(f, labels=np.array(labels), centroids=np.asarray(centroids, dtype=np.float32))
+    tmp.replace(path)
+
+def run_recluster(
+    pipeline,
+    arrays_dir: Path,
+    rttm_dir: Path,
+    *,
+    min_speakers: int,
+    max_speakers: int,
+    clustering_threshold: Optional[float],
+    centroids_dir: Optional[Path] = None,
+) -> Counter:
+    """Regenerate every RTTM (and speaker centroids) from stored segmentation/embedding arrays (no audio)."""
+    results: Counter = Counter()
+    paths = sorted(arrays_dir.glob("*.npz"))
+    LOG.info("Re-clustering %d videos from stored embeddings...", len(paths))
+    for path in paths:
+        vid = path.stem
+        try:
+            annotation, centroids = recluster_arrays(
+                pipeline, load_diarization_arrays(path),
+                min_speakers=min_speakers, max_speakers=max_speakers,
+                clustering_threshold=clustering_threshold,
+            )
+            write_rttm_atomic(annotation, rttm_dir / f"{vid}.rttm")
+            if centroids_dir is not None:
+                save_speaker_centroids(centroids_dir / f"{vid}.npz", annotation, centroids)
+            results["ok"] += 1
+        except Exception as e:
+            LOG.error("Re-cluster failed for %s: %s: %s", vid, type(e).__name__, e)
+            results["failed"] += 1
+    return results
+
+
+# -----------------------------
+# Transcript storage formats
+# -----------------------------
+# pretty:  <vid>.json      indented legacy layout (transcript_text + segment rows)
+# compact: <vid>.json      {"format": "bpk-transcript/2", "metadata", "segments": {column: [...]}}
+# gzip:    <vid>.json.gz   compact, gzip-compressed
+# zstd:    <vid>.json.zst  compact, zstd-compressed (optional `zstandard` package)
+# transcript_text of compact files is the newline-joined segment text, rebuilt on read.
+# Keep in sync with aggregation/loaders/formats.py (the aggregation package reads these).
+COMPACT_FORMAT = "bpk-transcript/2"
+TRANSCRIPT_FORMATS = ("pretty", "compact", "gzip", "zstd")
+TRANSCRIPT_SUFFIXES = (".json", ".json.gz", ".json.zst")
+RTTM_SUFFIXES = (".rttm", ".rttm.gz", ".rttm.zst")
+
+def _zstandard():
+    try:
+        import zstandard
+    except ImportError as e:
+        raise RuntimeError("zstd storage needs the 'zstandard' package (pip install zstandard)") from e
+    return zstandard
+
+def find_output(directory: Path, vid: str, suffixes: Iterable[str]) -> Optional[Path]:
+    """The video's output file in whichever storage variant exists (newest wins)."""
+    found = [directory / f"{vid}{s}" for s in suffixes if (directory / f"{vid}{s}").exists()]
+    return max(found, key=lambda p: p.stat().st_mtime) if found else None
+
+def remove_output_variants(directory: Path, vid: str, suffixes: Iterable[str], keep: Optional[Path]):
+    for suffix in suffixes:
+        path = directory / f"{vid}{suffix}"
+        if path != keep and path.exists():
+            path.unlink()
+
+def read_output_bytes(path: Path) -> bytes:
+    """File content, decompressed according to its suffix."""
+    raw = path.read_bytes()
+    if path.name.endswith(".gz"):
+        return gzip.decompress(raw)
+    if path.name.endswith(".zst"):
+        return _zstandard().ZstdDecompressor().decompress(raw)
+    return raw
+
+def transcript_format_of(path: Path, obj: Optional[Dict] = None) -> str:
+    if path.name.endswith(".gz"):
+        return "gzip"
+    if path.name.endswith(".zst"):
+        return "zstd"
+    return "compact" if obj is not None and obj.get("format") == COMPACT_FORMAT else "pretty"
+
+def load_transcript(path: Path) -> Dict:
+    """Read a transcript in any storage format, returned in the legacy (pretty) shape."""
+    obj = json.loads(read_output_bytes(path))
+    if obj.get("format") != COMPACT_FORMAT:
+        return obj
+    columns = obj.get("segments") or {}
+    segments = [
+        {k: v[i] for k, v in columns.items() if v[i] is not None}
+        for i in range(len(columns.get("start", [])))
+    ]
+    out = {k: v for k, v in obj.items() if k not in ("format", "segments")}
+    out["transcript_text"] = "\n".join(seg["text"] for seg in segments if seg.get("text")).strip()
+    out["segments"] = segments
+    return out
+
+def write_transcript(json_dir: Path, vid: str, payload: Dict, fmt: str = "pretty") -> Path:
+    """Write a transcript in `fmt` (atomic) and drop other storage variants of it."""
+    if fmt == "pretty":
+        blob, suffix = json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8"), ".json"
+    else:
+        segments = payload.get("segments") or []
+        keys = ["start", "end", "text"]
+        for seg in segments:
+            keys.extend(k for k in seg if k not in keys)
+        compact = {k: v for k, v in payload.items() if k not in ("segments", "transcript_text")}
+        compact["format"] = COMPACT_FORMAT
+        if "segments" in payload:
+            compact["segments"] = {k: [seg.get(k) for seg in segments] for k in keys}
+        blob, suffix = json.dumps(compact, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), ".json"
+        if fmt == "gzip":
+            blob, suffix = gzip.compress(blob, compresslevel=6), ".json.gz"
+        elif fmt == "zstd":
+            blob, suffix = _zstandard().ZstdCompressor(level=10).compress(blob), ".json.zst"
+    path = json_dir / f"{vid}{suffix}"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(blob)
+    tmp.replace(path)
+    remove_output_variants(json_dir, vid, TRANSCRIPT_SUFFIXES, keep=path)
+    return path
 
 
 # -----------------------------
 # Existing JSON validation
 # -----------------------------
-def is_valid_ok_json(path: Path) -> bool:
-    """Check if JSON exists, is valid, and status='ok'."""
-    if not path.exists():
+def is_valid_ok_json(path: Optional[Path]) -> bool:
+    """Check if the transcript exists (any storage format), is valid, and status='ok'."""
+    if path is None or not path.exists():
         return False
     try:
-        obj = json.loads(path.read_text(encoding="utf-8"))
+        obj = json.loads(read_output_bytes(path))
         return (obj.get("metadata", {}).get("status") == "ok")
     except Exception:
         return False
 
 
 # -----------------------------
-# Retry wrapper
+# ASR / diarization backends
+# -----------------------------
+class ASRBackend(abc.ABC):
+    """Transcribes 16 kHz mono audio (WAV path or float32 array) into Whisper-style segments."""
+    name = "base"
+    # transcribe() may run in several threads at once (--asr-chunk-workers > 1)
+    thread_safe = False
+
+    def __init__(self, model: str, *, language: Optional[str] = None):
+        self.model = model
+        self.language = language  # None: let Whisper detect the language
+
+    def load(self):
+        """Load model weights (called once, before the first video)."""
+
+    @abc.abstractmethod
+    def transcribe(self, audio: Audio) -> List[Dict]:
+        """Return raw segments [{start, end, text}, ...] relative to the start of `audio`."""
+
+
+class DiarizationBackend(abc.ABC):
+    """Speaker diarization of 16 kHz mono audio into an RTTM file."""
+    name = "base"
+
+    def load(self):
+        """Load model weights (called once, before the first video)."""
+
+    @abc.abstractmethod
+    def diarize(self, audio: Audio, out_rttm: Path, *, min_speakers: int, max_speakers: int, uri: str,
+                video_id: Optional[str] = None):
+        """Write the RTTM for `audio` atomically to out_rttm."""
+
+    def release_memory(self):
+        """Free accelerator caches between videos."""
+
+
+class MLXWhisperASR(ASRBackend):
+    """mlx_whisper on Apple Silicon (Metal)."""
+    name = "mlx"
+
+    def load(self):
+        import mlx_whisper
+        self._mlx_whisper = mlx_whisper
+        self._kwargs = {"path_or_hf_repo": self.model, "verbose": False}
+        if self.language:
+            self._kwargs["language"] = self.language
+        sig = None
+        with contextlib.suppress(Exception):
+            sig = inspect.signature(mlx_whisper.transcribe)
+        if sig and "verbose" not in sig.parameters:
+            self._kwargs.pop("verbose", None)
+
+    def transcribe(self, audio: Audio) -> List[Dict]:
+        result = self._mlx_whisper.transcribe(asr_input(audio), **self._kwargs)
+        return result.get("segments", []) or []
+
+
+class FasterWhisperASR(ASRBackend):
+    """
+    CTranslate2 faster-whisper on CPU: quantized (int8) weights, batched decoding, fixed thread count.
+    num_workers model replicas serve concurrent transcribe() calls (one per chunk worker).
+    """
+    name = "cpu"
+    thread_safe = True
+
+    def __init__(self, model: str, *, threads: int, compute_type: str = "int8", batch_size: int = 8,
+                 language: Optional[str] = None, num_workers: int = 1):
+        super().__init__(model, language=language)
+        self.threads = max(1, int(threads))
+        self.compute_type = compute_type
+        self.batch_size = max(1, int(batch_size))
+        self.num_workers = max(1, int(num_workers))
+
+    def load(self):
+        from faster_whisper import WhisperModel
+        self._model = WhisperModel(self.model, device="cpu", compute_type=self.compute_type,
+                                   cpu_threads=self.threads, num_workers=self.num_workers)
+        self._batched = None
+        if self.batch_size > 1:
+            with contextlib.suppress(ImportError):
+                from faster_whisper import BatchedInferencePipeline
+                self._batched = BatchedInferencePipeline(model=self._model)
+
+    def transcribe(self, audio: Audio) -> List[Dict]:
+        if self._batched is not None:
+            segs, _ = self._batched.transcribe(asr_input(audio), language=self.language, batch_size=self.batch_size)
+        else:
+            segs, _ = self._model.transcribe(asr_input(audio), language=self.language)
+        return [{"start": s.start, "end": s.end, "text": s.text} for s in segs]
+
+
+class StubASR(ASRBackend):
+    """Deterministic fake ASR for tests: one numbered segment every `step_s` seconds."""
+    name = "stub"
+    thread_safe = True
+
+    def __init__(self, model: str = "stub", step_s: float = 5.0):
+        super().__init__(model)
+        self.step_s = step_s
+
+    def transcribe(self, audio: Audio) -> List[Dict]:
+        total = audio_duration_s(audio)
+        n = int(total // self.step_s)
+        return [{"start": i * self.step_s, "end": min(total, (i + 1) * self.step_s), "text": f"Segment {i + 1}."}
+                for i in range(n)]
+
+
+class PyannoteDiarizer(DiarizationBackend):
+    """
+    pyannote speaker-diarization-3.1 on mps/cuda/cpu. With arrays_dir set, segmentation and
+    speaker embeddings are persisted per video so RTTMs can be re-clustered without audio.
+    That path uses SpeakerDiarization internals: it falls back to pipeline(file) when they are
+    missing, or when the first video's RTTM differs from what pipeline(file) produces.
+    """
+    name = "pyannote"
+
+    def __init__(self, device: str, *, threads: Optional[int] = None,
+                 checkpoint: str = "pyannote/speaker-diarization-3.1",
+                 arrays_dir: Optional[Path] = None, clustering_threshold: Optional[float] = None,
+                 centroids_dir: Optional[Path] = None):
+        self.device = device
+        self.threads = threads
+        self.checkpoint = checkpoint
+        self.arrays_dir = arrays_dir
+        self.clustering_threshold = clustering_threshold
+        self.centroids_dir = centroids_dir
+        self._arrays_ok: Optional[bool] = None  # None: internals missing (not warned yet), False: off for this run
+        self._parity_checked = False
+        self._returns_embeddings = False
+
+    def load(self):
+        from pyannote.audio import Pipeline
+        import torch
+        self._torch = torch
+        if self.device == "cpu" and self.threads:
+            torch.set_num_threads(int(self.threads))
+        self.pipeline = Pipeline.from_pretrained(self.checkpoint)
+        self.pipeline.to(torch.device(self.device))
+        self._arrays_ok = True if diarization_arrays_supported(self.pipeline) else None
+        self._parity_checked = False
+        self._returns_embeddings = "return_embeddings" in inspect.signature(self.pipeline.apply).parameters
+
+    def _stock(self, audio: Audio, *, min_speakers: int, max_speakers: int, uri: str):
+        """pipeline(file) through pyannote's public API: (annotation, centroids or None)."""
+        if self.clustering_threshold is not None:
+            self.pipeline.clustering.threshold = float(self.clustering_threshold)
+        kwargs = {"min_speakers": min_speakers, "max_speakers": max_speakers}
+        if self.centroids_dir is not None and self._returns_embeddings:
+            kwargs["return_embeddings"] = True
+        result = self.pipeline(diarization_input(audio, uri), **kwargs)
+        return result if kwargs.get("return_embeddings") else (result, None)
+
+    def diarize(self, audio: Audio, out_rttm: Path, *, min_speakers: int, max_speakers: int, uri: str,
+                video_id: Optional[str] = None):
+        use_arrays = self.arrays_dir is not None and bool(video_id)
+        if use_arrays and not self._arrays_ok:
+            if self._arrays_ok is None:
+                LOG.warning("pyannote %s lacks the internals of --diarization-arrays; using pipeline(file)",
+                            self.checkpoint)
+                self._arrays_ok = False
+            use_arrays = False
+        if not use_arrays:
+            annotation, centroids = self._stock(audio, min_speakers=min_speakers, max_speakers=max_speakers, uri=uri)
+        else:
+            arrays = extract_diarization_arrays(self.pipeline, diarization_input(audio, uri))
+            annotation, centroids = recluster_arrays(
+                self.pipeline, arrays, min_speakers=min_speakers, max_speakers=max_speakers,
+                clustering_threshold=self.clustering_threshold,
+            )
+            if not self._parity_checked:
+                annotation, centroids = self._check_parity(
+                    annotation, centroids, audio, min_speakers=min_speakers, max_speakers=max_speakers, uri=uri,
+                )
+            if self._arrays_ok:
+                save_diarization_arrays(self.arrays_dir / f"{video_id}.npz", arrays)
+        write_rttm_atomic(annotation, out_rttm)
+        if self.centroids_dir is not None and video_id:
+            save_speaker_centroids(self.centroids_dir / f"{video_id}.npz", annotation, centroids)
+
+    def _check_parity(self, annotation, centroids, audio: Audio, *, min_speakers: int, max_speakers: int, uri: str):
+        """
+        Compare the first array-path RTTM with pipeline(file). On a mismatch (pyannote changed
+        its internals) the array path is disabled for the run and the stock result is used.
+        """
+        stock, stock_centroids = self._stock(audio, min_speakers=min_speakers, max_speakers=max_speakers, uri=uri)
+        agreement = diarization_agreement(annotation_tracks(stock), annotation_tracks(annotation))
+        self._parity_checked = True
+        if agreement >= DIARIZATION_PARITY_MIN:
+            LOG.info("Diarization arrays match pipeline(file) (%.1f%% frame agreement)", 100 * agreement)
+            return annotation, centroids
+        LOG.warning("Diarization arrays disagree with pipeline(file) (%.1f%% frame agreement); "
+                    "using pipeline(file) for this run", 100 * agreement)
+        self._arrays_ok = False
+        return stock, stock_centroids
+
+    def release_memory(self):
+        torch = self._torch
+        if torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        if torch.backends.mps.is_available():
+            torch.mps.empty_cache()
+
+
+class StubDiarizer(DiarizationBackend):
+    """Deterministic fake diarization for tests: speakers alternate every `turn_s` seconds."""
+    name = "stub"
+
+    def __init__(self, turn_s: float = 10.0):
+        self.turn_s = turn_s
+
+    def diarize(self, audio: Audio, out_rttm: Path, *, min_speakers: int, max_speakers: int, uri: str,
+                video_id: Optional[str] = None):
+        total = audio_duration_s(audio)
+        n_spk = max(1, min_speakers)
+        lines = []
+        t, i = 0.0, 0
+        while t < total:
+            dur = min(self.turn_s, total - t)
+            lines.append(f"SPEAKER {uri} 1 {t:.3f} {dur:.3f} <NA> <NA> SPEAKER_{i % n_spk:02d} <NA> <NA>")
+            t += self.turn_s
+            i += 1
+        atomic_write_text(out_rttm, "\n".join(lines) + "\n")
+
+
+DEFAULT_WHISPER_MODELS = {
+    "mlx": "mlx-community/whisper-large-v3-turbo",
+    "cpu": "large-v3-turbo",
+    "stub": "stub",
+}
+
+DEFAULT_DIARIZATION_DEVICES = {"mlx": "mps", "cpu": "cpu", "stub": "cpu"}
+
+def make_backends(
+    name: str,
+    args,
+    *,
+    diarization_arrays_dir: Optional[Path] = None,
+    centroids_dir: Optional[Path] = None,
+) -> Tuple[ASRBackend, DiarizationBackend]:
+    """Backend registry: --backend name -> (ASR, diarization) implementations."""
+    model = args.whisper_model or DEFAULT_WHISPER_MODELS[name]
+    device = args.diarization_device or DEFAULT_DIARIZATION_DEVICES[name]
+    pyannote_opts = {
+        "arrays_dir": diarization_arrays_dir,
+        "clustering_threshold": args.clustering_threshold,
+        "centroids_dir": centroids_dir,
+    }
+    if name == "mlx":
+        return MLXWhisperASR(model, language=args.language), PyannoteDiarizer(device, **pyannote_opts)
+    if name == "cpu":
+        return (
+            FasterWhisperASR(model, threads=args.cpu_threads, compute_type=args.cpu_compute_type,
+                             batch_size=args.asr_batch_size, language=args.language,
+                             num_workers=args.asr_chunk_workers),
+            PyannoteDiarizer(device, threads=args.cpu_threads, **pyannote_opts),
+        )
+    if name == "stub":
+        return StubASR(model), StubDiarizer()
+    raise ValueError(f"Unknown backend: {name}")
+
+def run_benchmark(audio: Audio, backend_names: List[str], args, work_dir: Path) -> List[Dict]:
+    """Time load/ASR/diarization per backend on one audio file; RTF = processing time / audio time."""
+    duration = audio_duration_s(audio)
+    rows = []
+    for name in backend_names:
+        asr, diar = make_backends(name, args)
+        row: Dict[str, Any] = {"backend": name, "model": asr.model, "audio_s": round(duration, 1)}
+        try:
+            t0 = time.time()
+            asr.load()
+            diar.load()
+            row["load_s"] = round(time.time() - t0, 2)
+            t0 = time.time()
+            segs = normalize_asr_segments(asr.transcribe(audio))
+            row["asr_s"] = round(time.time() - t0, 2)
+            row["asr_rtf"] = round(row["asr_s"] / duration, 4) if duration else None
+            row["segments"] = len(segs)
+            t0 = time.time()
+            diar.diarize(audio, work_dir / f"bench_{name}.rttm",
+                         min_speakers=args.min_speakers, max_speakers=args.max_speakers, uri="benchmark")
+            row["diarization_s"] = round(time.time() - t0, 2)
+            row["diarization_rtf"] = round(row["diarization_s"] / duration, 4) if duration else None
+        except Exception as e:
+            row["error"] = f"{type(e).__name__}: {e}"
+        rows.append(row)
+    return rows
+
+
+# -----------------------------
+# Chunked ASR with checkpoints
+# -----------------------------
+class ASRInterrupted(Exception):
+    """Stop requested between ASR chunks; finished chunks stay checkpointed."""
+
+def audio_duration_s(audio: Audio) -> float:
+    if isinstance(audio, Path):
+        with wave.open(str(audio), "rb") as w:
+            return w.getnframes() / float(w.getframerate())
+    return len(audio) / float(SAMPLE_RATE)
+
+def load_audio_array(audio: Audio):
+    """float32 samples of 16 kHz mono audio (reads 16-bit PCM WAVs written by to_16k_mono_wav)."""
+    if not isinstance(audio, Path):
+        return audio
+    return read_audio_range(audio, 0, audio_num_samples(audio))
+
+def read_audio_range(audio: Audio, start: int, stop: int):
+    """float32 samples [start, stop) of 16 kHz mono audio; WAVs are read only in that range."""
+    import numpy as np
+    if not isinstance(audio, Path):
+        return np.asarray(audio[start:stop], dtype=np.float32)
+    with wave.open(str(audio), "rb") as w:
+        if w.getsampwidth() != 2 or w.getnchannels() != 1 or w.getframerate() != SAMPLE_RATE:
+            raise RuntimeError(f"Unexpected WAV format in {audio.name} (need 16-bit mono {SAMPLE_RATE} Hz)")
+        w.setpos(min(start, w.getnframes()))
+        frames = w.readframes(max(0, stop - start))
+    return np.frombuffer(frames, dtype=np.int16).astype(np.float32) / 32768.0
+
+def audio_num_samples(audio: Audio) -> int:
+    if isinstance(audio, Path):
+        with wave.open(str(audio), "rb") as w:
+            return w.getnframes()
+    return len(audio)
+
+def plan_chunks(samples, *, chunk_s: float, search_s: float = 30.0, frame_s: float = 0.1) -> List[Tuple[float, float]]:
+    """
+    Split audio into ~chunk_s pieces, cutting at the quietest frame within +-search_s
+    of each target boundary so no chunk starts or ends mid-word.
+    """
+    import numpy as np
+    total_s = len(samples) / SAMPLE_RATE
+    if chunk_s <= 0 or total_s <= chunk_s * 1.5:
+        return [(0.0, total_s)]
+    frame = int(frame_s * SAMPLE_RATE)
+    n_frames = len(samples) // frame
+    framed = samples[:n_frames * frame].reshape(n_frames, frame)
+    energy = np.einsum("ij,ij->i", framed, framed)  # no full-size temporary
+    bounds = [0.0]
+    target = chunk_s
+    while target < total_s - chunk_s * 0.5:
+        lo = int(max(bounds[-1] + chunk_s * 0.5, target - search_s) / frame_s)
+        hi = max(lo + 1, min(n_frames, int((target + search_s) / frame_s)))
+        cut = (lo + int(np.argmin(energy[lo:hi]))) * frame_s + frame_s / 2
+        bounds.append(round(cut, 3))
+        target = cut + chunk_s
+    bounds.append(total_s)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def transcribe_chunked(
+    transcribe_fn: Callable[[Any], List[Dict]],
+    samples,
+    ckpt_dir: Path,
+    *,
+    model: str,
+    chunk_s: float,
+    workers: int = 1,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> List[Dict]:
+    """
+    Transcribe long audio chunk by chunk, checkpointing each chunk's (absolute-time)
+    segments under ckpt_dir. An interrupted video resumes from the finished chunks;
+    with workers > 1 chunks are transcribed concurrently and stitched in order.
+    """
+    plan_path = ckpt_dir / "plan.json"
+    plan = None
+    if plan_path.exists():
+        with contextlib.suppress(Exception):
+            plan = json.loads(plan_path.read_text(encoding="utf-8"))
+        if not plan or plan.get("model") != model or plan.get("chunk_s") != chunk_s \
+                or abs(plan.get("samples", 0) - len(samples)) > SAMPLE_RATE:
+            shutil.rmtree(ckpt_dir, ignore_errors=True)
+            plan = None
+    if plan is None:
+        plan = {"model": model, "chunk_s": chunk_s, "samples": len(samples),
+                "chunks": plan_chunks(samples, chunk_s=chunk_s)}
+        atomic_write_text(plan_path, json.dumps(plan))
+    chunks = [tuple(c) for c in plan["chunks"]]
+
+    def chunk_path(i: int) -> Path:
+        return ckpt_dir / f"chunk_{i:04d}.json"
+
+    def run(i: int):
+        if should_stop and should_stop():
+            raise ASRInterrupted(f"stopped before chunk {i + 1}/{len(chunks)}")
+        start_s, end_s = chunks[i]
+        piece = samples[int(start_s * SAMPLE_RATE):int(end_s * SAMPLE_RATE)]
+        segs = []
+        for seg in normalize_asr_segments(transcribe_fn(piece)):
+            seg["start"] = round(seg["start"] + start_s, 3)
+            seg["end"] = round(min(seg["end"] + start_s, end_s), 3)
+            segs.append(seg)
+        atomic_write_text(chunk_path(i), json.dumps(segs, ensure_ascii=False))
+
+    pending = [i for i in range(len(chunks)) if not chunk_path(i).exists()]
+    if len(pending) < len(chunks):
+        LOG.info("Resuming ASR: %d/%d chunks already checkpointed", len(chunks) - len(pending), len(chunks))
+    if workers > 1 and len(pending) > 1:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="asr-chunk") as pool:
+            for fut in [pool.submit(run, i) for i in pending]:
+                fut.result()
+    else:
+        for i in pending:
+            run(i)
+
+    segments: List[Dict] = []
+    for i in range(len(chunks)):
+        segments.extend(json.loads(chunk_path(i).read_text(encoding="utf-8")))
+    return segments
+
+
+# -----------------------------
+# Audio fingerprints (re-upload detection)
+# -----------------------------
+FP_N_FFT = 1024
+FP_HOP = 512  # 32 ms frames at 16 kHz
+FP_BANDS = ((10, 20), (20, 40), (40, 80), (80, 160), (160, 256))  # FFT bins, ~150 Hz - 4 kHz
+
+def audio_fingerprint(audio: Audio, *, fan_out: int = 3, max_dt: int = 64, neighborhood: int = 10,
+                      keep_one_in: int = 4, block_frames: int = 4096):
+    """
+    Landmark fingerprint: spectral peaks paired into (f1, f2, dt) hashes, Shazam-style.
+    A peak is a band's strongest bin that is also the maximum within +-neighborhood frames.
+    Only hashes selected by a deterministic hash subsample are kept (1 in keep_one_in),
+    which shrinks the store while query and index still see the same subset.
+    The spectrogram is built block-wise: a WAV is read block_frames frames (~2 min) at a time.
+    Returns (hashes, frame times) as int64 arrays.
+    """
+    import numpy as np
+    from numpy.lib.stride_tricks import sliding_window_view
+    empty = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+    n_samples = audio_num_samples(audio)
+    if n_samples < FP_N_FFT * 4:
+        return empty
+    n_frames = (n_samples - FP_N_FFT) // FP_HOP + 1
+    window = np.hanning(FP_N_FFT).astype(np.float32)
+
+    # Per band: strongest bin and its log magnitude per frame
+    band_bin = np.zeros((len(FP_BANDS), n_frames), dtype=np.int64)
+    band_val = np.zeros((len(FP_BANDS), n_frames), dtype=np.float32)
+    for start in range(0, n_frames, block_frames):
+        count = min(block_frames, n_frames - start)
+        samples = read_audio_range(audio, start * FP_HOP, (start + count - 1) * FP_HOP + FP_N_FFT)
+        block = sliding_window_view(samples, FP_N_FFT)[::FP_HOP] * window
+        spec = np.log(np.abs(np.fft.rfft(block, axis=1)) + 1e-6).astype(np.float32)
+        for b, (lo, hi) in enumerate(FP_BANDS):
+            band = spec[:, lo:hi]
+            band_bin[b, start:start + count] = band.argmax(axis=1) + lo
+            band_val[b, start:start + count] = band.max(axis=1)
+
+    peak_t, peak_f = [], []
+    for b in range(len(FP_BANDS)):
+        vals = band_val[b]
+        padded = np.pad(vals, neighborhood, constant_values=-np.inf)
+        local_max = sliding_window_view(padded, 2 * neighborhood + 1).max(axis=1)
+        t = np.flatnonzero((vals >= local_max) & (vals > np.median(vals)))
+        peak_t.append(t)
+        peak_f.append(band_bin[b, t])
+    t_all = np.concatenate(peak_t)
+    f_all = np.concatenate(peak_f)
+    order = np.lexsort((f_all, t_all))
+    t_all, f_all = t_all[order], f_all[order]
+
+    hashes, times = [], []
+    for k in range(1, fan_out + 1):
+        dt = t_all[k:] - t_all[:-k]
+        ok = dt < max_dt
+        h = (f_all[:-k][ok] << 15) | (f_all[k:][ok] << 6) | dt[ok]
+        hashes.append(h)
+        times.append(t_all[:-k][ok])
+    if not hashes:
+        return empty
+    h = np.concatenate(hashes)
+    t = np.concatenate(times)
+    keep = ((h * 2654435761) & 0xFFFFFFFF) % keep_one_in == 0
+    pairs = np.unique(np.stack([h[keep], t[keep]], axis=1), axis=0)
+    return pairs[:, 0], pairs[:, 1]
+
+def match_fingerprint(
+    db: "StateDB",
+    hashes,
+    times,
+    *,
+    exclude: str,
+    duration_s: float,
+    min_votes: int = 20,
+    min_score: float = 0.5,
+    max_uncovered_s: float = 15.0,
+    max_postings: int = 200,
+) -> Optional[Dict[str, Any]]:
+    """
+    Find a stored video containing the same audio: postings that agree on one time
+    offset (+-1 frame) vote for it. Score = aligned votes / query hashes.
+    The stored video must cover the query: the aligned hashes have to span all of its
+    duration_s but max_uncovered_s, so a full BPK is never an alias of an excerpt of it.
+    Hashes with more than max_postings rows (jingles, room tone) are ignored.
+    """
+    if len(hashes) == 0:
+        return None
+    query: Dict[int, List[int]] = {}
+    for h, t in zip(hashes.tolist(), times.tolist()):
+        query.setdefault(h, []).append(t)
+
+    postings: Dict[int, List[Tuple[str, int]]] = {}
+    for h, other, t in db.fingerprint_postings(query):
+        if other != exclude:
+            postings.setdefault(h, []).append((other, t))
+
+    votes: Counter = Counter()
+    for h, rows in postings.items():
+        if len(rows) > max_postings:
+            continue
+        for other, t_other in rows:
+            for t_query in query[h]:
+                votes[(other, t_other - t_query)] += 1
+
+    best = None
+    for (other, delta), _ in votes.most_common(50):
+        aligned = votes[(other, delta - 1)] + votes[(other, delta)] + votes[(other, delta + 1)]
+        if best is None or aligned > best[2]:
+            best = (other, delta, aligned)
+    if best is None:
+        return None
+    other, delta, aligned = best
+    score = aligned / float(len(hashes))
+    if aligned < min_votes or score < min_score:
+        return None
+    aligned_t = [t_query for h, rows in postings.items() if len(rows) <= max_postings
+                 for o, t_other in rows if o == other
+                 for t_query in query[h] if abs(t_other - t_query - delta) <= 1]
+    span_s = (max(aligned_t) - min(aligned_t)) * FP_HOP / SAMPLE_RATE
+    if duration_s - span_s > max_uncovered_s:
+        return None
+    return {"video_id": other, "offset_s": round(delta * FP_HOP / SAMPLE_RATE, 3),
+            "votes": aligned, "score": round(score, 3), "covered_s": round(span_s, 1)}
+
+def shift_segments(segments: List[Dict], offset_s: float, duration_s: Optional[float]) -> List[Dict]:
+    """Move segments from the canonical video's timeline to the alias' (t - offset), clipped to it."""
+    out = []
+    for seg in segments:
+        start = float(seg.get("start", 0.0)) - offset_s
+        end = float(seg.get("end", 0.0)) - offset_s
+        if end <= 0 or (duration_s and start >= duration_s):
+            continue
+        out.append({**seg, "start": round(max(0.0, start), 3),
+                    "end": round(min(end, duration_s) if duration_s else end, 3)})
+    return out
+
+def write_alias_rttm(src_rttm: Path, out_rttm: Path, *, uri: str, offset_s: float, duration_s: Optional[float]):
+    """Copy an RTTM (any storage variant) onto the alias' timeline and file id."""
+    lines = []
+    for line in read_output_bytes(src_rttm).decode("utf-8").splitlines():
+        parts = line.split()
+        if len(parts) < 8 or parts[0] != "SPEAKER":
+            continue
+        start = float(parts[3]) - offset_s
+        end = start + float(parts[4])
+        if end <= 0 or (duration_s and start >= duration_s):
+            continue
+        start = max(0.0, start)
+        end = min(end, duration_s) if duration_s else end
+        parts[1], parts[3], parts[4] = uri, f"{start:.3f}", f"{end - start:.3f}"
+        lines.append(" ".join(parts))
+    atomic_write_text(out_rttm, "\n".join(lines) + ("\n" if lines else ""))
+    remove_output_variants(out_rttm.parent, out_rttm.name.split(".")[0], RTTM_SUFFIXES, keep=out_rttm)
+
+
+# -----------------------------
+# Raw ASR store + re-postprocessing
 # -----------------------------
-def with_retries(fn, *, attempts: int, base_sleep: float, jitter: float, retry_name: str):
-    """Execute fn with exponential backoff on exceptions."""
+def save_raw_asr(path: Path, *, vid: str, model: str, segments: List[Dict]):
+    """Persist unfiltered ASR segments (gzip JSON, atomic) so post-processing can be re-run."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    blob = json.dumps(
+        {"video_id": vid, "whisper_model": model, "created_utc": now_utc_iso(), "segments": segments},
+        ensure_ascii=False, separators=(",", ":"),
+    ).encode("utf-8")
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp.write_bytes(gzip.compress(blob, compresslevel=6))
+    tmp.replace(path)
+
+def load_raw_asr(path: Path) -> Dict:
+    return json.loads(gzip.decompress(path.read_bytes()).decode("utf-8"))
+
+def repostprocess_one(
+    raw_path: Path,
+    json_dir: Path,
+    *,
+    outro_window_s: float,
+    hallucination_ratio: float,
+) -> Tuple[str, str]:
+    """Re-apply post-processing to stored raw segments and rewrite the transcript (same storage format)."""
+    raw = load_raw_asr(raw_path)
+    vid = raw.get("video_id") or raw_path.name.split(".")[0]
+    out_json = find_output(json_dir, vid, TRANSCRIPT_SUFFIXES)
+    if not is_valid_ok_json(out_json):
+        return vid, "skipped"
+    fmt = transcript_format_of(out_json, json.loads(read_output_bytes(out_json)))
+    payload = load_transcript(out_json)
+    kept, cutoff, transcript_text = postprocess_segments(
+        raw.get("segments", []),
+        outro_window_s=outro_window_s,
+        hallucination_ratio=hallucination_ratio,
+    )
+    meta = payload.setdefault("metadata", {})
+    meta["word_count"] = word_count(transcript_text)
+    meta["outro_cutoff_seconds"] = cutoff
+    meta["postprocessed_utc"] = now_utc_iso()
+    payload["transcript_text"] = transcript_text
+    payload["segments"] = kept
+    write_transcript(json_dir, vid, payload, fmt)
+    return vid, "ok"
+
+def run_repostprocess(
+    raw_dir: Path,
+    json_dir: Path,
+    *,
+    outro_window_s: float,
+    hallucination_ratio: float,
+    workers: int,
+) -> Counter:
+    """Re-postprocess all stored raw ASR outputs in parallel (one process per file)."""
+    raw_paths = sorted(raw_dir.glob("*.json.gz"))
+    results: Counter = Counter()
+    LOG.info("Re-postprocessing %d stored ASR outputs with %d workers...", len(raw_paths), workers)
+    with ProcessPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {
+            pool.submit(
+                repostprocess_one, p, json_dir,
+                outro_window_s=outro_window_s, hallucination_ratio=hallucination_ratio,
+            ): p
+            for p in raw_paths
+        }
+        for fut in as_completed(futures):
+            try:
+                _, status = fut.result()
+            except Exception as e:
+                status = "failed"
+                LOG.error("Re-postprocess failed for %s: %s: %s", futures[fut].name, type(e).__name__, e)
+            results[status] += 1
+    return results
+
+
+# -----------------------------
+# Stage timing report
+# -----------------------------
+def run_report(db: StateDB, *, days: float) -> Dict[str, List[Tuple]]:
+    """Log stage percentiles, real-time factors by video length and the daily throughput trend."""
+    since = time.time() - days * 86400 if days > 0 else 0.0
+    report = {
+        "stages": db.stage_percentiles(since),
+        "rtf_by_length": db.stage_rtf_by_length(since),
+        "daily": db.daily_throughput(since),
+    }
+    if not report["stages"]:
+        LOG.info("No stage timings recorded%s.", f" in the last {days:g} days" if days > 0 else "")
+        return report
+
+    busy = sum(row[7] for row in report["stages"] if row[0] != "diarization_run") or 1.0
+    LOG.info("Stage timings (seconds, successful runs%s):", f", last {days:g} days" if days > 0 else "")
+    LOG.info("  %-18s %6s %6s %8s %8s %8s %8s %7s", "stage", "n", "failed", "p50", "p90", "p99", "max", "share")
+    for stage, n, failed, p50, p90, p99, mx, total_s in report["stages"]:
+        share = "" if stage == "diarization_run" else f"{100 * total_s / busy:6.1f}%"
+        LOG.info("  %-18s %6d %6d %8.1f %8.1f %8.1f %8.1f %7s", stage, n, failed, p50, p90, p99, mx, share)
+
+    LOG.info("Real-time factor by video length (stage seconds / audio seconds):")
+    for stage, bucket, n, rtf in report["rtf_by_length"]:
+        LOG.info("  %-18s %-7s n=%-5d RTF %.3f", stage, bucket, n, rtf)
+
+    LOG.info("Daily throughput (UTC):")
+    LOG.info("  %-10s %7s %8s %8s %7s %9s", "day", "videos", "audio_h", "busy_h", "RTF", "7d_avg")
+    for day, videos, audio_h, busy_h, rtf, avg7 in report["daily"]:
+        LOG.info("  %-10s %7d %8.1f %8.1f %7s %9.1f", day, videos, audio_h, busy_h,
+                 f"{rtf:.3f}" if rtf is not None else "-", avg7)
+    return report
+
+
+# -----------------------------
+# Retry wrapper + adaptive throttle
+# -----------------------------
+def with_retries(fn, *, attempts: int, base_sleep: float, jitter: float, retry_name: str,
+                 backoff: Optional[Callable[[int], float]] = None,
+                 cancel: Optional[threading.Event] = None):
+    """
+    Execute fn with exponential backoff on exceptions (or backoff(attempt) seconds, if given).
+    Setting `cancel` stops further attempts: the last error is raised instead of retrying.
+    """
     last_err = None
     for i in range(1, attempts + 1):
         try:
             return fn()
         except Exception as e:
             last_err = e
-            if i >= attempts:
+            if i >= attempts or (cancel is not None and cancel.is_set()):
                 raise
-            sleep_s = base_sleep * (2 ** (i - 1)) + random.random() * jitter
+            sleep_s = backoff(i) if backoff else base_sleep * (2 ** (i - 1)) + random.random() * jitter
             LOG.warning("%s failed (attempt %d/%d): %s | sleeping %.1fs",
                         retry_name, i, attempts, type(e).__name__, sleep_s)
-            time.sleep(sleep_s)
+            if cancel is None:
+                time.sleep(sleep_s)
+            elif cancel.wait(sleep_s):
+                raise
     raise last_err  # pragma: no cover
 
+# yt-dlp errors that say nothing about the source's health (don't slow down for them)
+PERMANENT_SOURCE_ERRORS = (
+    "private video", "video unavailable", "has been removed", "members-only", "copyright",
+    "not available in your country", "premieres in",
+)
+
+class AdaptiveThrottle:
+    """
+    AIMD pacing of requests to the video source, shared by all workers through the StateDB.
+    A transient failure or a throughput collapse doubles the inter-video delay (up to
+    max_delay_s); healthy downloads shrink it additively (down to min_delay_s), but only
+    while the failure rate over the last `window` requests is below max_failure_rate, so a
+    flaky source is not sped up again by its occasional successes. Retry backoff scales
+    with the current delay. observe_shared() updates the shared state in one transaction.
+    Throughput is measured after the yt-dlp startup (overhead_s) and its EWMA follows every
+    successful download, slow ones included, so a lasting drop becomes the new baseline
+    instead of keeping the delay at max_delay_s. A baseline older than stale_after_s is
+    re-learned.
+    """
+    META_KEY = "throttle"
+
+    def __init__(self, *, min_delay_s: float, max_delay_s: float, step_s: float = 1.0,
+                 jitter_s: float = 0.3, window: int = 20, slow_ratio: float = 0.25,
+                 max_failure_rate: float = 0.2, stale_after_s: float = 3600.0):
+        self.min_delay_s = float(min_delay_s)
+        self.max_delay_s = float(max_delay_s)
+        self.step_s = float(step_s)
+        self.jitter_s = float(jitter_s)
+        self.slow_ratio = float(slow_ratio)
+        self.max_failure_rate = float(max_failure_rate)
+        self.stale_after_s = float(stale_after_s)
+        self.delay_s = self.min_delay_s
+        self.throughput_bps: Optional[float] = None  # EWMA of download throughput (startup excluded)
+        self.outcomes: deque = deque(maxlen=window)
+
+    @property
+    def failure_rate(self) -> float:
+        return (self.outcomes.count(False) / len(self.outcomes)) if self.outcomes else 0.0
+
+    def _apply_state(self, raw: Optional[str]):
+        if not raw:
+            return
+        with contextlib.suppress(ValueError, TypeError):
+            state = json.loads(raw)
+            self.outcomes.clear()
+            self.delay_s = min(self.max_delay_s, max(self.min_delay_s, float(state.get("delay_s", self.delay_s))))
+            self.throughput_bps = state.get("throughput_bps")
+            if time.time() - float(state.get("updated_ts", 0.0)) > self.stale_after_s:
+                self.throughput_bps = None
+            self.outcomes.extend(bool(x) for x in state.get("outcomes", []))
+
+    def _state(self) -> str:
+        return json.dumps({
+            "delay_s": round(self.delay_s, 3),
+            "throughput_bps": self.throughput_bps,
+            "outcomes": [int(x) for x in self.outcomes],
+            "updated_utc": now_utc_iso(),
+            "updated_ts": round(time.time(), 3),
+        })
+
+    def load(self, db: "StateDB") -> "AdaptiveThrottle":
+        self._apply_state(db.get_meta(self.META_KEY))
+        return self
+
+    def save(self, db: "StateDB"):
+        db.set_meta(self.META_KEY, self._state())
+
+    def observe_shared(self, db: "StateDB", ok: bool, **kw) -> bool:
+        """observe() on the state other workers saved, written back atomically."""
+        changed = False
+
+        def update(raw: Optional[str]) -> Optional[str]:
+            nonlocal changed
+            self._apply_state(raw)
+            changed = self.observe(ok, **kw)
+            return self._state() if changed else None
+
+        db.update_meta(self.META_KEY, update)
+        return changed
+
+    def observe(self, ok: bool, *, seconds: float = 0.0, nbytes: int = 0, overhead_s: float = 0.0,
+                error: str = "") -> bool:
+        """
+        Feed one source request outcome; returns False if it was ignored (permanent error).
+        overhead_s: yt-dlp startup/extraction time included in `seconds` (e.g. the info call's).
+        """
+        if not ok and any(marker in error.lower() for marker in PERMANENT_SOURCE_ERRORS):
+            return False
+        healthy = ok
+        transfer_s = seconds - max(0.0, overhead_s)
+        # Downloads shorter than the startup (short videos) say nothing about the throughput
+        if ok and nbytes > 0 and transfer_s > max(overhead_s, 1.0):
+            bps = nbytes / transfer_s
+            if self.throughput_bps and bps < self.slow_ratio * self.throughput_bps:
+                healthy = False  # served, but throttled to a crawl
+            self.throughput_bps = bps if self.throughput_bps is None else 0.8 * self.throughput_bps + 0.2 * bps
+        self.outcomes.append(healthy)
+        before = self.delay_s
+        if not healthy:
+            self.delay_s = min(self.max_delay_s, max(self.delay_s, self.step_s) * 2)
+        elif self.failure_rate < self.max_failure_rate:
+            self.delay_s = max(self.min_delay_s, self.delay_s - self.step_s)
+        if self.delay_s > before:
+            LOG.warning("Source degraded (failure rate %.0f%%): inter-video delay %.1fs -> %.1fs",
+                        self.failure_rate * 100, before, self.delay_s)
+        return True
+
+    def backoff(self, attempt: int) -> float:
+        """Retry sleep: exponential in the attempt, based on the current delay."""
+        base = max(1.0, self.delay_s)
+        return min(self.max_delay_s, base * (2 ** (attempt - 1))) + random.random() * self.jitter_s
+
+    def pause(self):
+        time.sleep(max(0.05, self.delay_s + random.random() * self.jitter_s))
+
 
 # -----------------------------
 # Main
@@ -432,35 +2442,119 @@ def main():
     ap = argparse.ArgumentParser(
         description="BPK Pipeline: Resilient MLX-Whisper + Pyannote Diarization for massive playlists (macOS/Apple Silicon)"
     )
-    ap.add_argument("--playlist-url", required=True, help="YouTube playlist URL")
+    ap.add_argument("--playlist-url", default=None, help="YouTube playlist URL (required unless running an offline mode)")
     ap.add_argument("--out-dir", required=True, help="Output directory for JSON+RTTM")
     ap.add_argument("--tmp-dir", default="/tmp/bpk_pipeline", help="Temp directory for downloads")
-    ap.add_argument("--state-dir", default=None, help="State directory (default: <out-dir>/.state)")
+    ap.add_argument("--state-dir", default=str(DEFAULT_STATE_DIR),
+                    help="State directory incl. speaker centroids in embeddings/; must not lie inside --out-dir "
+                         "(default: .state of the project, where the aggregation reads it)")
 
     ap.add_argument("--yt-dlp", dest="ytdlp_path", default=None, help="Explicit yt-dlp binary path")
     ap.add_argument("--ffmpeg", dest="ffmpeg_path", default=None, help="Explicit ffmpeg binary path")
 
-    ap.add_argument("--whisper-model", default="mlx-community/whisper-large-v3-turbo", help="MLX Whisper model")
+    ap.add_argument("--backend", choices=sorted(DEFAULT_WHISPER_MODELS), default="mlx",
+                    help="ASR/diarization backend: mlx (Apple Silicon), cpu (faster-whisper + pyannote on CPU), stub (tests)")
+    ap.add_argument("--whisper-model", default=None,
+                    help="Whisper model (default per backend: " + ", ".join(f"{k}={v}" for k, v in DEFAULT_WHISPER_MODELS.items()) + ")")
+    ap.add_argument("--language", default=None,
+                    help="Spoken language for Whisper, e.g. de (default: detect per video; same for every backend)")
+    ap.add_argument("--cpu-threads", type=int, default=os.cpu_count() or 1, help="Thread count for the cpu backend")
+    ap.add_argument("--cpu-compute-type", default="int8", help="faster-whisper quantization for the cpu backend (int8/int8_float32/float32)")
+    ap.add_argument("--asr-batch-size", type=int, default=8, help="Batched decoding size for the cpu backend (1=sequential)")
     ap.add_argument("--outro-window-s", type=int, default=180, help="Outro detection window (seconds)")
+    ap.add_argument("--hallucination-ratio", type=float, default=0.6,
+                    help="Drop segments whose most frequent word exceeds this share of the words")
+    ap.add_argument("--asr-chunk-s", type=float, default=1200.0,
+                    help="Split long audio into ~N-second chunks at silences, checkpointed for resume (0=off)")
+    ap.add_argument("--asr-chunk-workers", type=int, default=1,
+                    help="Transcribe chunks of one video concurrently (cpu backend: one model replica each, "
+                         "each with --cpu-threads threads; not supported by mlx)")
 
     ap.add_argument("--min-speakers", type=int, default=2, help="Minimum speakers for diarization")
     ap.add_argument("--max-speakers", type=int, default=12, help="Maximum speakers for diarization")
-    ap.add_argument("--diarization-device", default="mps", help="Device for diarization (mps/cpu/cuda)")
+    ap.add_argument("--diarization-device", default=None, help="Device for diarization (mps/cpu/cuda; default per backend)")
+    ap.add_argument("--clustering-threshold", type=float, default=None,
+                    help="Override pyannote's agglomerative clustering threshold")
+    ap.add_argument("--diarization-arrays", action=argparse.BooleanOptionalAction, default=False,
+                    help="Persist segmentation + speaker embeddings per video for --recluster (uses pyannote internals; "
+                         "checked against pipeline(file) on the first video)")
+    ap.add_argument("--parallel-stages", action=argparse.BooleanOptionalAction, default=True,
+                    help="Run diarization concurrently with ASR (use --diarization-device to put it on another device)")
+
+    ap.add_argument("--transcript-format", choices=TRANSCRIPT_FORMATS, default="pretty",
+                    help="Transcript storage: pretty (legacy indented JSON), compact (columnar JSON), "
+                         "gzip or zstd (compressed compact); convert existing files with python -m aggregation.convert")
+
+    ap.add_argument("--dedup", action=argparse.BooleanOptionalAction, default=True,
+                    help="Fingerprint audio before ASR and reuse transcript+RTTM of an already processed re-upload")
+    ap.add_argument("--dedup-min-score", type=float, default=0.5,
+                    help="Share of fingerprint hashes that must align with a stored video to count as duplicate "
+                         "(the stored video must also cover the new one's whole audio)")
 
     ap.add_argument("--retry-failed", action="store_true", help="Retry previously failed videos")
     ap.add_argument("--fail-fast", action="store_true", help="Exit on first video failure")
     ap.add_argument("--keep-temp", action="store_true", help="Keep temp files after processing")
+    ap.add_argument("--cache-dir", default=None, help="Audio cache directory (default: <tmp-dir>/cache)")
+    ap.add_argument("--cache-max-gb", type=float, default=20.0, help="Audio cache size limit in GB (0=disable cache)")
+    ap.add_argument("--in-memory-audio", action="store_true",
+                    help="Decode to a float32 buffer via an ffmpeg pipe instead of writing a 16 kHz WAV")
 
     ap.add_argument("--ytdlp-retries", type=int, default=10, help="yt-dlp retry count")
     ap.add_argument("--ytdlp-socket-timeout", type=int, default=30, help="yt-dlp socket timeout (seconds)")
 
     ap.add_argument("--max-attempts-per-video", type=int, default=2, help="Max retry attempts per video")
-    ap.add_argument("--sleep-s", type=float, default=0.3, help="Base sleep between videos (seconds)")
+    ap.add_argument("--sleep-s", type=float, default=0.3, help="Base sleep between videos (seconds; floor of the adaptive delay)")
     ap.add_argument("--sleep-jitter-s", type=float, default=0.3, help="Random jitter added to sleep (seconds)")
+    ap.add_argument("--adaptive-throttle", action=argparse.BooleanOptionalAction, default=True,
+                    help="AIMD pacing: grow the inter-video delay and retry backoff when downloads fail or slow down")
+    ap.add_argument("--max-sleep-s", type=float, default=300.0, help="Ceiling of the adaptive inter-video delay (seconds)")
 
     ap.add_argument("--manifest-refresh", action="store_true", help="Force rebuild of playlist manifest")
+    ap.add_argument("--manifest-refresh-min", type=float, default=0.0,
+                    help="Re-read the playlist every N minutes while running (with --drain: keep polling when idle)")
+    ap.add_argument("--schedule", choices=sorted(StateDB.SCHEDULES), default=None,
+                    help="Claim order shared by all workers: fifo (playlist order), newest, shortest; "
+                         "retried failures always go last (default: keep the stored policy, initially fifo)")
+    ap.add_argument("--enqueue-only", action="store_true",
+                    help="Build/refresh the manifest and update the queue (and --schedule), then exit")
     ap.add_argument("--limit", type=int, default=0, help="Limit to first N videos (0=all)")
+
+    ap.add_argument("--worker-id", default=None, help="Worker identity for leases (default: <host>:<pid>)")
+    ap.add_argument("--lease-s", type=float, default=120.0, help="Lease duration; crashed workers' videos are reclaimed after it expires")
+    ap.add_argument("--shard", default=None, help="Static partition 'i/N': only process videos with hash(id) %% N == i")
+    ap.add_argument("--drain", action="store_true", help="When idle, wait for other workers' leases and reclaim expired ones")
+    ap.add_argument("--shared-state", action="store_true", help="State dir is shared across hosts (network FS): disable SQLite WAL")
+
+    ap.add_argument("--metrics-textfile", default=None,
+                    help="Write Prometheus metrics to this file (node_exporter textfile collector), refreshed periodically")
+    ap.add_argument("--metrics-port", type=int, default=None, help="Serve Prometheus metrics on 127.0.0.1:PORT/metrics")
+    ap.add_argument("--metrics-interval-s", type=float, default=15.0, help="Metrics textfile refresh interval (seconds)")
+    ap.add_argument("--event-flush-s", type=float, default=2.0, help="Flush interval of the buffered events.jsonl writer")
+
+    ap.add_argument("--repostprocess", action="store_true",
+                    help="Offline mode: re-apply hallucination filter + outro trim to stored raw ASR output, no ASR")
+    ap.add_argument("--recluster", action="store_true",
+                    help="Offline mode: regenerate RTTMs from stored embeddings with new --min/--max-speakers or --clustering-threshold")
+    ap.add_argument("--benchmark", default=None, metavar="AUDIO",
+                    help="Offline mode: report real-time factors of --benchmark-backends on one audio file")
+    ap.add_argument("--benchmark-backends", default="stub,cpu,mlx", help="Comma-separated backends for --benchmark")
+    ap.add_argument("--report", action="store_true",
+                    help="Offline mode: per-stage percentiles, real-time factors and daily throughput from the state DB")
+    ap.add_argument("--report-days", type=float, default=30.0, help="Time window for --report in days (0=all)")
+    ap.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes for offline modes")
     args = ap.parse_args()
+    offline_mode = args.repostprocess or args.recluster or args.benchmark or args.report
+    if not offline_mode and not args.playlist_url:
+        ap.error("--playlist-url is required")
+    try:
+        shard = parse_shard(args.shard)
+    except ValueError as e:
+        ap.error(str(e))
+    if args.transcript_format == "zstd":
+        try:
+            _zstandard()
+        except RuntimeError as e:
+            ap.error(str(e))
 
     # Logging: compact, suppress noisy libs
     logging.basicConfig(
@@ -472,6 +2566,84 @@ def main():
     logging.getLogger("urllib3").setLevel(logging.WARNING)
     logging.getLogger("filelock").setLevel(logging.WARNING)
 
+    out_dir = Path(args.out_dir).expanduser().resolve()
+    tmp_dir = Path(args.tmp_dir).expanduser().resolve()
+    state_dir = Path(args.state_dir).expanduser().resolve()
+    if state_dir == out_dir or out_dir in state_dir.parents:
+        # out_dir is typically public/data: everything in it is served statically
+        raise SystemExit(f"--state-dir {state_dir} lies inside --out-dir {out_dir}; "
+                         f"it holds speaker centroids and raw ASR, move it outside (default: {DEFAULT_STATE_DIR})")
+    if (out_dir / ".state").is_dir() and not (state_dir / "state.db").exists():
+        LOG.warning("Found state of an older run in %s: move it to %s (it must not stay in the served out-dir)",
+                    out_dir / ".state", state_dir)
+
+    json_dir = out_dir / "json"
+    rttm_dir = out_dir / "rttm"
+    raw_asr_dir = state_dir / "raw_asr"
+    asr_chunks_dir = state_dir / "asr_chunks"
+    diarization_arrays_dir = state_dir / "diarization"
+    embeddings_dir = state_dir / "embeddings"
+    for d in (out_dir, tmp_dir, state_dir, json_dir, rttm_dir):
+        d.mkdir(parents=True, exist_ok=True)
+
+    # Offline modes: no tools, no models, no playlist
+    if args.repostprocess:
+        t0 = time.time()
+        res = run_repostprocess(
+            raw_asr_dir, json_dir,
+            outro_window_s=float(args.outro_window_s),
+            hallucination_ratio=args.hallucination_ratio,
+            workers=args.workers,
+        )
+        LOG.info("✅ Re-postprocess finished. ok=%d skipped=%d failed=%d elapsed=%.1fs",
+                 res["ok"], res["skipped"], res["failed"], time.time() - t0)
+        return
+
+    if args.recluster:
+        t0 = time.time()
+        diarizer = PyannoteDiarizer(args.diarization_device or "cpu", threads=args.cpu_threads)
+        diarizer.load()
+        if not diarization_arrays_supported(diarizer.pipeline):
+            raise SystemExit("--recluster needs pyannote internals this version lacks (see --diarization-arrays)")
+        res = run_recluster(
+            diarizer.pipeline, diarization_arrays_dir, rttm_dir,
+            min_speakers=args.min_speakers, max_speakers=args.max_speakers,
+            clustering_threshold=args.clustering_threshold,
+            centroids_dir=embeddings_dir,
+        )
+        LOG.info("✅ Re-cluster finished. ok=%d failed=%d elapsed=%.1fs", res["ok"], res["failed"], time.time() - t0)
+        return
+
+    if args.report:
+        db = StateDB(state_dir / "state.db", wal=not args.shared_state)
+        try:
+            run_report(db, days=args.report_days)
+        finally:
+            db.close()
+        return
+
+    if args.benchmark:
+        bench_path = Path(args.benchmark).expanduser().resolve()
+        bench_dir = tmp_dir / "benchmark"
+        bench_dir.mkdir(parents=True, exist_ok=True)
+        try:
+            bench_audio: Audio = bench_path
+            load_audio_array(bench_path)  # validates 16-bit mono 16 kHz WAV
+        except (RuntimeError, wave.Error, EOFError):
+            stacher_dir = Path.home() / ".stacher"
+            ffmpeg = resolve_tool(args.ffmpeg_path, stacher_dir / "ffmpeg", "ffmpeg")
+            bench_audio = bench_dir / "benchmark.16k.wav"
+            to_16k_mono_wav(ffmpeg, bench_path, bench_audio, env=tool_env(stacher_dir))
+        names = [n.strip() for n in args.benchmark_backends.split(",") if n.strip()]
+        for row in run_benchmark(bench_audio, names, args, bench_dir):
+            if "error" in row:
+                LOG.info("%-5s  error: %s", row["backend"], tail(row["error"], 200))
+                continue
+            LOG.info("%-5s  load=%.1fs  asr=%.1fs (RTF %.3f)  diarization=%.1fs (RTF %.3f)  segments=%d  model=%s",
+                     row["backend"], row["load_s"], row["asr_s"], row["asr_rtf"] or 0,
+                     row["diarization_s"], row["diarization_rtf"] or 0, row["segments"], row["model"])
+        return
+
     stop = StopFlag()
 
     home = Path.home()
@@ -484,19 +2656,37 @@ def main():
 
     playlist_url = normalize_url(args.playlist_url)
 
-    out_dir = Path(args.out_dir).expanduser().resolve()
-    tmp_dir = Path(args.tmp_dir).expanduser().resolve()
-    state_dir = Path(args.state_dir).expanduser().resolve() if args.state_dir else (out_dir / ".state")
-
-    json_dir = out_dir / "json"
-    rttm_dir = out_dir / "rttm"
-    for d in (out_dir, tmp_dir, state_dir, json_dir, rttm_dir):
-        d.mkdir(parents=True, exist_ok=True)
+    cache = None
+    if args.cache_max_gb > 0:
+        cache_dir = Path(args.cache_dir).expanduser().resolve() if args.cache_dir else (tmp_dir / "cache")
+        cache = AudioCache(cache_dir, max_bytes=int(args.cache_max_gb * 1024 ** 3))
 
-    events_jsonl = state_dir / "events.jsonl"
+    events = EventSink(state_dir / "events.jsonl", flush_interval_s=args.event_flush_s)
     errors_log = state_dir / "errors.log"
     manifest = state_dir / "playlist_ids.txt"
-    db = StateDB(state_dir / "state.db")
+    db = StateDB(state_dir / "state.db", wal=not args.shared_state)
+    worker_id = args.worker_id or f"{socket.gethostname()}:{os.getpid()}"
+    run_started = now_utc_iso()
+    metrics = Metrics(worker_id)
+    exporter = None
+    if args.metrics_textfile or args.metrics_port:
+        exporter = MetricsExporter(
+            metrics,
+            textfile=Path(args.metrics_textfile).expanduser().resolve() if args.metrics_textfile else None,
+            port=args.metrics_port,
+            interval_s=args.metrics_interval_s,
+        ).start()
+    throttle = None
+    if args.adaptive_throttle:
+        throttle = AdaptiveThrottle(
+            min_delay_s=args.sleep_s, max_delay_s=args.max_sleep_s, jitter_s=args.sleep_jitter_s,
+        ).load(db)
+        metrics.set_throttle(throttle.delay_s)
+
+    def throttle_observe(ok: bool, **kw):
+        # The delay is shared with the other workers on this state DB
+        if throttle.observe_shared(db, ok, **kw):
+            metrics.set_throttle(throttle.delay_s)
 
     # Optional rich UI
     try:
@@ -509,7 +2699,7 @@ def main():
         use_rich = False
 
     def log_event(level: str, msg: str, **fields):
-        append_jsonl(events_jsonl, {"ts": now_utc_iso(), "level": level, "msg": msg, **fields})
+        events.emit({"ts": now_utc_iso(), "level": level, "msg": msg, **fields})
         if level == "error":
             LOG.error(msg)
         elif level == "warn":
@@ -518,59 +2708,91 @@ def main():
             LOG.info(msg)
 
     # 1) Build or reuse manifest (streaming)
-    if args.manifest_refresh or not manifest.exists():
+    def build_manifest() -> List[Tuple[str, Optional[float], Optional[float]]]:
+        """Fetch the playlist into the manifest; returns (id, duration_s, publish_ts) per video."""
         log_event("info", "Building playlist manifest (streaming)...", playlist_url=playlist_url)
         cmd = [
             ytdlp,
             "--plugin-dirs", str(plugins_dir),
             "--flat-playlist",
             "--no-warnings",
-            "--print", "id",
+            "--print", MANIFEST_PRINT,
             playlist_url,
         ]
         seen = set()
-        n = 0
+        video_meta = []
         tmp_manifest = manifest.with_suffix(".txt.tmp")
         with tmp_manifest.open("w", encoding="utf-8") as f:
             for line in iter_cmd_stdout_lines(cmd, env=env, timeout=3600):
-                vid = line.strip()
-                if not vid or vid in seen:
+                entry = parse_manifest_line(line)
+                if not entry or entry[0] in seen:
                     continue
-                seen.add(vid)
-                f.write(vid + "\n")
-                n += 1
-                if args.limit and n >= args.limit:
+                seen.add(entry[0])
+                video_meta.append(entry)
+                f.write(entry[0] + "\n")
+                if args.limit and len(video_meta) >= args.limit:
                     break
         tmp_manifest.replace(manifest)
-        db.set_total(n)
-        log_event("info", f"Manifest ready: {n} videos.", total=n)
-
-    # Load manifest total
-    total = db.get_total()
-    if total is None:
-        total = sum(1 for _ in manifest.open("r", encoding="utf-8"))
-        db.set_total(total)
-
-    if args.limit and args.limit > 0:
-        total = min(total, args.limit)
+        db.set_total(len(video_meta))
+        log_event("info", f"Manifest ready: {len(video_meta)} videos.", total=len(video_meta))
+        return video_meta
+
+    def register_manifest(video_meta: List[Tuple[str, Optional[float], Optional[float]]]) -> int:
+        """Register manifest ids in the shared work queue (idempotent; keeps existing status)."""
+        total = db.get_total()
+        if total is None:
+            total = sum(1 for _ in manifest.open("r", encoding="utf-8"))
+            db.set_total(total)
+        if args.limit and args.limit > 0:
+            total = min(total, args.limit)
+        with manifest.open("r", encoding="utf-8") as f:
+            ids = [ln.strip() for ln in f if ln.strip()]
+        db.enqueue(ids[:args.limit] if args.limit and args.limit > 0 else ids)
+        db.set_video_meta(video_meta)
+        if shard:
+            total = db.count_queued(shard=shard)
+        return total
+
+    if args.schedule:
+        db.set_schedule(args.schedule)
+    total = register_manifest(build_manifest() if (args.manifest_refresh or not manifest.exists()) else [])
+    last_manifest_refresh = time.time()
+    if args.enqueue_only:
+        LOG.info("✅ Enqueued. queue=%s schedule=%s", db.queue_depths(shard=shard), db.get_schedule())
+        if exporter is not None:
+            exporter.stop()
+        events.close()
+        db.close()
+        return
+    log_event("info", f"Worker {worker_id} ready.", worker_id=worker_id, shard=args.shard, total=total,
+              schedule=db.get_schedule())
+    metrics.set_queue(db.queue_depths(shard=shard))
 
     # 2) Load models
-    log_event("info", "Loading AI models (Whisper + Diarization)...", whisper_model=args.whisper_model)
-    import mlx_whisper
-    from pyannote.audio import Pipeline
-    import torch
+    asr_backend, diar_backend = make_backends(
+        args.backend, args,
+        diarization_arrays_dir=diarization_arrays_dir if args.diarization_arrays else None,
+        centroids_dir=embeddings_dir,
+    )
+    if args.asr_chunk_workers > 1 and not asr_backend.thread_safe:
+        raise SystemExit(f"--asr-chunk-workers {args.asr_chunk_workers}: the {asr_backend.name} ASR backend "
+                         "cannot transcribe from several threads at once; use 1")
+    whisper_model = asr_backend.model
+    log_event("info", "Loading AI models (Whisper + Diarization)...", backend=args.backend, whisper_model=whisper_model)
+    asr_backend.load()
+    diar_backend.load()
+    log_event("info", "Models loaded.", backend=args.backend, diarization=diar_backend.name)
 
-    diarization_pipeline = Pipeline.from_pretrained("pyannote/speaker-diarization-3.1")
-    diarization_pipeline.to(torch.device(args.diarization_device))
-    log_event("info", "Models loaded.", device=args.diarization_device)
+    stage_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix="diarization") if args.parallel_stages else None
 
     # 3) Progress stats
     t_global = time.time()
     last_durations = deque(maxlen=30)
     ok_count = 0
     fail_count = 0
-    skip_count = 0
-    done_count = 0
+    # Finished (or, without --retry-failed, permanently failed) videos are never claimed again
+    skip_count = db.count_queued(shard=shard, statuses=("ok",) if args.retry_failed else ("ok", "failed"))
+    done_count = skip_count
 
     def eta_seconds(avg_s: float, remaining: int) -> Optional[float]:
         return (avg_s * remaining) if avg_s > 0 else None
@@ -579,106 +2801,223 @@ def main():
     def process_one(vid: str, idx: int):
         nonlocal ok_count, fail_count, skip_count, done_count
 
-        out_json = json_dir / f"{vid}.json"
         out_rttm = rttm_dir / f"{vid}.rttm"
         video_url = f"https://www.youtube.com/watch?v={vid}"
         work = tmp_dir / vid
 
-        # Skip logic: prefer JSON validity + RTTM existence
-        if (is_valid_ok_json(out_json) and out_rttm.exists() and out_rttm.stat().st_size > 0
+        # Skip logic: prefer JSON validity + RTTM existence (the claim filters ok/failed states)
+        existing_rttm = find_output(rttm_dir, vid, RTTM_SUFFIXES)
+        if (is_valid_ok_json(find_output(json_dir, vid, TRANSCRIPT_SUFFIXES))
+            and existing_rttm is not None and existing_rttm.stat().st_size > 0
             and not args.retry_failed):
-            skip_count += 1
-            done_count += 1
-            return
-
-        st = db.status_of(vid)
-        if st == "ok" and not args.retry_failed:
-            skip_count += 1
-            done_count += 1
-            return
-        if st == "failed" and not args.retry_failed:
+            db.mark_existing_ok(vid)
+            metrics.video_done("skipped")
             skip_count += 1
             done_count += 1
             return
 
         if stop.stop:
+            db.release(vid, worker_id)
             raise SystemExit("Stop requested")
 
         if work.exists() and not args.keep_temp:
             shutil.rmtree(work, ignore_errors=True)
         work.mkdir(parents=True, exist_ok=True)
 
-        stage = "start"
         t0 = time.time()
+        audio_s: Optional[float] = None
+
+        def record_stage(stage_name: str, seconds: float, info: Dict):
+            status = "failed" if info.get("failed") else ("interrupted" if info.get("interrupted") else "ok")
+            db.record_stage(
+                vid, stage_name, worker_id=worker_id, started=info["started"], seconds=seconds, status=status,
+                nbytes=info.get("bytes"), audio_s=info.get("audio_s") or audio_s,
+            )
+
+        clock = StageClock([metrics.observe_stage, record_stage])
+        stage = clock.enter("start")
         db.mark_in_progress(vid, stage=stage)
-        append_jsonl(events_jsonl, {"ts": now_utc_iso(), "video_id": vid, "event": "start", "i": idx, "n": total})
+        heartbeat = LeaseHeartbeat(db.path, vid, worker_id, lease_s=args.lease_s, wal=not args.shared_state).start()
+        diar_future: Optional[Future] = None
+        diar_cancel = threading.Event()
+        diar_started_here = False
+        diar_run: Dict[str, Any] = {}
+        completed = False
+        events.emit({"ts": now_utc_iso(), "video_id": vid, "event": "start", "i": idx, "n": total})
 
         try:
             # Stage: info
-            stage = "info"
+            stage = clock.enter("info")
+            info_started = time.time()
             info = ytdlp_info(ytdlp, plugins_dir, video_url, env=env)
-
-            # Stage: download (with retry)
-            stage = "download"
-            def _dl():
-                return download_best_audio(
-                    ytdlp, plugins_dir, video_url, work,
-                    retries=args.ytdlp_retries,
-                    socket_timeout=args.ytdlp_socket_timeout,
-                    env=env
-                )
-            audio_src = with_retries(
-                _dl,
-                attempts=max(1, args.max_attempts_per_video),
-                base_sleep=1.0,
-                jitter=0.5,
-                retry_name="download"
-            )
-
-            # Stage: ffmpeg
-            stage = "ffmpeg_16k"
-            wav_16k = work / f"{vid}.16k.wav"
-            to_16k_mono_wav(ffmpeg, audio_src, wav_16k, env=env)
-
-            # Stage: asr
-            stage = "asr_mlx"
-            kwargs = {"path_or_hf_repo": args.whisper_model, "verbose": False}
-            sig = None
-            with contextlib.suppress(Exception):
-                sig = inspect.signature(mlx_whisper.transcribe)
-            if sig and "verbose" not in sig.parameters:
-                kwargs.pop("verbose", None)
-
-            transcribe_result = mlx_whisper.transcribe(str(wav_16k), **kwargs)
-
-            segments = []
-            for s in transcribe_result.get("segments", []) or []:
-                start_s = float(s.get("start", 0.0) or 0.0)
-                end_s = float(s.get("end", 0.0) or 0.0)
-                if end_s < start_s:
-                    continue
-                text = (s.get("text", "") or "").strip()
-                segments.append({"start": start_s, "end": end_s, "text": text})
-
-            segments = filter_hallucinations(segments)
-            cutoff = detect_outro_cutoff(segments, window_s=float(args.outro_window_s))
-            kept = trim_segments_by_cutoff(segments, cutoff)
-            transcript_text = "\n".join(s["text"] for s in kept if s.get("text")).strip()
-
-            # Stage: diarization (with retry, REQUIRED)
-            stage = "diarization"
+            # A download pays the same yt-dlp startup + extraction before the first byte
+            ytdlp_overhead_s = time.time() - info_started
+            if info:
+                db.set_video_meta([(vid, _num(info.get("duration")), video_publish_ts(info))])
+
+            # A cached 16 kHz WAV (e.g. from an earlier, failed attempt) makes the download unnecessary
+            cached_16k = cache.get(vid, "16k") if cache else None
+            audio_src: Optional[Path] = None
+            if cached_16k is None:
+                # Stage: download (with retry; cached across retries/re-runs)
+                stage = clock.enter("download")
+                def _dl():
+                    dl_started = time.time()
+                    try:
+                        path = download_best_audio(
+                            ytdlp, plugins_dir, video_url, work,
+                            retries=args.ytdlp_retries,
+                            socket_timeout=args.ytdlp_socket_timeout,
+                            env=env
+                        )
+                    except Exception as e:
+                        if throttle:
+                            throttle_observe(False, error=str(e))
+                        raise
+                    if throttle:
+                        throttle_observe(True, seconds=time.time() - dl_started, nbytes=path.stat().st_size,
+                                         overhead_s=ytdlp_overhead_s)
+                    return path
+                audio_src = cache.get(vid, "src") if cache else None
+                if audio_src is None:
+                    audio_src = with_retries(
+                        _dl,
+                        attempts=max(1, args.max_attempts_per_video),
+                        base_sleep=1.0,
+                        jitter=0.5,
+                        retry_name="download",
+                        backoff=throttle.backoff if throttle else None,
+                    )
+                    if cache:
+                        audio_src = cache.put(vid, "src", audio_src)
+                clock.note(bytes=audio_src.stat().st_size)
+
+            # Stage: ffmpeg (one decode, shared by ASR and diarization)
+            stage = clock.enter("ffmpeg_16k")
+            audio: Audio
+            if args.in_memory_audio:
+                audio = decode_16k_mono_f32(ffmpeg, cached_16k or audio_src, env=env)
+            elif cached_16k is not None:
+                audio = cached_16k
+            else:
+                audio = work / f"{vid}.16k.wav"
+                to_16k_mono_wav(ffmpeg, audio_src, audio, env=env)
+                if cache:
+                    audio = cache.put(vid, "16k", audio)
+            audio_s = audio_duration_s(audio)
+            clock.note(audio_s=audio_s, bytes=audio.nbytes if not isinstance(audio, Path) else audio.stat().st_size)
+
+            # Stage: fingerprint (re-uploads reuse the canonical video's outputs, no ASR)
+            fingerprint = None
+            if args.dedup:
+                stage = clock.enter("fingerprint")
+                fingerprint = audio_fingerprint(audio)
+                match = match_fingerprint(db, *fingerprint, exclude=vid, duration_s=audio_s,
+                                          min_score=args.dedup_min_score)
+                canonical_json = find_output(json_dir, match["video_id"], TRANSCRIPT_SUFFIXES) if match else None
+                canonical_rttm = find_output(rttm_dir, match["video_id"], RTTM_SUFFIXES) if match else None
+                if match and is_valid_ok_json(canonical_json) and canonical_rttm is not None:
+                    stage = clock.enter("alias")
+                    heartbeat.check(db)
+                    payload = load_transcript(canonical_json)
+                    payload["segments"] = shift_segments(payload.get("segments", []), match["offset_s"], audio_s)
+                    payload["transcript_text"] = "\n".join(seg["text"] for seg in payload["segments"]).strip()
+                    meta = payload.setdefault("metadata", {})
+                    if meta.get("outro_cutoff_seconds") is not None:
+                        meta["outro_cutoff_seconds"] = round(max(0.0, meta["outro_cutoff_seconds"] - match["offset_s"]), 3)
+                    meta.update({
+                        "source_url": (info.get("webpage_url") if isinstance(info, dict) else None) or video_url,
+                        "video_id": vid,
+                        "original_title": (info.get("title") if isinstance(info, dict) else "") or "",
+                        "author": ((info.get("uploader") or info.get("channel")) if isinstance(info, dict) else "") or "",
+                        "video_length_seconds": (info.get("duration") if isinstance(info, dict) else 0) or 0,
+                        "retrieval_timestamp_utc": now_utc_iso(),
+                        "word_count": word_count(payload["transcript_text"]),
+                        "diarization_rttm_path": str(out_rttm.relative_to(out_dir)),
+                        "alias_of": match["video_id"],
+                        "alias_offset_seconds": match["offset_s"],
+                        "fingerprint_score": match["score"],
+                    })
+                    # No centroid copy: aliases are left out of aggregation (alias_of), their speakers
+                    # are the canonical video's
+                    write_alias_rttm(canonical_rttm, out_rttm,
+                                     uri=f"{vid}.16k", offset_s=match["offset_s"], duration_s=audio_s)
+                    write_transcript(json_dir, vid, payload, args.transcript_format)
+
+                    seconds = time.time() - t0
+                    db.add_fingerprints(vid, *fingerprint)
+                    db.add_alias(vid, match["video_id"], offset_s=match["offset_s"], score=match["score"])
+                    db.mark_ok(vid, seconds=seconds, words=meta["word_count"])
+                    clock.close()
+                    metrics.video_done("alias", seconds=seconds, audio_s=audio_s)
+                    log_event("info", f"{vid} is a re-upload of {match['video_id']} "
+                                      f"(score={match['score']}, offset={match['offset_s']}s); reused its outputs.",
+                              video_id=vid, event="alias", canonical_id=match["video_id"],
+                              offset_s=match["offset_s"], score=match["score"])
+                    ok_count += 1
+                    done_count += 1
+                    last_durations.append(seconds)
+                    return
+
+            # Diarization (with retry, REQUIRED) is independent of ASR given the audio:
+            # start it in the background and join before write_json.
             def _diarize():
-                diarize_to_rttm(
-                    diarization_pipeline,
-                    wav_16k,
+                diar_backend.diarize(
+                    audio,
                     out_rttm,
                     min_speakers=args.min_speakers,
                     max_speakers=args.max_speakers,
+                    uri=f"{vid}.16k",
+                    video_id=vid,
                 )
-            with_retries(_diarize, attempts=3, base_sleep=2.0, jitter=1.0, retry_name="diarization")
+            def _diarize_with_retries():
+                # Timed here, recorded by the main thread (the StateDB connection is not shared)
+                started = time.time()
+                try:
+                    with_retries(_diarize, attempts=3, base_sleep=2.0, jitter=1.0, retry_name="diarization",
+                                 cancel=diar_cancel)
+                except Exception:
+                    diar_run["failed"] = True
+                    raise
+                finally:
+                    diar_run.update(started=started, seconds=time.time() - started)
+            diar_started_here = True
+            if stage_pool is not None:
+                diar_future = stage_pool.submit(_diarize_with_retries)
+
+            # Stage: asr
+            stage = clock.enter(f"asr_{asr_backend.name}")
+            clock.note(audio_s=audio_s)
+            if args.asr_chunk_s > 0 and audio_s > args.asr_chunk_s * 1.5:
+                segments = transcribe_chunked(
+                    asr_backend.transcribe,
+                    load_audio_array(audio),
+                    asr_chunks_dir / vid,
+                    model=whisper_model,
+                    chunk_s=float(args.asr_chunk_s),
+                    workers=args.asr_chunk_workers,
+                    should_stop=lambda: stop.stop,
+                )
+            else:
+                segments = normalize_asr_segments(asr_backend.transcribe(audio))
+            save_raw_asr(raw_asr_dir / f"{vid}.json.gz", vid=vid, model=whisper_model, segments=segments)
+            kept, cutoff, transcript_text = postprocess_segments(
+                segments,
+                outro_window_s=float(args.outro_window_s),
+                hallucination_ratio=args.hallucination_ratio,
+            )
+
+            # Stage: diarization (join the background run, or run it now)
+            # ("diarization" is the wait in the main loop; "diarization_run" the actual compute time)
+            stage = clock.enter("diarization")
+            if diar_future is not None:
+                diar_future.result()
+            else:
+                _diarize_with_retries()
 
             # Stage: write_json
-            stage = "write_json"
+            stage = clock.enter("write_json")
+            heartbeat.check(db)
             source_url = (info.get("webpage_url") if isinstance(info, dict) else None) or video_url
             diar_rel = str(out_rttm.relative_to(out_dir))
             payload = {
@@ -694,31 +3033,62 @@ def main():
                     "status": "ok",
                     "diarization_rttm_path": diar_rel,
                     "outro_cutoff_seconds": cutoff,
-                    "whisper_model": args.whisper_model,
+                    "whisper_model": whisper_model,
                 },
                 "transcript_text": transcript_text,
                 "segments": kept,
             }
-            atomic_write_text(out_json, json.dumps(payload, ensure_ascii=False, indent=2))
+            write_transcript(json_dir, vid, payload, args.transcript_format)
 
             seconds = time.time() - t0
             words = word_count(transcript_text)
+            if fingerprint is not None:
+                db.add_fingerprints(vid, *fingerprint)
             db.mark_ok(vid, seconds=seconds, words=words)
-            append_jsonl(events_jsonl, {
+            completed = True
+            shutil.rmtree(asr_chunks_dir / vid, ignore_errors=True)
+            clock.close()
+            metrics.video_done("ok", seconds=seconds, audio_s=audio_s)
+            events.emit({
                 "ts": now_utc_iso(),
                 "video_id": vid,
                 "event": "ok",
                 "seconds": round(seconds, 3),
-                "words": words
+                "words": words,
+                "audio_seconds": round(audio_s, 3) if audio_s else None,
             })
             ok_count += 1
             done_count += 1
             last_durations.append(seconds)
 
+        except LeaseLost as e:
+            # Not a failure either: the video now belongs to another worker, whose outputs we must not touch
+            clock.close(interrupted=True)
+            metrics.video_done("lease_lost")
+            log_event("warn", f"{e}.", video_id=vid, event="lease_lost")
+            skip_count += 1
+            done_count += 1
+
+        except ASRInterrupted as e:
+            # Not a failure: hand the video back; the next claim resumes from the checkpoints
+            clock.close(interrupted=True)
+            db.release(vid, worker_id)
+            log_event("warn", f"ASR interrupted for {vid} ({e}); checkpoints kept.", video_id=vid)
+            raise SystemExit("Stop requested")
+
         except Exception as e:
             seconds = time.time() - t0
             msg = f"{type(e).__name__}: {e}"
+            if heartbeat.lost:
+                # Another worker owns the video now: don't overwrite its status or outputs
+                clock.close(failed=True)
+                log_event("warn", f"{vid} failed after its lease was lost: {msg}", video_id=vid, event="lease_lost")
+                skip_count += 1
+                done_count += 1
+                return
             db.mark_failed(vid, stage=stage, error=msg)
+            clock.close(failed=True)
+            metrics.video_done("failed", seconds=seconds, failed_stage=stage)
             fail_payload = {
                 "metadata": {
                     "video_id": vid,
@@ -730,24 +3100,82 @@ def main():
                 "failure": {"message": tail(msg, 2000)},
             }
             with contextlib.suppress(Exception):
-                atomic_write_text(out_json, json.dumps(fail_payload, ensure_ascii=False, indent=2))
+                write_transcript(json_dir, vid, fail_payload, args.transcript_format)
             with errors_log.open("a", encoding="utf-8") as f:
                 f.write(f"[{now_utc_iso()}] {vid} {video_url}\nSTAGE={stage}\n{msg}\n\n")
             fail_count += 1
             done_count += 1
             last_durations.append(seconds)
             if args.fail_fast:
+                events.flush()
                 raise
 
         finally:
+            if diar_future is not None and not diar_future.done():
+                # ASR failed first: drop diarization if it hasn't started, else stop it after the
+                # running attempt (no retries) and wait for that attempt before its audio is removed
+                diar_cancel.set()
+                if not diar_future.cancel():
+                    with contextlib.suppress(Exception):
+                        diar_future.result()
+            if diar_run:
+                clock.record("diarization_run", diar_run["seconds"], started=diar_run["started"], audio_s=audio_s,
+                             failed=diar_run.get("failed", False) and not diar_cancel.is_set(),
+                             interrupted=diar_run.get("failed", False) and diar_cancel.is_set())
+            if diar_started_here and not completed and not heartbeat.lost:
+                # An RTTM without its transcript would make the video look half done: remove it
+                # (a lost lease means the RTTM is the other worker's)
+                remove_output_variants(rttm_dir, vid, RTTM_SUFFIXES + (".rttm.tmp",), keep=None)
+            if cache:
+                cache.release(vid)
+            heartbeat.stop()
+            clock.close()
+            metrics.set_queue(db.queue_depths(shard=shard))
             if not args.keep_temp:
                 shutil.rmtree(work, ignore_errors=True)
             gc.collect()
-            if torch.cuda.is_available():
-                torch.cuda.empty_cache()
-            if torch.backends.mps.is_available():
-                torch.mps.empty_cache()
-            time.sleep(max(0.05, args.sleep_s + random.random() * args.sleep_jitter_s))
+            diar_backend.release_memory()
+            if throttle:
+                throttle.pause()
+            else:
+                time.sleep(max(0.05, args.sleep_s + random.random() * args.sleep_jitter_s))
+
+    def refresh_manifest_due() -> bool:
+        return args.manifest_refresh_min > 0 and time.time() - last_manifest_refresh >= args.manifest_refresh_min * 60
+
+    def claimed_videos() -> Iterator[str]:
+        """
+        Claim videos from the shared queue until nothing is left for this worker.
+        With --manifest-refresh-min the playlist is re-read periodically, so new uploads
+        are queued (and, under --schedule newest, claimed next) without a restart.
+        """
+        nonlocal total, last_manifest_refresh
+        while not stop.stop:
+            if refresh_manifest_due():
+                try:
+                    total = register_manifest(build_manifest())
+                except Exception as e:
+                    log_event("warn", f"Manifest refresh failed: {type(e).__name__}: {e}")
+                last_manifest_refresh = time.time()
+            vid = db.claim_next(
+                worker_id,
+                lease_s=args.lease_s,
+                retry_failed_before=run_started if args.retry_failed else None,
+                shard=shard,
+            )
+            if vid is not None:
+                yield vid
+                continue
+            expiry = db.next_lease_expiry(shard=shard)
+            if expiry is None:
+                if not (args.drain and args.manifest_refresh_min > 0):
+                    return
+                # Follow mode: idle until the next playlist refresh
+                expiry = last_manifest_refresh + args.manifest_refresh_min * 60
+            if not args.drain:
+                log_event("info", "Remaining videos are leased by other workers; exiting (use --drain to wait).")
+                return
+            time.sleep(min(max(1.0, expiry - time.time()), 30.0))
 
     # Run with progress
     if use_rich and console:
@@ -762,57 +3190,54 @@ def main():
             transient=False,
             console=console,
         ) as prog:
-            task = prog.add_task("[green]Processing playlist", total=total)
-            with manifest.open("r", encoding="utf-8") as f:
-                for idx, line in enumerate(f, start=1):
-                    if args.limit and idx > args.limit:
-                        break
-                    vid = line.strip()
-                    if not vid:
-                        prog.update(task, advance=1)
-                        continue
-
-                    avg = (sum(last_durations) / len(last_durations)) if last_durations else 0.0
-                    remaining = max(0, total - done_count)
-                    vpm = (ok_count / ((time.time() - t_global) / 60.0)) if (time.time() - t_global) > 0 else 0.0
-                    prog.update(
-                        task,
-                        description=f"[green]✓{ok_count} [red]✗{fail_count} [yellow]↷{skip_count} [cyan]avg={avg:.1f}s [magenta]{vpm:.1f}vid/min",
-                    )
-
-                    try:
-                        process_one(vid, idx)
-                    except SystemExit:
-                        log_event("warn", "Stop requested. Exiting after current progress.")
-                        break
-                    prog.update(task, advance=1)
-                    if stop.stop:
-                        log_event("warn", "Stop flag set. Stopping loop.")
-                        break
-    else:
-        # plain mode
-        with manifest.open("r", encoding="utf-8") as f:
-            for idx, line in enumerate(f, start=1):
-                if args.limit and idx > args.limit:
-                    break
-                vid = line.strip()
-                if not vid:
-                    continue
+            task = prog.add_task("[green]Processing playlist", total=total, completed=done_count)
+            for vid in claimed_videos():
                 avg = (sum(last_durations) / len(last_durations)) if last_durations else 0.0
-                LOG.info("[%d/%d] vid=%s ok=%d fail=%d skip=%d avg=%.1fs",
-                         idx, total, vid, ok_count, fail_count, skip_count, avg)
+                remaining = max(0, total - done_count)
+                vpm = (ok_count / ((time.time() - t_global) / 60.0)) if (time.time() - t_global) > 0 else 0.0
+                prog.update(
+                    task,
+                    total=total,
+                    description=f"[green]✓{ok_count} [red]✗{fail_count} [yellow]↷{skip_count} [cyan]avg={avg:.1f}s [magenta]{vpm:.1f}vid/min",
+                )
+
                 try:
-                    process_one(vid, idx)
+                    process_one(vid, done_count + 1)
                 except SystemExit:
-                    LOG.warning("Stop requested. Exiting.")
+                    log_event("warn", "Stop requested. Exiting after current progress.")
                     break
+                prog.update(task, completed=done_count)
                 if stop.stop:
-                    LOG.warning("Stop flag set. Stopping loop.")
+                    log_event("warn", "Stop flag set. Stopping loop.")
                     break
+    else:
+        # plain mode
+        for vid in claimed_videos():
+            avg = (sum(last_durations) / len(last_durations)) if last_durations else 0.0
+            LOG.info("[%d/%d] vid=%s ok=%d fail=%d skip=%d avg=%.1fs",
+                     done_count + 1, total, vid, ok_count, fail_count, skip_count, avg)
+            try:
+                process_one(vid, done_count + 1)
+            except SystemExit:
+                LOG.warning("Stop requested. Exiting.")
+                break
+            if stop.stop:
+                LOG.warning("Stop flag set. Stopping loop.")
+                break
 
     elapsed = time.time() - t_global
     LOG.info("✅ Finished. ok=%d fail=%d skip=%d total_done=%d elapsed=%.1fs",
              ok_count, fail_count, skip_count, done_count, elapsed)
+    if cache:
+        cache_stats = cache.summary()
+        for fmt, st in cache_stats.items():
+            LOG.info("   cache[%s]: hits=%d misses=%d hit_rate=%.0f%%", fmt, st["hits"], st["misses"], st["hit_rate"] * 100)
+        events.emit({"ts": now_utc_iso(), "event": "cache_summary", "cache": cache_stats})
+    if stage_pool is not None:
+        stage_pool.shutdown(wait=True)
+    if exporter is not None:
+        exporter.stop()
+    events.close()
     db.close()
 
 
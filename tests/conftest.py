@@ -0,0 +1,52 @@
+"""Shared builders for synthetic transcripts and diarization."""
+
+from typing import List, Optional, Tuple
+
+import pytest
+
+from aggregation.models.raw_data import BPKMetadata, BPKTranscript, RTTMEntry, Segment
+
+
+def build_transcript(
+    video_id: str,
+    segments: List[Tuple[float, float, str]],
+    publish_date=None,
+    duration: Optional[float] = None,
+) -> BPKTranscript:
+    segs = [Segment(start=s, end=e, text=t) for s, e, t in segments]
+    text = " ".join(s.text for s in segs)
+    return BPKTranscript(
+        metadata=BPKMetadata(
+            video_id=video_id,
+            source_url=f"https://www.youtube.com/watch?v={video_id}",
+            original_title=f"BPK {video_id}",
+            author="Tilo Jung",
+            publish_date=publish_date,
+            video_length_seconds=duration if duration is not None else (segs[-1].end if segs else 0.0),
+            word_count=len(text.split()),
+            status="ok",
+            diarization_rttm_path=None,
+            outro_cutoff_seconds=None,
+            whisper_model="test",
+            retrieval_timestamp_utc="2024-01-01T00:00:00+00:00",
+        ),
+        transcript_text=text,
+        segments=segs,
+    )
+
+
+def build_rttm(video_id: str, turns: List[Tuple[float, float, str]]) -> List[RTTMEntry]:
+    return [
+        RTTMEntry(file_id=video_id, channel=1, start=s, duration=e - s, speaker_id=spk)
+        for s, e, spk in turns
+    ]
+
+
+@pytest.fixture
+def transcript_factory():
+    return build_transcript
+
+
+@pytest.fixture
+def rttm_factory():
+    return build_rttm
@@ -0,0 +1,44 @@
+import os
+
+import bpk_playlist_pipeline as bpk
+
+
+def _put(cache, tmp_path, vid, fmt, nbytes):
+    src = tmp_path / f"{vid}.{fmt}.bin"
+    src.write_bytes(b"x" * nbytes)
+    return cache.put(vid, fmt, src)
+
+
+def test_get_returns_pinned_entry(tmp_path):
+    cache = bpk.AudioCache(tmp_path / "cache", max_bytes=1000)
+    entry = _put(cache, tmp_path, "a", "16k", 10)
+    cache.release("a")
+    assert not cache.pinned(entry)
+    assert cache.get("a", "16k") == entry
+    assert cache.pinned(entry)
+    assert cache.get("a", "src") is None
+
+
+def test_evict_skips_entries_pinned_by_another_worker(tmp_path):
+    root = tmp_path / "cache"
+    worker_a = bpk.AudioCache(root, max_bytes=150)
+    worker_b = bpk.AudioCache(root, max_bytes=150)
+    worker_b.owner = "otherhost-1"  # a live worker on another machine
+    in_use = _put(worker_a, tmp_path, "a", "16k", 100)
+    os.utime(in_use, (1, 1))  # least recently used
+    _put(worker_b, tmp_path, "b", "16k", 100)
+    assert in_use.exists()
+
+    worker_a.release("a")
+    _put(worker_b, tmp_path, "c", "16k", 10)
+    assert not in_use.exists()
+    assert not list(in_use.parent.parent.glob("a/*"))
+
+
+def test_pins_of_dead_processes_are_ignored(tmp_path):
+    cache = bpk.AudioCache(tmp_path / "cache", max_bytes=1000)
+    entry = _put(cache, tmp_path, "a", "16k", 10)
+    cache.release("a")
+    # A local pid that cannot exist
+    entry.with_name(f"{entry.name}.{cache.owner.rpartition('-')[0]}-999999999.pin").touch()
+    assert not cache.pinned(entry)
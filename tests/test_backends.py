@@ -0,0 +1,54 @@
+import argparse
+import wave
+
+import numpy as np
+
+import bpk_playlist_pipeline as bpk
+
+
+def _args(**overrides):
+    args = dict(whisper_model=None, diarization_device=None, clustering_threshold=None, cpu_threads=2,
+                cpu_compute_type="int8", asr_batch_size=8, language=None, asr_chunk_workers=1)
+    args.update(overrides)
+    return argparse.Namespace(**args)
+
+
+def _wav(path, seconds):
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(bpk.SAMPLE_RATE)
+        w.writeframes(b"\0\0" * int(seconds * bpk.SAMPLE_RATE))
+    return path
+
+
+def test_stub_asr_is_deterministic_for_arrays_and_wavs(tmp_path):
+    asr, _ = bpk.make_backends("stub", _args())
+    array = np.zeros(int(12 * bpk.SAMPLE_RATE), dtype=np.float32)
+    segments = asr.transcribe(array)
+    assert segments == [
+        {"start": 0.0, "end": 5.0, "text": "Segment 1."},
+        {"start": 5.0, "end": 10.0, "text": "Segment 2."},
+    ]
+    assert asr.transcribe(_wav(tmp_path / "a.wav", 12)) == segments
+
+
+def test_stub_diarizer_writes_alternating_speakers(tmp_path):
+    _, diarizer = bpk.make_backends("stub", _args())
+    out = tmp_path / "rttm" / "vid.rttm"
+    diarizer.diarize(np.zeros(int(25 * bpk.SAMPLE_RATE), dtype=np.float32), out,
+                     min_speakers=2, max_speakers=4, uri="vid.16k")
+    rows = [line.split() for line in out.read_text().splitlines()]
+    assert [(float(r[3]), float(r[4]), r[7]) for r in rows] == [
+        (0.0, 10.0, "SPEAKER_00"), (10.0, 10.0, "SPEAKER_01"), (20.0, 5.0, "SPEAKER_00"),
+    ]
+    assert {r[1] for r in rows} == {"vid.16k"}
+
+
+def test_language_is_passed_to_every_whisper_backend():
+    mlx_asr, _ = bpk.make_backends("mlx", _args(language="de"))
+    cpu_asr, _ = bpk.make_backends("cpu", _args(language="de"))
+    assert mlx_asr.language == cpu_asr.language == "de"
+    mlx_asr, _ = bpk.make_backends("mlx", _args())
+    cpu_asr, _ = bpk.make_backends("cpu", _args())
+    assert mlx_asr.language is cpu_asr.language is None
@@ -0,0 +1,89 @@
+import argparse
+import json
+import threading
+
+import numpy as np
+import pytest
+
+import bpk_playlist_pipeline as bpk
+
+SR = bpk.SAMPLE_RATE
+
+
+@pytest.fixture
+def samples():
+    """Two minutes of noise with a silent gap every 20 s (the chunk cut points)."""
+    audio = (np.random.default_rng(3).standard_normal(120 * SR) * 0.1).astype(np.float32)
+    for t in range(20, 120, 20):
+        audio[(t - 1) * SR:t * SR] = 0.0
+    return audio
+
+
+class CountingASR(bpk.StubASR):
+    def __init__(self):
+        super().__init__(step_s=5.0)
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def transcribe(self, audio):
+        with self._lock:
+            self.calls += 1
+        return super().transcribe(audio)
+
+
+def _run(asr, samples, ckpt_dir, *, model="stub", chunk_s=20.0, workers=1):
+    return bpk.transcribe_chunked(asr.transcribe, samples, ckpt_dir, model=model, chunk_s=chunk_s, workers=workers)
+
+
+def test_chunks_are_stitched_in_absolute_time(tmp_path, samples):
+    asr = CountingASR()
+    segments = _run(asr, samples, tmp_path / "ckpt")
+    plan = json.loads((tmp_path / "ckpt" / "plan.json").read_text())
+    assert asr.calls == len(plan["chunks"]) > 1
+    starts = [s["start"] for s in segments]
+    assert starts == sorted(starts) and segments[-1]["end"] <= 120.0
+    # Concurrent chunk workers give the same transcript
+    assert _run(CountingASR(), samples, tmp_path / "ckpt2", workers=3) == segments
+
+
+def test_resume_transcribes_only_missing_chunks(tmp_path, samples):
+    ckpt = tmp_path / "ckpt"
+    expected = _run(CountingASR(), samples, ckpt)
+    n_chunks = len(json.loads((ckpt / "plan.json").read_text())["chunks"])
+    (ckpt / "chunk_0001.json").unlink()
+    (ckpt / "chunk_0003.json").unlink()
+    asr = CountingASR()
+    assert _run(asr, samples, ckpt) == expected
+    assert asr.calls == 2 < n_chunks
+
+
+def test_interrupt_keeps_finished_chunks(tmp_path, samples):
+    ckpt = tmp_path / "ckpt"
+    done = []
+    with pytest.raises(bpk.ASRInterrupted):
+        bpk.transcribe_chunked(CountingASR().transcribe, samples, ckpt, model="stub", chunk_s=20.0,
+                               should_stop=lambda: len(done) >= 2 or done.append(1))
+    assert len(list(ckpt.glob("chunk_*.json"))) == 2
+
+
+@pytest.mark.parametrize("change", [{"model": "other"}, {"chunk_s": 30.0}])
+def test_plan_is_invalidated_when_model_or_chunk_size_changes(tmp_path, samples, change):
+    ckpt = tmp_path / "ckpt"
+    _run(CountingASR(), samples, ckpt)
+    stale = ckpt / "chunk_0000.json"
+    stale.write_text(json.dumps([{"start": 0.0, "end": 1.0, "text": "stale"}]))
+    asr = CountingASR()
+    segments = _run(asr, samples, ckpt, **change)
+    plan = json.loads((ckpt / "plan.json").read_text())
+    assert asr.calls == len(plan["chunks"])
+    assert plan["model"] == change.get("model", "stub") and plan["chunk_s"] == change.get("chunk_s", 20.0)
+    assert "stale" not in {s["text"] for s in segments}
+
+
+def test_chunk_workers_get_model_replicas_on_cpu_but_not_on_mlx():
+    args = argparse.Namespace(whisper_model=None, diarization_device=None, clustering_threshold=None, cpu_threads=2,
+                              cpu_compute_type="int8", asr_batch_size=8, language=None, asr_chunk_workers=3)
+    cpu_asr, _ = bpk.make_backends("cpu", args)
+    assert cpu_asr.thread_safe and cpu_asr.num_workers == 3
+    mlx_asr, _ = bpk.make_backends("mlx", args)
+    assert not mlx_asr.thread_safe
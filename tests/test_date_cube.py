@@ -0,0 +1,40 @@
+import json
+
+import numpy as np
+
+from aggregation.cube import DateCube
+from aggregation.sketches import HyperLogLog
+
+
+def _rows():
+    rows = []
+    for i, day in enumerate(["2024-01-02", "2024-01-02", "2024-02-10", "2024-03-01"]):
+        sketch = HyperLogLog()
+        sketch.update({f"name{j}" for j in range(i * 50, i * 50 + 100)})
+        rows.append((day, {"bpk_count": 1, "words": 100 * (i + 1)}, {"persons": sketch}))
+    return rows
+
+
+def test_range_totals_and_distinct():
+    cube = DateCube.build(_rows())
+    assert cube.totals("2024-01-01", "2024-01-31") == {"bpk_count": 2.0, "words": 300.0}
+    assert cube.totals("2024-02-01") == {"bpk_count": 2.0, "words": 700.0}
+    assert cube.totals("2025-01-01")["bpk_count"] == 0.0
+    # name0..name249 over all days
+    assert abs(cube.distinct()["persons"] - 250) <= 250 * 0.1
+
+
+def test_save_swaps_versions(tmp_path):
+    cube = DateCube.build(_rows())
+    cube.save(tmp_path)
+    first = json.loads((tmp_path / "meta.json").read_text())["version"]
+    cube.save(tmp_path)
+    cube.save(tmp_path)
+    meta = json.loads((tmp_path / "meta.json").read_text())
+    versions = sorted(p.name for p in tmp_path.iterdir() if p.is_dir())
+    assert meta["version"] in versions and first not in versions
+    assert len(versions) == 2
+
+    loaded = DateCube.load(tmp_path)
+    np.testing.assert_array_equal(loaded.prefix, cube.prefix)
+    assert loaded.query() == cube.query()
@@ -0,0 +1,85 @@
+import io
+from types import SimpleNamespace
+
+import pytest
+
+import bpk_playlist_pipeline as bpk
+
+
+class FakeAnnotation:
+    def __init__(self, tracks):
+        self.tracks = tracks
+
+    def itertracks(self, yield_label=False):
+        for i, (start, end, label) in enumerate(self.tracks):
+            yield SimpleNamespace(start=start, end=end), i, label
+
+    def labels(self):
+        return sorted({label for _, _, label in self.tracks})
+
+    def write_rttm(self, f: io.TextIOBase):
+        for start, end, label in self.tracks:
+            f.write(f"SPEAKER vid 1 {start:.3f} {end - start:.3f} <NA> <NA> {label} <NA> <NA>\n")
+
+
+STOCK = [(0.0, 10.0, "SPEAKER_00"), (10.0, 20.0, "SPEAKER_01")]
+
+
+class FakePipeline:
+    """Only the public pipeline(file) API, like a pyannote version without the array internals."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def apply(self, file, min_speakers=None, max_speakers=None):
+        self.calls += 1
+        return FakeAnnotation(STOCK)
+
+    __call__ = apply
+
+
+def _diarizer(tmp_path, pipeline):
+    diarizer = bpk.PyannoteDiarizer("cpu", arrays_dir=tmp_path / "arrays")
+    diarizer.pipeline = pipeline
+    diarizer._arrays_ok = True if bpk.diarization_arrays_supported(pipeline) else None
+    return diarizer
+
+
+def test_agreement_ignores_label_names():
+    relabeled = [(s, e, {"SPEAKER_00": "B", "SPEAKER_01": "A"}[label]) for s, e, label in STOCK]
+    assert bpk.diarization_agreement(STOCK, relabeled) == 1.0
+    merged = [(0.0, 20.0, "SPEAKER_00")]
+    assert bpk.diarization_agreement(STOCK, merged) == pytest.approx(0.5)
+    assert bpk.diarization_agreement([], []) == 1.0
+
+
+def test_missing_internals_fall_back_to_pipeline(tmp_path):
+    pipeline = FakePipeline()
+    diarizer = _diarizer(tmp_path, pipeline)
+    out = tmp_path / "rttm" / "vid.rttm"
+    diarizer.diarize(tmp_path / "vid.wav", out, min_speakers=2, max_speakers=4, uri="vid", video_id="vid")
+    assert pipeline.calls == 1
+    assert len(out.read_text().splitlines()) == 2
+    assert not (tmp_path / "arrays").exists()
+    assert diarizer._arrays_ok is False
+
+
+@pytest.mark.parametrize("array_tracks, arrays_kept", [
+    (STOCK, True),
+    ([(0.0, 20.0, "SPEAKER_00")], False),
+])
+def test_array_path_is_checked_against_pipeline(tmp_path, monkeypatch, array_tracks, arrays_kept):
+    pipeline = FakePipeline()
+    saved = []
+    monkeypatch.setattr(bpk, "diarization_arrays_supported", lambda p: True)
+    monkeypatch.setattr(bpk, "extract_diarization_arrays", lambda p, f: {"uri": "vid"})
+    monkeypatch.setattr(bpk, "recluster_arrays", lambda p, a, **kw: (FakeAnnotation(array_tracks), None))
+    monkeypatch.setattr(bpk, "save_diarization_arrays", lambda path, arrays: saved.append(path))
+    diarizer = _diarizer(tmp_path, pipeline)
+    for vid in ("v1", "v2"):
+        out = tmp_path / "rttm" / f"{vid}.rttm"
+        diarizer.diarize(tmp_path / f"{vid}.wav", out, min_speakers=2, max_speakers=4, uri=vid, video_id=vid)
+        assert len(out.read_text().splitlines()) == 2  # the stock result whenever the arrays disagree
+    assert [p.stem for p in saved] == (["v1", "v2"] if arrays_kept else [])
+    # One parity run on the first video; after a mismatch every video goes through pipeline(file)
+    assert pipeline.calls == (1 if arrays_kept else 2)
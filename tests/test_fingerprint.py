@@ -0,0 +1,66 @@
+import wave
+
+import numpy as np
+import pytest
+
+import bpk_playlist_pipeline as bpk
+
+SR = bpk.SAMPLE_RATE
+
+
+@pytest.fixture(scope="module")
+def full_audio():
+    """Five minutes of deterministic, speech-band-ish audio."""
+    rng = np.random.default_rng(7)
+    return (rng.standard_normal(300 * SR) * 0.1).astype(np.float32)
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = bpk.StateDB(tmp_path / "state.db")
+    yield db
+    db.close()
+
+
+def _store(db, vid, samples):
+    db.add_fingerprints(vid, *bpk.audio_fingerprint(samples))
+
+
+def _match(db, vid, samples):
+    hashes, times = bpk.audio_fingerprint(samples)
+    return bpk.match_fingerprint(db, hashes, times, exclude=vid, duration_s=len(samples) / SR)
+
+
+def test_reupload_matches_itself(db, full_audio):
+    _store(db, "full", full_audio)
+    match = _match(db, "reupload", full_audio)
+    assert match["video_id"] == "full"
+    assert match["offset_s"] == 0.0
+    assert match["score"] > 0.9
+
+
+def test_excerpt_of_a_stored_video_is_an_alias(db, full_audio):
+    _store(db, "full", full_audio)
+    clip = full_audio[60 * SR:150 * SR]
+    match = _match(db, "clip", clip)
+    assert match["video_id"] == "full"
+    assert match["offset_s"] == 60.0
+
+
+def test_full_video_is_not_an_alias_of_its_excerpt(db, full_audio):
+    _store(db, "clip", full_audio[60 * SR:150 * SR])
+    assert _match(db, "full", full_audio) is None
+
+
+def test_wav_is_fingerprinted_block_wise_like_the_array(tmp_path, full_audio):
+    pcm = (full_audio[:40 * SR] * 32768).astype(np.int16)
+    path = tmp_path / "a.16k.wav"
+    with wave.open(str(path), "wb") as w:
+        w.setnchannels(1)
+        w.setsampwidth(2)
+        w.setframerate(SR)
+        w.writeframes(pcm.tobytes())
+    expected = bpk.audio_fingerprint(pcm.astype(np.float32) / 32768.0)
+    for block_frames in (97, 4096):
+        hashes, times = bpk.audio_fingerprint(path, block_frames=block_frames)
+        assert np.array_equal(hashes, expected[0]) and np.array_equal(times, expected[1])
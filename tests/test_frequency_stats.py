@@ -0,0 +1,15 @@
+from aggregation.extractors.frequency_stats import FrequencyStatsExtractor
+
+
+def test_total_words_counts_all_tokens(transcript_factory):
+    transcript = transcript_factory("vid", [
+        (0.0, 5.0, "Herr Seibert, eine Frage zur Ukraine."),
+        (5.0, 9.0, "Die Bundesregierung sagt dazu nichts. Die Ukraine bekommt Hilfe."),
+    ])
+    result = FrequencyStatsExtractor().extract([transcript], {})
+    assert result["metadata"]["total_words"] == transcript.total_words == 15
+    # ukraine x2, bundesregierung, bekommt, hilfe, seibert
+    assert result["metadata"]["content_words"] == 6
+    labels = [w["label"] for w in result["top_words"]]
+    assert labels[0] == "ukraine"
+    assert not {"herr", "frage", "sagt"} & set(labels)
@@ -0,0 +1,25 @@
+import numpy as np
+import pytest
+
+from aggregation.sketches import HyperLogLog
+
+
+@pytest.mark.parametrize("n", [10, 1000, 50000])
+def test_hyperloglog_error(n):
+    sketch = HyperLogLog(12)
+    sketch.update(f"item{i}" for i in range(n))
+    sketch.update(f"item{i}" for i in range(n // 2))  # duplicates don't count
+    # 4 standard errors
+    assert abs(sketch.count() - n) <= max(1, 4 * sketch.relative_error * n)
+
+
+def test_hyperloglog_merge_is_union():
+    a, b, union = HyperLogLog(), HyperLogLog(), HyperLogLog()
+    a.update(range(0, 30000))
+    b.update(range(20000, 50000))
+    union.update(range(0, 50000))
+    a.merge(b)
+    np.testing.assert_array_equal(a.registers, union.registers)
+    assert abs(a.count() - 50000) <= 4 * a.relative_error * 50000
+    with pytest.raises(ValueError):
+        a.merge(HyperLogLog(10))
@@ -0,0 +1,122 @@
+import numpy as np
+import pytest
+
+from aggregation.identity import CentroidIndex, SpeakerIdentityResolver
+from aggregation.identity.index import normalize_rows
+
+DIM = 32
+
+
+@pytest.fixture
+def people():
+    return normalize_rows(np.random.default_rng(0).normal(size=(6, DIM)))
+
+
+def _video(rng, people, persons, noise=0.15):
+    labels = [f"SPEAKER_{i:02d}" for i in range(len(persons))]
+    centroids = people[persons] + rng.normal(scale=noise / np.sqrt(DIM), size=(len(persons), DIM))
+    return labels, centroids.astype(np.float32)
+
+
+def _corpus(people, n_videos=12, seed=1):
+    rng = np.random.default_rng(seed)
+    embeddings, truth = {}, {}
+    for v in range(n_videos):
+        persons = rng.choice(len(people), size=3, replace=False)
+        labels, centroids = _video(rng, people, persons)
+        embeddings[f"vid{v:02d}"] = (labels, centroids)
+        truth[f"vid{v:02d}"] = dict(zip(labels, persons.tolist()))
+    return embeddings, truth
+
+
+def _assert_consistent(mapping, truth):
+    """Same person <-> same global ID, across all videos."""
+    person_of = {}
+    for video_id, video_map in mapping.items():
+        for label, global_id in video_map.items():
+            assert person_of.setdefault(global_id, truth[video_id][label]) == truth[video_id][label]
+    assert len(person_of) == len(set(person_of.values()))
+
+
+def test_resolver_clusters_synthetic_speakers(people):
+    embeddings, truth = _corpus(people)
+    mapping = SpeakerIdentityResolver(threshold=0.65).resolve(embeddings)
+    _assert_consistent(mapping, truth)
+    assert len({gid for m in mapping.values() for gid in m.values()}) == len(people)
+
+
+def test_same_video_speakers_never_merge(people):
+    rng = np.random.default_rng(2)
+    # Two labels of one person in one video (over-segmented diarization)
+    labels, centroids = _video(rng, people, np.array([0, 0, 1]))
+    mapping = SpeakerIdentityResolver().resolve({"vid": (labels, centroids)})
+    assert len(set(mapping["vid"].values())) == 3
+
+
+def test_mapping_stable_and_changed_centroids_reassigned(tmp_path, people):
+    embeddings, truth = _corpus(people)
+    first = dict(SpeakerIdentityResolver().resolve(embeddings))
+    resolver = SpeakerIdentityResolver()
+    resolver.resolve(embeddings)
+    resolver.save(tmp_path)
+
+    # Re-clustered diarization of vid00: labels now name other persons
+    rng = np.random.default_rng(9)
+    persons = [p for p in range(len(people)) if p not in truth["vid00"].values()][:2]
+    labels, centroids = _video(rng, people, np.array(persons))
+    embeddings["vid00"] = (labels, centroids)
+    truth["vid00"] = dict(zip(labels, persons))
+
+    reloaded = SpeakerIdentityResolver.load(tmp_path)
+    mapping = reloaded.resolve(embeddings)
+    _assert_consistent(mapping, truth)
+    assert set(mapping["vid00"]) == set(labels)
+    assert all(mapping[vid] == first[vid] for vid in embeddings if vid != "vid00")
+
+
+def test_index_exact_and_ivf_search():
+    rng = np.random.default_rng(4)
+    vectors = normalize_rows(rng.normal(size=(400, DIM)))
+    queries = normalize_rows(vectors[:20] + rng.normal(scale=0.05, size=(20, DIM)))
+
+    exact = CentroidIndex(DIM)
+    ivf = CentroidIndex(DIM, ivf_min_size=100, nprobe=20)
+    for vector in vectors:
+        exact.add(vector)
+        ivf.add(vector)
+
+    sims, rows = exact.search(queries, k=3)
+    assert rows[:, 0].tolist() == list(range(20))
+    np.testing.assert_allclose(sims[:, 0], np.sum(queries * vectors[:20], axis=1), rtol=1e-5)
+    assert np.all(np.diff(sims, axis=1) <= 0)
+    # IVF probes a subset of the lists; near-duplicates are still found
+    _, ivf_rows = ivf.search(queries, k=1)
+    assert np.mean(ivf_rows[:, 0] == np.arange(20)) >= 0.9
+
+    exact.update(0, vectors[1])
+    assert set(exact.search(vectors[1], k=2)[1][0]) == {0, 1}
+    assert exact.search(np.zeros((0, DIM)))[1].shape == (0, 5)
+
+
+@pytest.mark.parametrize("damage", ["truncate", "delete"])
+def test_sums_out_of_step_with_mapping_are_rebuilt(tmp_path, people, damage):
+    embeddings, truth = _corpus(people)
+    resolver = SpeakerIdentityResolver()
+    resolver.resolve(embeddings)
+    resolver.save(tmp_path)
+    # A crash between the two files: the mapping names more identities than the sums hold
+    sums_path = tmp_path / SpeakerIdentityResolver.CENTROIDS_FILE
+    if damage == "truncate":
+        np.save(sums_path, np.load(sums_path)[:-2])
+    else:
+        sums_path.unlink()
+
+    rng = np.random.default_rng(9)
+    labels, centroids = _video(rng, people, np.array([0, 3, 5]))
+    embeddings["new"] = (labels, centroids)
+    truth["new"] = dict(zip(labels, [0, 3, 5]))
+    reloaded = SpeakerIdentityResolver.load(tmp_path)
+    mapping = reloaded.resolve(embeddings)
+    _assert_consistent(mapping, truth)
+    assert reloaded.identity_count == len(people)
+    assert len(reloaded._sums) == reloaded.identity_count
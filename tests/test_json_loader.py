@@ -0,0 +1,20 @@
+import json
+
+from aggregation.loaders.json_loader import JSONLoader
+
+
+def _write(path, video_id, **meta):
+    payload = {
+        "metadata": {"video_id": video_id, "status": "ok", "word_count": 2, **meta},
+        "transcript_text": "Guten Tag",
+        "segments": [{"start": 0.0, "end": 1.0, "text": "Guten Tag"}],
+    }
+    path.write_text(json.dumps(payload), encoding="utf-8")
+
+
+def test_aliases_are_skipped(tmp_path):
+    _write(tmp_path / "canon.json", "canon")
+    _write(tmp_path / "reup.json", "reup", alias_of="canon", alias_offset_seconds=3.0)
+    loader = JSONLoader(tmp_path)
+    assert [t.video_id for t in loader.load_all()] == ["canon"]
+    assert loader.aliases == {"reup": "canon"}
@@ -0,0 +1,16 @@
+import bpk_playlist_pipeline as bpk
+
+
+def test_diarization_run_has_its_own_metrics():
+    metrics = bpk.Metrics("w1")
+    clock = bpk.StageClock([metrics.observe_stage])
+    clock.record("diarization", 2.0, audio_s=100.0)
+    clock.record("diarization_run", 30.0, audio_s=100.0)
+    clock.record("diarization_run", 5.0, audio_s=100.0, failed=True)
+    text = metrics.render()
+    assert 'bpk_stage_duration_seconds_count{worker="w1",stage="diarization"} 1' in text
+    assert 'stage="diarization_run"' not in text
+    assert 'bpk_diarization_run_seconds_count{worker="w1"} 2' in text
+    assert 'bpk_diarization_run_seconds_sum{worker="w1"} 35' in text
+    # The failed run does not overwrite the realtime factor of the successful one
+    assert 'bpk_diarization_run_realtime_factor{worker="w1"} 0.3' in text
@@ -0,0 +1,110 @@
+import time
+
+import pytest
+
+import bpk_playlist_pipeline as bpk
+
+
+@pytest.fixture
+def db(tmp_path):
+    db = bpk.StateDB(tmp_path / "state.db")
+    db.enqueue(["vid1"])
+    yield db
+    db.close()
+
+
+def test_lease_check_renews_own_lease(db):
+    assert db.claim_next("a", lease_s=60) == "vid1"
+    heartbeat = bpk.LeaseHeartbeat(db.path, "vid1", "a", lease_s=60)
+    heartbeat.check(db)
+    assert not heartbeat.lost
+
+
+def test_lease_check_raises_after_reclaim(db):
+    assert db.claim_next("a", lease_s=0.01) == "vid1"
+    time.sleep(0.05)
+    assert db.claim_next("b", lease_s=60) == "vid1"
+    heartbeat = bpk.LeaseHeartbeat(db.path, "vid1", "a", lease_s=60)
+    with pytest.raises(bpk.LeaseLost):
+        heartbeat.check(db)
+    assert heartbeat.lost
+
+
+def test_state_dir_inside_out_dir_is_refused(tmp_path, monkeypatch):
+    out_dir = tmp_path / "public" / "data"
+    monkeypatch.setattr("sys.argv", ["bpk", "--out-dir", str(out_dir), "--state-dir", str(out_dir / ".state"),
+                                     "--report"])
+    with pytest.raises(SystemExit, match="inside --out-dir"):
+        bpk.main()
+    assert not (out_dir / ".state").exists()
+
+
+def _queue(tmp_path, vids, schedule=None):
+    db = bpk.StateDB(tmp_path / "queue.db")
+    if schedule:
+        db.set_schedule(schedule)
+    db.enqueue(vids)
+    return db
+
+
+def _claim_all(db, **kw):
+    order = []
+    while (vid := db.claim_next("w", lease_s=60, **kw)) is not None:
+        order.append(vid)
+    return order
+
+
+def test_fifo_claims_in_manifest_order(tmp_path):
+    db = _queue(tmp_path, ["c", "a", "b"])
+    assert db.get_schedule() == "fifo"
+    assert _claim_all(db) == ["c", "a", "b"]
+    db.close()
+
+
+def test_newest_claims_latest_publish_first_and_unknown_last(tmp_path):
+    db = _queue(tmp_path, ["old", "unknown", "new", "mid"], schedule="newest")
+    db.set_video_meta([("old", None, 1000.0), ("new", None, 3000.0), ("mid", None, 2000.0)])
+    assert _claim_all(db) == ["new", "mid", "old", "unknown"]
+    db.close()
+
+
+def test_shortest_claims_shortest_first_and_unknown_last(tmp_path):
+    db = _queue(tmp_path, ["long", "unknown", "short"], schedule="shortest")
+    db.set_video_meta([("long", 3600.0, None), ("short", 600.0, None)])
+    assert _claim_all(db) == ["short", "long", "unknown"]
+    db.close()
+
+
+def test_set_schedule_reranks_the_queue(tmp_path):
+    db = _queue(tmp_path, ["a", "b", "c"])
+    db.set_video_meta([("a", 300.0, 1000.0), ("b", 200.0, 3000.0), ("c", 100.0, 2000.0)])
+    db.set_schedule("shortest")
+    assert db.claim_next("w", lease_s=60) == "c"
+    db.set_schedule("newest")
+    assert db.claim_next("w", lease_s=60) == "b"
+    with pytest.raises(ValueError):
+        db.set_schedule("random")
+    db.close()
+
+
+def test_retried_failures_go_last(tmp_path):
+    db = _queue(tmp_path, ["a", "b", "c"], schedule="shortest")
+    db.set_video_meta([("a", 100.0, None), ("b", 200.0, None), ("c", 300.0, None)])
+    assert db.claim_next("w", lease_s=60) == "a"
+    db.mark_failed("a", stage="asr", error="boom")
+    assert _claim_all(db, retry_failed_before="9999") == ["b", "c", "a"]
+    db.close()
+
+
+def test_new_upload_gets_first_seen_and_jumps_ahead_under_newest(tmp_path):
+    db = _queue(tmp_path, ["a", "b"], schedule="newest")
+    db.set_video_meta([("a", None, 1000.0), ("b", None, 2000.0)])
+    first_seen = dict(db.conn.execute("SELECT video_id, first_seen_ts FROM videos"))
+    assert first_seen == {"a": None, "b": None}  # the initial manifest has no "seen later"
+
+    before = time.time()
+    db.enqueue(["fresh", "a", "b"])  # manifest refresh: a new upload without metadata yet
+    fresh_seen = db.conn.execute("SELECT first_seen_ts FROM videos WHERE video_id='fresh'").fetchone()[0]
+    assert fresh_seen >= before
+    assert _claim_all(db) == ["fresh", "b", "a"]
+    db.close()
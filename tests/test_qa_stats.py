@@ -0,0 +1,29 @@
+import pytest
+
+from aggregation.extractors.qa_stats import QAStatsExtractor
+
+
+@pytest.mark.parametrize("text", [
+    "Wer hat diese Entscheidung im Kanzleramt eigentlich getroffen?",
+    "Wer möchte denn die Verantwortung dafür übernehmen, wenn das scheitert?",
+    "Die Lieferungen wurden also im März gestoppt, ist das richtig?",
+    "Haben Sie Fragen zur Umsetzung des Gesetzes an das Ministerium gerichtet?",
+    "Gibt es noch offene Fragen zum Haushalt, die Sie klären müssen?",
+])
+def test_real_questions_are_counted(text):
+    assert QAStatsExtractor.question_count(text) == 1
+
+
+@pytest.mark.parametrize("text", [
+    "Gibt es weitere Fragen dazu?",
+    "Vielen Dank. Gibt es noch weitere Fragen zu dem Komplex?",
+    "Gut. Wer hat noch eine Frage an das Auswärtige Amt?",
+    "Wer möchte eine Nachfrage stellen?",
+])
+def test_moderator_prompts_are_skipped(text):
+    assert QAStatsExtractor.question_count(text) == 0
+
+
+def test_counts_every_question_sentence():
+    text = "Herr Seibert, wann wurde das entschieden? Und wer hat das im Kabinett beschlossen?"
+    assert QAStatsExtractor.question_count(text) == 2
@@ -0,0 +1,36 @@
+import threading
+import time
+
+import pytest
+
+import bpk_playlist_pipeline as bpk
+
+
+def test_with_retries_stops_when_cancelled():
+    cancel = threading.Event()
+    calls = []
+
+    def failing():
+        calls.append(1)
+        cancel.set()
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError):
+        bpk.with_retries(failing, attempts=3, base_sleep=10.0, jitter=0.0, retry_name="test", cancel=cancel)
+    assert len(calls) == 1
+
+
+def test_with_retries_cancel_interrupts_backoff():
+    cancel = threading.Event()
+    calls = []
+
+    def failing():
+        calls.append(1)
+        raise RuntimeError("boom")
+
+    threading.Timer(0.05, cancel.set).start()
+    t0 = time.monotonic()
+    with pytest.raises(RuntimeError):
+        bpk.with_retries(failing, attempts=3, base_sleep=10.0, jitter=0.0, retry_name="test", cancel=cancel)
+    assert len(calls) == 1
+    assert time.monotonic() - t0 < 5
@@ -0,0 +1,50 @@
+import json
+
+import pytest
+
+from aggregation.search import SearchIndex
+
+
+@pytest.fixture
+def corpus(transcript_factory, rttm_factory):
+    transcripts = [
+        transcript_factory("a", [
+            (0.0, 5.0, "Wir liefern Waffen an die Ukraine."),
+            (5.0, 9.0, "Die Ukraine bekommt an diesem Tag keine Lieferung."),
+        ]),
+        transcript_factory("b", [
+            (0.0, 4.0, "Die Lieferungen an die Ukraine wurden gestoppt."),
+            (4.0, 8.0, "Taurus-Lieferung bleibt ausgeschlossen."),
+        ]),
+    ]
+    diarization = {"a": rttm_factory("a", [(0.0, 9.0, "SPEAKER_00")])}
+    return transcripts, diarization
+
+
+def test_phrase_requires_adjacent_terms(tmp_path, corpus):
+    transcripts, diarization = corpus
+    index = SearchIndex(tmp_path)
+    index.update(transcripts, diarization)
+
+    hits = index.search('"an die Ukraine"', k=10)
+    assert {(h["video_id"], h["start"]) for h in hits} == {("a", 0.0), ("b", 0.0)}
+    # Inflection and hyphenated compounds share stems
+    hits = index.search('"Taurus Lieferungen"')
+    assert [(h["video_id"], h["start"]) for h in hits] == [("b", 4.0)]
+    assert index.search('"Ukraine an die"') == []
+    assert [h["speaker"] for h in index.search("Ukraine", video_id="a")] == ["SPEAKER_00"] * 2
+
+
+def test_update_replaces_orphan_segment(tmp_path, corpus, transcript_factory):
+    transcripts, diarization = corpus
+    SearchIndex(tmp_path).update(transcripts[:1], diarization)
+    # Crash after the segment rename but before the manifest save
+    next_segment = json.loads((tmp_path / "manifest.json").read_text())["next_segment"]
+    orphan = tmp_path / f"seg_{next_segment:06d}"
+    orphan.mkdir()
+    (orphan / "meta.json").write_text("{}")
+
+    index = SearchIndex(tmp_path)
+    counts = index.update(transcripts, diarization)
+    assert counts == {"unchanged": 1, "added": 1, "removed": 0}
+    assert [h["video_id"] for h in SearchIndex(tmp_path).search("Taurus")] == ["b"]
@@ -0,0 +1,49 @@
+from collections import Counter
+
+import numpy as np
+
+from aggregation.sketches import SpaceSaving
+
+
+def _zipf_stream(seed, n=20000, vocabulary=2000):
+    return [f"w{x}" for x in np.random.default_rng(seed).zipf(1.3, size=n) % vocabulary]
+
+
+def _assert_bounds(sketch, truth):
+    assert sketch.total == sum(truth.values())
+    assert len(sketch) <= sketch.capacity
+    for item, count in sketch.counts.items():
+        assert count - sketch.errors[item] <= truth[item] <= count
+        assert sketch.errors[item] <= sketch.total / sketch.capacity
+    for item, count in truth.items():
+        if item not in sketch:
+            assert count <= sketch.floor
+
+
+def test_space_saving_stream_bounds():
+    stream = _zipf_stream(0)
+    sketch = SpaceSaving(100)
+    sketch.update(stream)
+    truth = Counter(stream)
+    _assert_bounds(sketch, truth)
+
+    true_top = {item for item, _ in truth.most_common(10)}
+    true_kth = truth.most_common(10)[-1][1]
+    for item, count, error, guaranteed in sketch.top(10):
+        if guaranteed:
+            assert truth[item] >= true_kth
+    assert {item for item, *_ in sketch.top(5)} <= true_top
+
+
+def test_space_saving_merge_bounds():
+    streams = [_zipf_stream(seed, n=5000) for seed in range(6)]
+    merged = SpaceSaving(100)
+    for i, stream in enumerate(streams):
+        if i % 2:
+            part = SpaceSaving.from_counts(Counter(stream), 100)
+        else:
+            part = SpaceSaving(100)
+            part.update(stream)
+        merged.merge(part)
+    _assert_bounds(merged, Counter(item for stream in streams for item in stream))
+    assert SpaceSaving.from_dict(merged.to_dict()).counts == merged.counts
@@ -0,0 +1,100 @@
+from collections import Counter
+
+import numpy as np
+
+from aggregation.config import MIN_INTERRUPTION_OVERLAP_SECONDS
+from aggregation.extractors.speaker_stats import SpeakerStatsExtractor
+from aggregation.models.raw_data import RTTMEntry
+
+
+def _turns(rng, n, speakers):
+    t = 0.0
+    turns = []
+    for _ in range(n):
+        duration = float(rng.uniform(1, 40))
+        turns.append((t, t + duration, str(rng.choice(speakers, p=[0.5, 0.4, 0.1]))))
+        t += duration + float(rng.uniform(0.6, 3))
+    return turns
+
+
+def test_transition_rows_follow_speaker_order(transcript_factory, rttm_factory):
+    rng = np.random.default_rng(7)
+    # First appearance (SPEAKER_02) differs from the speaking-time order
+    turns = [(0.0, 2.0, "SPEAKER_02")] + _turns(rng, 80, ["SPEAKER_00", "SPEAKER_01", "SPEAKER_02"])
+    turns = [(s + 5.0 * (i > 0), e + 5.0 * (i > 0), spk) for i, (s, e, spk) in enumerate(turns)]
+    transcript = transcript_factory("vid", [(s, e, "wort " * 5) for s, e, _ in turns])
+    result = SpeakerStatsExtractor().extract([transcript], {"vid": rttm_factory("vid", turns)})
+
+    bpk = result["per_bpk_analysis"][0]
+    speakers = bpk["speakers"]
+    assert speakers[0]["local_speaker_id"] != "SPEAKER_02"
+    transitions = np.array(bpk["turn_taking"]["transitions"])
+    last_speaker = max(turns, key=lambda t: t[0])[2]
+    for row, speaker in zip(transitions, speakers):
+        expected = speaker["turn_count"] - (speaker["local_speaker_id"] == last_speaker)
+        assert row.sum() == expected
+    assert transitions.sum() == bpk["turn_changes"]
+
+
+def test_bin_intervals_matches_brute_force():
+    rng = np.random.default_rng(3)
+    starts = rng.uniform(0, 600, 200)
+    ends = np.minimum(starts + rng.uniform(0, 150, 200), 600)
+    rows = rng.integers(0, 4, 200)
+    weights = rng.uniform(0.5, 2, 200)
+    bin_seconds, n_bins = 60.0, 10
+
+    matrix = SpeakerStatsExtractor._bin_intervals(starts, ends, rows, weights, 4, n_bins, bin_seconds)
+
+    expected = np.zeros((4, n_bins))
+    for s, e, r, w in zip(starts, ends, rows, weights):
+        for b in range(n_bins):
+            lo = b * bin_seconds
+            hi = lo + bin_seconds
+            expected[r, b] += max(0.0, min(e, hi) - max(s, lo)) * w
+    np.testing.assert_allclose(matrix, expected, atol=1e-9)
+
+
+def test_sweep_overlaps_matches_brute_force():
+    rng = np.random.default_rng(11)
+    speakers = ["SPEAKER_00", "SPEAKER_01", "SPEAKER_02"]
+    starts = rng.uniform(0, 300, 150)
+    durations = rng.exponential(4, 150)
+    durations[::25] = 0.0  # zero-length turns never interrupt
+    entries = [
+        RTTMEntry(file_id="vid", channel=1, start=float(s), duration=float(d), speaker_id=str(rng.choice(speakers)))
+        for s, d in zip(starts, durations)
+    ]
+
+    result = SpeakerStatsExtractor()._sweep_overlaps(entries)
+
+    # Cross-talk: elementary intervals where at least two distinct speakers are active
+    points = sorted({e.start for e in entries} | {e.end for e in entries})
+    overlap_seconds = 0.0
+    for lo, hi in zip(points, points[1:]):
+        mid = (lo + hi) / 2
+        if len({e.speaker_id for e in entries if e.start < mid < e.end}) > 1:
+            overlap_seconds += hi - lo
+    # Every later-starting turn interrupts each other-speaker turn still running at its start
+    interruptions, successful, pair_overlap = Counter(), Counter(), Counter()
+    below_cutoff = 0
+    for a in entries:
+        for b in entries:
+            if a.speaker_id == b.speaker_id or b.duration <= 0 or not a.start < b.start < a.end:
+                continue
+            shared = min(a.end, b.end) - b.start
+            pair = (b.speaker_id, a.speaker_id)
+            pair_overlap[pair] += shared
+            if shared >= MIN_INTERRUPTION_OVERLAP_SECONDS:
+                interruptions[pair] += 1
+                successful[pair] += a.end < b.end
+            else:
+                below_cutoff += 1
+    assert below_cutoff and sum(interruptions.values())
+
+    assert np.isclose(result["overlap_seconds"], overlap_seconds)
+    assert result["interruptions"] == interruptions
+    assert result["successful"] == +successful
+    assert set(result["pair_overlap"]) == set(pair_overlap)
+    for pair, seconds in pair_overlap.items():
+        assert np.isclose(result["pair_overlap"][pair], seconds)
@@ -0,0 +1,110 @@
+import json
+
+import numpy as np
+import pytest
+
+import bpk_playlist_pipeline as bpk
+from aggregation.convert import convert_rttm, convert_transcript
+from aggregation.loaders import formats
+from aggregation.loaders.json_loader import JSONLoader
+from aggregation.loaders.rttm_loader import RTTMLoader
+
+FORMATS = ["pretty", "compact", "gzip"]
+
+
+def _payload(video_id="vid"):
+    segments = [
+        {"start": 0.0, "end": 2.5, "text": "Guten Tag, meine Damen und Herren."},
+        {"start": 2.5, "end": 5.0, "text": "Ich eröffne die Bundespressekonferenz.", "speaker": "SPEAKER_00"},
+    ]
+    return {
+        "metadata": {
+            "source_url": f"https://www.youtube.com/watch?v={video_id}",
+            "video_id": video_id,
+            "original_title": "Regierungspressekonferenz",
+            "author": "Tilo Jung",
+            "publish_date": "2024-05-03",
+            "video_length_seconds": 5.0,
+            "retrieval_timestamp_utc": "2024-05-04T00:00:00+00:00",
+            "word_count": 9,
+            "status": "ok",
+            "diarization_rttm_path": f"rttm/{video_id}.rttm",
+            "outro_cutoff_seconds": None,
+            "whisper_model": "stub",
+        },
+        "transcript_text": "\n".join(s["text"] for s in segments),
+        "segments": segments,
+    }
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_ingest_output_round_trips_through_the_loaders(tmp_path, fmt):
+    json_dir, rttm_dir = tmp_path / "json", tmp_path / "rttm"
+    path = bpk.write_transcript(json_dir, "vid", _payload(), fmt)
+    assert path.name == "vid" + {"gzip": ".json.gz"}.get(fmt, ".json")
+    bpk.StubDiarizer(turn_s=2.5).diarize(np.zeros(5 * bpk.SAMPLE_RATE, dtype=np.float32), rttm_dir / "vid.rttm",
+                                          min_speakers=2, max_speakers=2, uri="vid")
+
+    # Both codec copies decode to the payload that was written
+    assert bpk.load_transcript(path) == _payload()
+    assert formats.load_transcript(path) == _payload()
+    assert bpk.is_valid_ok_json(path)
+    assert bpk.transcript_format_of(path, json.loads(bpk.read_output_bytes(path))) == fmt
+
+    [transcript] = JSONLoader(json_dir).load_all()
+    assert transcript.video_id == "vid"
+    assert [s.text for s in transcript.segments] == [s["text"] for s in _payload()["segments"]]
+    assert transcript.transcript_text == _payload()["transcript_text"]
+    entries = RTTMLoader(rttm_dir).load_all()["vid"]
+    assert [(e.start, e.speaker_id) for e in entries] == [(0.0, "SPEAKER_00"), (2.5, "SPEAKER_01")]
+
+
+@pytest.mark.parametrize("fmt", FORMATS)
+def test_ingest_and_aggregation_encoders_agree(tmp_path, fmt):
+    """The ingest keeps its own codec copy: it must write what aggregation.loaders.formats writes."""
+    path = bpk.write_transcript(tmp_path, "vid", _payload(), fmt)
+    blob, suffix = formats.encode_transcript(_payload(), fmt)
+    assert path.name == "vid" + suffix
+    if fmt == "gzip":
+        assert formats.read_bytes(path) == formats.gzip.decompress(blob)
+    else:
+        assert path.read_bytes() == blob
+    assert bpk.COMPACT_FORMAT == formats.COMPACT_FORMAT
+    assert bpk.TRANSCRIPT_SUFFIXES == formats.TRANSCRIPT_SUFFIXES
+    assert bpk.RTTM_SUFFIXES == formats.RTTM_SUFFIXES
+
+
+@pytest.mark.parametrize("source, target", [("pretty", "gzip"), ("gzip", "compact"), ("compact", "pretty")])
+def test_convert_transcript_rewrites_format_and_rttm_path(tmp_path, source, target):
+    json_dir, rttm_dir = tmp_path / "json", tmp_path / "rttm"
+    path = bpk.write_transcript(json_dir, "vid", _payload(), source)
+    rttm_suffix = formats.encode_rttm("", target)[1]
+    status, _, _ = convert_transcript(path, target, rttm_suffix)
+    assert status == "converted"
+    [converted] = list(json_dir.iterdir())
+    data = formats.load_transcript(converted)
+    assert formats.storage_format_of(converted, json.loads(formats.read_bytes(converted))) == target
+    assert data["metadata"]["diarization_rttm_path"] == f"rttm/vid{rttm_suffix}"
+    assert data["segments"] == _payload()["segments"]
+    # A second run has nothing to do
+    assert convert_transcript(converted, target, rttm_suffix)[0] == "unchanged"
+
+
+def test_converted_rttm_is_found_by_the_loader(tmp_path):
+    rttm_dir = tmp_path / "rttm"
+    bpk.StubDiarizer(turn_s=2.5).diarize(np.zeros(5 * bpk.SAMPLE_RATE, dtype=np.float32), rttm_dir / "vid.rttm",
+                                          min_speakers=2, max_speakers=2, uri="vid")
+    plain = RTTMLoader(rttm_dir).load_all()
+    assert convert_rttm(rttm_dir / "vid.rttm", "gzip")[0] == "converted"
+    assert [p.name for p in rttm_dir.iterdir()] == ["vid.rttm.gz"]
+    assert RTTMLoader(rttm_dir).load_all() == plain
+    assert bpk.find_output(rttm_dir, "vid", bpk.RTTM_SUFFIXES) == rttm_dir / "vid.rttm.gz"
+
+
+def test_zstd_round_trip(tmp_path):
+    pytest.importorskip("zstandard")
+    path = bpk.write_transcript(tmp_path, "vid", _payload(), "zstd")
+    assert path.name == "vid.json.zst"
+    assert formats.load_transcript(path) == bpk.load_transcript(path) == _payload()
+    [transcript] = JSONLoader(tmp_path).load_all()
+    assert transcript.video_id == "vid"
@@ -0,0 +1,88 @@
+import json
+import threading
+
+import bpk_playlist_pipeline as bpk
+
+MB = 1 << 20
+
+
+def _throttle(**kw):
+    return bpk.AdaptiveThrottle(min_delay_s=1.0, max_delay_s=64.0, **kw)
+
+
+def test_lasting_slowdown_becomes_the_new_baseline():
+    throttle = _throttle()
+    for _ in range(5):
+        throttle.observe(True, seconds=10.0, nbytes=100 * MB)  # 10 MB/s
+    outcomes = []
+    for _ in range(60):
+        throttle.observe(True, seconds=10.0, nbytes=10 * MB)  # 1 MB/s from now on
+        outcomes.append(throttle.outcomes[-1])
+    assert throttle.throughput_bps < 2 * MB
+    # Judged slow only until the baseline has followed; then the delay recovers additively
+    assert outcomes.count(False) <= 6 and all(outcomes[10:])
+    assert throttle.delay_s == throttle.min_delay_s
+
+
+def test_short_downloads_are_not_judged_by_startup_time():
+    throttle = _throttle()
+    for _ in range(5):
+        throttle.observe(True, seconds=12.0, nbytes=100 * MB, overhead_s=2.0)
+    baseline = throttle.throughput_bps
+    assert abs(baseline - 10 * MB) < 1
+    # A short video: almost all of its time is yt-dlp startup
+    throttle.observe(True, seconds=2.5, nbytes=1 * MB, overhead_s=2.0)
+    assert throttle.throughput_bps == baseline
+    assert throttle.outcomes[-1] is True
+    assert throttle.delay_s == throttle.min_delay_s
+
+
+def test_stale_baseline_is_relearned(tmp_path):
+    db = bpk.StateDB(tmp_path / "state.db")
+    try:
+        throttle = _throttle()
+        throttle.observe(True, seconds=10.0, nbytes=100 * MB)
+        throttle.save(db)
+        assert _throttle().load(db).throughput_bps == throttle.throughput_bps
+
+        state = json.loads(db.get_meta(throttle.META_KEY))
+        state["updated_ts"] -= 2 * 3600
+        db.set_meta(throttle.META_KEY, json.dumps(state))
+        assert _throttle().load(db).throughput_bps is None
+    finally:
+        db.close()
+
+
+def test_shared_updates_are_not_lost_between_workers(tmp_path):
+    path = tmp_path / "state.db"
+    dbs = [bpk.StateDB(path) for _ in range(4)]
+    try:
+        workers = [_throttle(window=200) for _ in dbs]
+
+        def run(throttle, db):
+            for i in range(25):
+                throttle.observe_shared(db, i % 5 != 0, error="HTTP Error 429")
+
+        threads = [threading.Thread(target=run, args=pair) for pair in zip(workers, dbs)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        state = _throttle(window=200).load(dbs[0])
+        assert len(state.outcomes) == 100
+        assert state.outcomes.count(False) == 20
+    finally:
+        for db in dbs:
+            db.close()
+
+
+def test_successes_do_not_speed_up_a_flaky_source():
+    throttle = _throttle(window=10, max_failure_rate=0.2)
+    for ok in (False, False, True, True):
+        throttle.observe(ok, error="HTTP Error 503")
+    assert throttle.delay_s == 4.0  # 1 -> 2 -> 4, then held at a 50% failure rate
+    for _ in range(6):
+        throttle.observe(True)
+    assert throttle.failure_rate == 0.2 and throttle.delay_s == 4.0
+    throttle.observe(True)  # the older failure leaves the window
+    assert throttle.failure_rate < 0.2 and throttle.delay_s == 3.0